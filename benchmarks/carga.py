@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos import ci_alumnos, correo
+
+
+#Prueba de carga contra la API corriendo (uvicorn main:app). Cada usuario virtual se loguea con un alumno
+#de benchmarks/datos.py y repite escenarios al azar segun su peso hasta que se termina el tiempo. Al final
+#muestra requests por segundo y p50/p95/p99 por ruta; --guardar deja el resultado en JSON y --comparar
+#falla si alguna ruta empeoro su p95 mas que --tolerancia respecto de un resultado guardado.
+#Todos los usuarios salen de la misma IP, asi que el servidor tiene que correr con los limites de /login
+#altos; si no, los 429 cuentan como fallas y se muestran aparte:
+#  LOGIN_IP_BURST=1000000 LOGIN_IP_RATE=1000000 LOGIN_CORREO_BURST=1000000 LOGIN_CORREO_RATE=1000000 uvicorn main:app
+#Uso: python benchmarks/carga.py [--url http://127.0.0.1:8000] [--usuarios 20] [--segundos 60]
+
+class Registro:
+    def __init__(self):
+        self.latencias = {}  #ruta -> [segundos]
+        self.fallas = {}     #ruta -> respuestas 5xx, 429 o sin respuesta
+        self.limitados = {}  #ruta -> respuestas 429, tambien cuentan en fallas
+
+    def anotar(self, ruta, duracion, estado):
+        self.latencias.setdefault(ruta, []).append(duracion)
+        if estado is None or estado >= 500 or estado == 429:
+            self.fallas[ruta] = self.fallas.get(ruta, 0) + 1
+        if estado == 429:
+            self.limitados[ruta] = self.limitados.get(ruta, 0) + 1
+
+    def resumen(self, segundos):
+        resultado = {}
+        for ruta, valores in sorted(self.latencias.items()):
+            valores.sort()
+            resultado[ruta] = {
+                "requests": len(valores),
+                "rps": len(valores) / segundos,
+                "fallas": self.fallas.get(ruta, 0),
+                "limitados": self.limitados.get(ruta, 0),
+                "p50_ms": percentil(valores, 50) * 1000,
+                "p95_ms": percentil(valores, 95) * 1000,
+                "p99_ms": percentil(valores, 99) * 1000,
+            }
+        return resultado
+
+
+def percentil(valores, p):
+    #por rango mas cercano, valores ya ordenados
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+class Usuario:
+    def __init__(self, cliente, registro, azar, ci_alumno, args):
+        self.cliente = cliente
+        self.registro = registro
+        self.azar = azar
+        self.ci_alumno = ci_alumno
+        self.args = args
+        self.headers = {}
+
+    async def pedir(self, metodo, ruta, url, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self.cliente.request(metodo, url, **kwargs)
+        except httpx.HTTPError:
+            self.registro.anotar(f"{metodo} {ruta}", time.perf_counter() - inicio, None)
+            return None
+        self.registro.anotar(f"{metodo} {ruta}", time.perf_counter() - inicio, respuesta.status_code)
+        return respuesta
+
+    async def login(self):
+        respuesta = await self.pedir(
+            "POST", "/login", "/login",
+            json={"correo": correo(self.ci_alumno), "contraseña": self.args.contraseña},
+        )
+        if respuesta is not None and respuesta.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+    #Escenarios
+
+    async def cronograma(self):
+        await self.pedir("GET", "/clases", "/clases")
+        await self.pedir("GET", "/actividades", "/actividades")
+        await self.pedir("GET", "/turnos", "/turnos")
+
+    async def panel(self):
+        await self.pedir("GET", "/actividades/populares", "/actividades/populares")
+        await self.pedir("GET", "/ingresos_totales", "/ingresos_totales")
+        await self.pedir("GET", "/turnos/clases", "/turnos/clases")
+        await self.pedir("GET", "/metrics", "/metrics")
+
+    async def mis_clases(self):
+        await self.pedir(
+            "GET", "/clases_alumno/{ci_alumno}", f"/clases_alumno/{self.ci_alumno}", headers=self.headers
+        )
+
+    async def inscripcion(self):
+        id_clase = self.azar.randint(1, self.args.clases)
+        respuesta = await self.pedir(
+            "POST", "/inscribir_alumno", "/inscribir_alumno",
+            json={"id_clase": id_clase, "ci_alumno": self.ci_alumno}, headers=self.headers,
+        )
+        #se desinscribe enseguida para que los cupos no se agoten durante la prueba
+        if respuesta is not None and respuesta.status_code == 200:
+            await self.pedir(
+                "DELETE", "/desinscribir_alumno/{id_clase}/{ci_alumno}",
+                f"/desinscribir_alumno/{id_clase}/{self.ci_alumno}", headers=self.headers,
+            )
+
+    async def listado(self):
+        after = ci_alumnos + self.azar.randrange(self.args.alumnos)
+        await self.pedir("GET", "/alumnos", "/alumnos", params={"after": after, "limit": 100})
+
+    async def relogin(self):
+        await self.login()
+
+    async def correr(self, hasta):
+        await self.login()
+        escenarios = [
+            (self.cronograma, 35),
+            (self.panel, 10),
+            (self.mis_clases, 25),
+            (self.inscripcion, 15),
+            (self.listado, 10),
+            (self.relogin, 5),
+        ]
+        funciones = [funcion for funcion, _ in escenarios]
+        pesos = [peso for _, peso in escenarios]
+        while time.monotonic() < hasta:
+            await self.azar.choices(funciones, pesos)[0]()
+
+
+def comparar(actual, base, tolerancia):
+    peores = []
+    for ruta, datos in actual.items():
+        anterior = base.get(ruta)
+        if anterior and datos["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+            peores.append(f"{ruta}: p95 {anterior['p95_ms']:.1f} ms -> {datos['p95_ms']:.1f} ms")
+    return peores
+
+
+async def main_async(args):
+    registro = Registro()
+    limites = httpx.Limits(max_connections=args.usuarios, max_keepalive_connections=args.usuarios)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=30) as cliente:
+        hasta = time.monotonic() + args.segundos
+        usuarios = [
+            Usuario(cliente, registro, random.Random(args.semilla + i), ci_alumnos + i % args.alumnos, args)
+            for i in range(args.usuarios)
+        ]
+        inicio = time.monotonic()
+        await asyncio.gather(*(usuario.correr(hasta) for usuario in usuarios))
+        return registro.resumen(time.monotonic() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con escenarios mezclados.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--segundos", type=float, default=60)
+    parser.add_argument("--alumnos", type=int, default=2000, help="los mismos que en datos.py")
+    parser.add_argument("--clases", type=int, default=200, help="las mismas que en datos.py")
+    parser.add_argument("--contraseña", default="benchmark")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--guardar", help="archivo JSON donde guardar el resultado")
+    parser.add_argument("--comparar", help="resultado JSON anterior contra el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="empeoramiento de p95 permitido (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    resultado = asyncio.run(main_async(args))
+
+    print(f"{'ruta':<50} {'requests':>9} {'rps':>8} {'fallas':>7} {'429':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for ruta, datos in resultado.items():
+        print(
+            f"{ruta:<50} {datos['requests']:>9} {datos['rps']:>8.1f} {datos['fallas']:>7} {datos['limitados']:>6} "
+            f"{datos['p50_ms']:>8.1f} {datos['p95_ms']:>8.1f} {datos['p99_ms']:>8.1f}"
+        )
+    total = sum(datos["requests"] for datos in resultado.values())
+    print(f"total: {total} requests, {sum(datos['rps'] for datos in resultado.values()):.1f} por segundo")
+    limitados = sum(datos["limitados"] for datos in resultado.values())
+    if limitados:
+        print(f"{limitados} requests cortados con 429: subir LOGIN_* en el servidor")
+
+    if args.guardar:
+        with open(args.guardar, "w") as archivo:
+            json.dump(resultado, archivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            peores = comparar(resultado, json.load(archivo), args.tolerancia)
+        for linea in peores:
+            print(f"REGRESION {linea}")
+        return 1 if peores else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import security
+from database import get_db_connection
+from datos import ci_alumnos, ci_instructores, deportes
+
+
+#Carrera por los ultimos lugares contra la API corriendo: crea una clase con --cupos lugares y --clientes
+#alumnos distintos de benchmarks/datos.py piden inscribirse todos a la vez. Despues cuenta en la base
+#cuantos quedaron inscriptos; falla si hay mas que el cupo o si los 200 no coinciden con las filas.
+#Los tokens se firman aca, asi que TOKEN_SECRET tiene que ser el mismo que el del servidor, y DB_* el de
+#su base.
+#Uso: TOKEN_SECRET=... python benchmarks/cupos.py [--url http://127.0.0.1:8000] [--clientes 500] [--cupos 10]
+
+def percentil(valores, p):
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+async def crear_clase(cliente, cupo):
+    respuesta = await cliente.post("/clases", json={
+        "nombre_actividad": f"{deportes[0]} 1",
+        "ci_instructor": ci_instructores,
+        "id_turno": 1,
+        "dictada": False,
+        "cupo": cupo,
+    })
+    respuesta.raise_for_status()
+    return respuesta.json()["id_clase"]
+
+
+async def inscribir(cliente, id_clase, ci_alumno, salida):
+    token, _ = security.crear_token(ci_alumno)
+    await salida.wait()
+    inicio = time.perf_counter()
+    try:
+        respuesta = await cliente.post(
+            "/inscribir_alumno",
+            json={"id_clase": id_clase, "ci_alumno": ci_alumno},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        estado = respuesta.status_code
+    except httpx.HTTPError:
+        estado = None
+    return estado, time.perf_counter() - inicio
+
+
+def contar(id_clase):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT cupo, cupos_disponibles, (SELECT COUNT(*) FROM alumno_clase WHERE id_clase = %s) "
+            "FROM clase WHERE id_clase = %s",
+            (id_clase, id_clase),
+        )
+        fila = cursor.fetchone()
+        cursor.close()
+        return fila
+    finally:
+        db.close()
+
+
+async def ronda(cliente, args):
+    id_clase = await crear_clase(cliente, args.cupos)
+    salida = asyncio.Event()
+    pedidos = [
+        asyncio.create_task(inscribir(cliente, id_clase, ci_alumnos + i, salida)) for i in range(args.clientes)
+    ]
+    await asyncio.sleep(0.1)
+    inicio = time.perf_counter()
+    salida.set()
+    resultados = await asyncio.gather(*pedidos)
+    return id_clase, resultados, time.perf_counter() - inicio
+
+
+async def main_async(args):
+    limites = httpx.Limits(max_connections=args.clientes, max_keepalive_connections=args.clientes)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as cliente:
+        return [await ronda(cliente, args) for _ in range(args.rondas)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muchos clientes por los ultimos cupos de una clase.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clientes", type=int, default=500, help="alumnos distintos, tienen que existir en datos.py")
+    parser.add_argument("--cupos", type=int, default=10)
+    parser.add_argument("--rondas", type=int, default=1, help="cada ronda usa una clase nueva")
+    args = parser.parse_args()
+
+    fallas = 0
+    print(f"{'clase':>6} {'200':>5} {'409':>5} {'otros':>6} {'filas':>6} {'libres':>7} {'segundos':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for id_clase, resultados, segundos in asyncio.run(main_async(args)):
+        estados = [estado for estado, _ in resultados]
+        latencias = sorted(duracion for _, duracion in resultados)
+        cupo, libres, filas = contar(id_clase)
+        otros = len(estados) - estados.count(200) - estados.count(409)
+        print(
+            f"{id_clase:>6} {estados.count(200):>5} {estados.count(409):>5} {otros:>6} {filas:>6} {libres:>7} "
+            f"{segundos:>9.2f} {percentil(latencias, 50) * 1000:>8.1f} {percentil(latencias, 99) * 1000:>8.1f}"
+        )
+        if filas > cupo or filas != estados.count(200) or libres != cupo - filas:
+            print(f"FALLA clase {id_clase}: cupo {cupo}, {filas} inscriptos, {libres} libres, {estados.count(200)} respuestas 200")
+            fallas += 1
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
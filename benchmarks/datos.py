@@ -0,0 +1,157 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import rollups
+import security
+from database import get_db_connection
+
+
+#Carga un juego de datos para las pruebas de carga (benchmarks/carga.py). Borra lo que haya en las tablas.
+#Todos los alumnos tienen la misma contraseña (--contraseña) y correo alumno<ci>@bench.uy, asi la prueba
+#de carga puede loguearse con cualquiera.
+#Uso: python benchmarks/datos.py [--alumnos 2000] [--inscripciones 20000] [--semilla 1]
+
+tablas = ("lista_espera", "alumno_clase", "login", "alumnos", "clase", "turnos", "instructores",
+          "equipamiento", "actividades", "rollup_actividad", "rollup_turno")
+
+nombres = ("Ana", "Bruno", "Carla", "Diego", "Elena", "Facundo", "Gimena", "Hugo", "Ines", "Juan", "Lucia", "Martin")
+apellidos = ("Alvarez", "Benitez", "Castro", "Duarte", "Ferreira", "Gomez", "Lopez", "Martinez", "Perez", "Rodriguez")
+deportes = ("Yoga", "Pilates", "Spinning", "Crossfit", "Natacion", "Boxeo", "Funcional", "Zumba", "Escalada",
+            "Tenis", "Padel", "Karate", "Danza", "Remo", "Atletismo", "Calistenia")
+
+#Primera cedula de alumnos e instructores
+ci_alumnos = 10000000
+ci_instructores = 50000000
+tamaño_lote = 5000
+
+
+def correo(ci_alumno):
+    return f"alumno{ci_alumno}@bench.uy"
+
+
+def en_lotes(cursor, query, filas):
+    for inicio in range(0, len(filas), tamaño_lote):
+        cursor.executemany(query, filas[inicio:inicio + tamaño_lote])
+
+
+def cargar(db, args):
+    azar = random.Random(args.semilla)
+    cursor = db.cursor()
+    try:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        for tabla in tablas:
+            cursor.execute(f"TRUNCATE TABLE {tabla}")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+        actividades = [
+            (i + 1, f"{deportes[i % len(deportes)]} {i // len(deportes) + 1}", "Actividad de prueba", azar.randint(5, 40) * 100)
+            for i in range(args.actividades)
+        ]
+        en_lotes(cursor, "INSERT INTO actividades (id_actividad, nombre, descripcion, costo) VALUES (%s, %s, %s, %s)", actividades)
+        en_lotes(
+            cursor,
+            "INSERT INTO equipamiento (id_actividad, descripcion, costo) VALUES (%s, %s, %s)",
+            [(id_actividad, "Equipo", azar.randint(1, 10) * 50) for id_actividad, *_ in actividades],
+        )
+
+        instructores = [
+            (ci_instructores + i, azar.choice(nombres), azar.choice(apellidos)) for i in range(args.instructores)
+        ]
+        en_lotes(cursor, "INSERT INTO instructores (ci_instructor, nombre, apellido) VALUES (%s, %s, %s)", instructores)
+
+        #turnos de una hora y media desde las 7
+        turnos = [
+            (i + 1, datetime.timedelta(hours=7, minutes=90 * i), datetime.timedelta(hours=8, minutes=30 + 90 * i))
+            for i in range(args.turnos)
+        ]
+        en_lotes(cursor, "INSERT INTO turnos (id_turno, hora_inicio, hora_fin) VALUES (%s, %s, %s)", turnos)
+
+        clases = []
+        for i in range(args.clases):
+            cupo = azar.choice((None, 15, 20, 30, 40))
+            clases.append((i + 1, azar.choice(instructores)[0], azar.randint(1, args.actividades),
+                           azar.randint(1, args.turnos), azar.random() < 0.5, cupo))
+        en_lotes(
+            cursor,
+            "INSERT INTO clase (id_clase, ci_instructor, id_actividad, id_turno, dictada, cupo, cupos_disponibles) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [clase + (clase[-1],) for clase in clases],
+        )
+
+        #una sola contraseña hasheada para todos, hashear miles tardaria minutos
+        contraseña = security.hash_password(args.contraseña)
+        alumnos = [
+            (ci_alumnos + i, azar.choice(nombres), azar.choice(apellidos),
+             datetime.date(1970, 1, 1) + datetime.timedelta(days=azar.randint(0, 365 * 35)),
+             f"09{azar.randint(0, 9999999):07}", correo(ci_alumnos + i), contraseña)
+            for i in range(args.alumnos)
+        ]
+        en_lotes(
+            cursor,
+            "INSERT INTO alumnos (ci_alumno, nombre, apellido, fecha_nacimiento, telefono, correo, contraseña) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            alumnos,
+        )
+        en_lotes(
+            cursor,
+            "INSERT INTO login (correo, contraseña, ci_alumno) VALUES (%s, %s, %s)",
+            [(alumno[5], contraseña, alumno[0]) for alumno in alumnos],
+        )
+
+        #inscripciones al azar sin repetir y sin pasarse del cupo de cada clase
+        libres = {clase[0]: clase[-1] for clase in clases}
+        vistas = set()
+        inscripciones = []
+        intentos = 0
+        while len(inscripciones) < args.inscripciones and intentos < args.inscripciones * 5:
+            intentos += 1
+            id_clase = azar.randint(1, args.clases)
+            ci_alumno = ci_alumnos + azar.randrange(args.alumnos)
+            if (id_clase, ci_alumno) in vistas or libres[id_clase] == 0:
+                continue
+            vistas.add((id_clase, ci_alumno))
+            if libres[id_clase] is not None:
+                libres[id_clase] -= 1
+            inscripciones.append((id_clase, ci_alumno))
+        en_lotes(cursor, "INSERT INTO alumno_clase (id_clase, ci_alumno) VALUES (%s, %s)", inscripciones)
+        en_lotes(
+            cursor,
+            "UPDATE clase SET cupos_disponibles = %s WHERE id_clase = %s",
+            [(disponibles, id_clase) for id_clase, disponibles in libres.items() if disponibles is not None],
+        )
+        db.commit()
+    finally:
+        cursor.close()
+
+    rollups.reconstruir(db)
+    return len(inscripciones)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga datos de prueba para los benchmarks. Borra las tablas.")
+    parser.add_argument("--alumnos", type=int, default=2000)
+    parser.add_argument("--instructores", type=int, default=50)
+    parser.add_argument("--actividades", type=int, default=16)
+    parser.add_argument("--turnos", type=int, default=8)
+    parser.add_argument("--clases", type=int, default=200)
+    parser.add_argument("--inscripciones", type=int, default=20000)
+    parser.add_argument("--contraseña", default="benchmark")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    db = get_db_connection()
+    try:
+        inscriptos = cargar(db, args)
+    finally:
+        db.close()
+    print(f"{args.alumnos} alumnos, {args.clases} clases, {inscriptos} inscripciones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
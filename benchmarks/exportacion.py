@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+#Mide la memoria maxima del proceso (ru_maxrss) mientras se exporta una tabla de N filas con
+#/exportar/alumno_clase, para ver que no crece con el tamaño de la tabla. Cada tamaño corre en su propio
+#proceso porque ru_maxrss nunca baja. Por defecto las filas las genera un cursor sintetico de a una; con
+#--mysql se leen de la base configurada en DB_* (cargada con generador.py). Para comparar, --todo arma la
+#respuesta entera en memoria como haria una ruta sin streaming.
+#Uso: python benchmarks/exportacion.py [--filas 10000 100000 1000000] [--formato ndjson] [--mysql] [--todo]
+
+
+class CursorSintetico:
+    def __init__(self, filas):
+        self.restantes = filas
+        self.siguiente = 0
+
+    def execute(self, sentencia, params=None):
+        pass
+
+    def fetchmany(self, cantidad=1):
+        cantidad = min(cantidad, self.restantes)
+        filas = [(i % 5000 + 1, 10000000 + i, None) for i in range(self.siguiente, self.siguiente + cantidad)]
+        self.siguiente += cantidad
+        self.restantes -= cantidad
+        return filas
+
+    def fetchall(self):
+        return self.fetchmany(self.restantes)
+
+    def close(self):
+        pass
+
+
+class ConexionSintetica:
+    def __init__(self, filas):
+        self.filas = filas
+
+    def cursor(self, **kwargs):
+        return CursorSintetico(self.filas)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def reset_session(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+def memoria_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  #en Linux viene en KB
+
+
+async def exportar(app, formato):
+    enviados = 0
+    pedido = [{"type": "http.request", "body": b"", "more_body": False}]
+    nunca = asyncio.Event()
+
+    #el cliente no se desconecta: despues del pedido, receive queda esperando
+    async def receive():
+        if pedido:
+            return pedido.pop()
+        await nunca.wait()
+
+    async def send(mensaje):
+        nonlocal enviados
+        if mensaje["type"] == "http.response.body":
+            enviados += len(mensaje.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/exportar/alumno_clase",
+        "raw_path": b"/exportar/alumno_clase",
+        "query_string": f"formato={formato}".encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return enviados
+
+
+def todo_en_memoria(main, formato):
+    columnas = main.columnas_exportacion["alumno_clase"]
+    db = main.get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(main.consultas["exportar"].format(columnas=", ".join(columnas), tabla="alumno_clase"))
+        filas = cursor.fetchall()
+        cuerpo = main.lote_ndjson(columnas, filas) if formato == "ndjson" else main.lote_csv(filas)
+        cursor.close()
+    finally:
+        db.close()
+    return len(cuerpo.encode())
+
+
+#Corre dentro del proceso hijo: una sola exportacion y su memoria maxima
+def hijo(args):
+    import mysql.connector
+
+    if not args.mysql:
+        mysql.connector.connect = lambda **config: ConexionSintetica(args.hijo)
+    os.environ.setdefault("SLOW_QUERY_EXPLAIN", "0")
+    import main
+
+    base = memoria_mb()
+    inicio = time.perf_counter()
+    if args.todo:
+        enviados = todo_en_memoria(main, args.formato)
+    else:
+        enviados = asyncio.run(exportar(main.app, args.formato))
+    segundos = time.perf_counter() - inicio
+    print(f"{enviados} {segundos:.3f} {base:.1f} {memoria_mb():.1f}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria maxima al exportar tablas de distintos tamaños.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--formato", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--mysql", action="store_true", help="leer de la base (tiene que tener las filas)")
+    parser.add_argument("--todo", action="store_true", help="armar la respuesta entera en memoria, para comparar")
+    parser.add_argument("--hijo", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo is not None:
+        return hijo(args)
+
+    modo = "todo en memoria" if args.todo else "streaming"
+    print(f"{modo}, {args.formato}, filas de {'mysql' if args.mysql else 'un cursor sintetico'}")
+    print(f"  {'filas':>9} {'MB enviados':>12} {'segundos':>9} {'RSS inicial':>12} {'RSS maximo':>11} {'crecio':>8}")
+    for filas in args.filas:
+        comando = [sys.executable, os.path.abspath(__file__), "--hijo", str(filas), "--formato", args.formato]
+        comando += ["--mysql"] * args.mysql + ["--todo"] * args.todo
+        salida = subprocess.run(comando, capture_output=True, text=True, check=True).stdout.split()
+        enviados, segundos, base, maximo = int(salida[0]), float(salida[1]), float(salida[2]), float(salida[3])
+        print(
+            f"  {filas:>9} {enviados / 1e6:>12.1f} {segundos:>9.2f} {base:>10.1f}MB {maximo:>9.1f}MB "
+            f"{maximo - base:>6.1f}MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector
+
+import esquema
+import security
+from database import db_config
+from datos import apellidos, ci_alumnos, ci_instructores, correo, deportes, nombres
+
+
+#Genera un juego de datos grande para ver como escalan /clases, /actividades/populares y /clases_alumno.
+#Las inscripciones siguen una distribucion de Zipf: la actividad k-esima y el turno k-esimo reciben
+#1/k^s de las inscripciones, asi hay pocas clases muy llenas y muchas casi vacias, como en un gimnasio real.
+#
+#Dos destinos:
+#  --destino base  con --recrear borra la base y la vuelve a crear con las migraciones; carga con
+#                  LOAD DATA LOCAL INFILE, que en MySQL es el camino mas rapido (el servidor necesita
+#                  local_infile=ON; si no, --sin-infile carga con INSERT de muchas filas)
+#  --destino sql   escribe un dump con el esquema y los datos en INSERT de muchas filas, para cargar en
+#                  una base vacia (mysql obligatorio2024 < datos.sql)
+#
+#Uso: python benchmarks/generador.py --inscripciones 5000000 [--alumnos 500000] [--destino sql --archivo datos.sql]
+
+filas_por_insert = 5000
+
+
+#El esquema completo para una base vacia: todas las migraciones y su registro en schema_version
+def sentencias_esquema():
+    resultado = [esquema.tabla_version.strip()]
+    for version, nombre, ruta in esquema.migraciones():
+        resultado.extend(esquema.sentencias(ruta))
+        resultado.append(f"INSERT INTO schema_version (version, nombre) VALUES ({version}, '{nombre}')")
+    return resultado
+
+
+def pesos_zipf(cantidad, s):
+    return [1 / (rango ** s) for rango in range(1, cantidad + 1)]
+
+
+#############################################################################################
+#                               GENERACION                                                  #
+#############################################################################################
+
+#Devuelve {tabla: (columnas, filas)}. Las filas de alumno_clase se generan al escribirlas (son millones).
+def generar(args):
+    azar = random.Random(args.semilla)
+    tablas = {}
+
+    actividades = [
+        (i + 1, f"{deportes[i % len(deportes)]} {i // len(deportes) + 1}", "Actividad generada", azar.randint(5, 40) * 100)
+        for i in range(args.actividades)
+    ]
+    equipamiento = [(id_actividad, id_actividad, "Equipo", azar.randint(1, 10) * 50) for id_actividad, *_ in actividades]
+    tablas["actividades"] = (("id_actividad", "nombre", "descripcion", "costo"), actividades)
+    tablas["equipamiento"] = (("id_equipamiento", "id_actividad", "descripcion", "costo"), equipamiento)
+
+    tablas["instructores"] = (
+        ("ci_instructor", "nombre", "apellido"),
+        [(ci_instructores + i, azar.choice(nombres), azar.choice(apellidos)) for i in range(args.instructores)],
+    )
+
+    turnos = []
+    for i in range(args.turnos):
+        inicio = 7 * 60 + (i * 90) % (15 * 60)  #turnos de 90 minutos entre las 7 y las 22
+        turnos.append((i + 1, f"{inicio // 60:02}:{inicio % 60:02}:00", f"{(inicio + 90) // 60:02}:{(inicio + 90) % 60:02}:00"))
+    tablas["turnos"] = (("id_turno", "hora_inicio", "hora_fin"), turnos)
+
+    contraseña = security.hash_password(args.contraseña)
+    nacimiento = datetime.date(1970, 1, 1)
+    tablas["alumnos"] = (
+        ("ci_alumno", "nombre", "apellido", "fecha_nacimiento", "telefono", "correo", "contraseña"),
+        [
+            (ci_alumnos + i, nombres[i % len(nombres)], apellidos[i % len(apellidos)],
+             nacimiento + datetime.timedelta(days=i % (365 * 35)), f"09{i % 10000000:07}", correo(ci_alumnos + i), contraseña)
+            for i in range(args.alumnos)
+        ],
+    )
+    tablas["login"] = (
+        ("correo", "contraseña", "ci_alumno"),
+        [(correo(ci_alumnos + i), contraseña, ci_alumnos + i) for i in range(args.alumnos)],
+    )
+
+    #cada clase es una combinacion actividad/turno; su peso es el producto de los pesos de Zipf de ambas
+    peso_actividad = pesos_zipf(args.actividades, args.zipf)
+    peso_turno = pesos_zipf(args.turnos, args.zipf)
+    orden_actividades = azar.sample(range(args.actividades), args.actividades)
+    orden_turnos = azar.sample(range(args.turnos), args.turnos)
+    clases = []
+    pesos = []
+    for i in range(args.clases):
+        actividad = i % args.actividades
+        turno = (i // args.actividades) % args.turnos
+        clases.append([i + 1, ci_instructores + azar.randrange(args.instructores), actividad + 1, turno + 1])
+        pesos.append(peso_actividad[orden_actividades[actividad]] * peso_turno[orden_turnos[turno]])
+
+    #inscripciones por clase proporcionales al peso, sin pasar de la cantidad de alumnos
+    total = sum(pesos)
+    cantidades = [min(args.alumnos, int(args.inscripciones * peso / total)) for peso in pesos]
+    faltan = args.inscripciones - sum(cantidades)
+    for i in sorted(range(args.clases), key=lambda i: -pesos[i]):
+        if faltan <= 0:
+            break
+        extra = min(faltan, args.alumnos - cantidades[i])
+        cantidades[i] += extra
+        faltan -= extra
+
+    filas_clase = []
+    for clase, cantidad in zip(clases, cantidades):
+        cupo = max(cantidad, 20) + azar.randint(0, 10)
+        filas_clase.append((*clase, azar.random() < 0.5, cupo, cupo - cantidad))
+    tablas["clase"] = (
+        ("id_clase", "ci_instructor", "id_actividad", "id_turno", "dictada", "cupo", "cupos_disponibles"),
+        filas_clase,
+    )
+
+    def inscripciones():
+        azar_inscripciones = random.Random(args.semilla + 1)
+        for (id_clase, _, id_actividad, _), cantidad in zip(clases, cantidades):
+            con_equipo = azar_inscripciones.random() < 0.3
+            for indice in azar_inscripciones.sample(range(args.alumnos), cantidad):
+                yield (id_clase, ci_alumnos + indice, id_actividad if con_equipo else None)
+
+    tablas["alumno_clase"] = (("id_clase", "ci_alumno", "id_equipamiento"), inscripciones())
+
+    #los rollups se calculan aca igual que rollups.calcular: una fila de equipamiento por actividad
+    inscriptos = {}
+    for (_, _, id_actividad, _), cantidad in zip(clases, cantidades):
+        inscriptos[id_actividad] = inscriptos.get(id_actividad, 0) + cantidad
+    costos_equipo = {id_actividad: costo for _, id_actividad, _, costo in equipamiento}
+    tablas["rollup_actividad"] = (
+        ("id_actividad", "cantidad_alumnos", "ingresos_totales"),
+        [(id_actividad, inscriptos.get(id_actividad, 0), costo + costos_equipo[id_actividad]) for id_actividad, _, _, costo in actividades],
+    )
+    clases_por_turno = {id_turno: 0 for id_turno, _, _ in turnos}
+    for _, _, _, id_turno in clases:
+        clases_por_turno[id_turno] += 1
+    tablas["rollup_turno"] = (("id_turno", "clases_dictadas"), sorted(clases_por_turno.items()))
+    return tablas
+
+
+#############################################################################################
+#                               SALIDA                                                      #
+#############################################################################################
+
+def valor_tsv(valor):
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, bool):
+        return "1" if valor else "0"
+    return str(valor).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def valor_sql(valor):
+    if valor is None:
+        return "NULL"
+    if isinstance(valor, bool):
+        return "1" if valor else "0"
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    return "'" + str(valor).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def escribir_sql(tablas, archivo):
+    with open(archivo, "w", encoding="utf-8") as salida:
+        for sentencia in sentencias_esquema():
+            salida.write(sentencia + ";\n")
+        salida.write("SET FOREIGN_KEY_CHECKS = 0;\nSET UNIQUE_CHECKS = 0;\n")
+        for tabla, (columnas, filas) in tablas.items():
+            encabezado = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES\n"
+            lote = []
+            for fila in filas:
+                lote.append("(" + ",".join(valor_sql(valor) for valor in fila) + ")")
+                if len(lote) == filas_por_insert:
+                    salida.write(encabezado + ",\n".join(lote) + ";\n")
+                    lote = []
+            if lote:
+                salida.write(encabezado + ",\n".join(lote) + ";\n")
+        salida.write("SET UNIQUE_CHECKS = 1;\nSET FOREIGN_KEY_CHECKS = 1;\n")
+
+
+def cargar_base(tablas, args):
+    config = {clave: valor for clave, valor in db_config.items() if clave != "database"}
+    db = mysql.connector.connect(**config, allow_local_infile=not args.sin_infile)
+    cursor = db.cursor()
+    try:
+        nombre = db_config["database"]
+        if args.recrear:
+            cursor.execute(f"DROP DATABASE IF EXISTS {nombre}")
+            cursor.execute(f"CREATE DATABASE {nombre}")
+            cursor.execute(f"USE {nombre}")
+            esquema.aplicar(db)
+        else:
+            cursor.execute(f"USE {nombre}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for tabla in ("lista_espera", *tablas):
+                cursor.execute(f"TRUNCATE TABLE {tabla}")
+
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        cursor.execute("SET UNIQUE_CHECKS = 0")
+        for tabla, (columnas, filas) in tablas.items():
+            inicio = time.perf_counter()
+            if args.sin_infile:
+                cantidad = insertar_lotes(cursor, tabla, columnas, filas)
+            else:
+                cantidad = load_data(cursor, tabla, columnas, filas)
+            db.commit()
+            print(f"{tabla}: {cantidad} filas en {time.perf_counter() - inicio:.1f} s")
+        cursor.execute("SET UNIQUE_CHECKS = 1")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    finally:
+        cursor.close()
+        db.close()
+
+
+def load_data(cursor, tabla, columnas, filas):
+    cantidad = 0
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", delete=False) as archivo:
+        for fila in filas:
+            archivo.write("\t".join(valor_tsv(valor) for valor in fila) + "\n")
+            cantidad += 1
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {tabla} CHARACTER SET utf8mb4 ({', '.join(columnas)})",
+            (archivo.name,),
+        )
+    finally:
+        os.unlink(archivo.name)
+    return cantidad
+
+
+def insertar_lotes(cursor, tabla, columnas, filas):
+    #executemany de mysql.connector junta los VALUES en un solo INSERT por lote
+    query = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join(['%s'] * len(columnas))})"
+    cantidad = 0
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == filas_por_insert:
+            cursor.executemany(query, lote)
+            cantidad += len(lote)
+            lote = []
+    if lote:
+        cursor.executemany(query, lote)
+        cantidad += len(lote)
+    return cantidad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sinteticos con inscripciones segun Zipf.")
+    parser.add_argument("--alumnos", type=int, default=200000)
+    parser.add_argument("--instructores", type=int, default=200)
+    parser.add_argument("--actividades", type=int, default=40)
+    parser.add_argument("--turnos", type=int, default=10)
+    parser.add_argument("--clases", type=int, default=2000)
+    parser.add_argument("--inscripciones", type=int, default=1000000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="exponente s, mas alto es mas desparejo")
+    parser.add_argument("--contraseña", default="benchmark")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--destino", choices=("base", "sql"), default="base")
+    parser.add_argument("--archivo", default="datos.sql", help="con --destino sql")
+    parser.add_argument("--recrear", action="store_true", help="borra y vuelve a crear la base con las migraciones")
+    parser.add_argument("--sin-infile", action="store_true", help="carga con INSERT si el servidor no permite LOAD DATA LOCAL")
+    args = parser.parse_args()
+
+    if min(args.alumnos, args.instructores, args.actividades, args.turnos, args.clases) < 1:
+        parser.error("alumnos, instructores, actividades, turnos y clases tienen que ser al menos 1")
+
+    inicio = time.perf_counter()
+    tablas = generar(args)
+    if args.destino == "sql":
+        escribir_sql(tablas, args.archivo)
+        print(f"{args.archivo} escrito en {time.perf_counter() - inicio:.1f} s")
+    else:
+        cargar_base(tablas, args)
+        print(f"Carga completa en {time.perf_counter() - inicio:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos import ci_alumnos, correo
+
+
+#Logins por segundo contra la API corriendo, con --concurrencias clientes a la vez que se loguean en
+#bucle con alumnos de benchmarks/datos.py. Para cada concurrencia muestra logins/s y p50/p99; al final,
+#la mayor cantidad de logins/s con p99 por debajo de --p99. Todos los pedidos salen de la misma IP,
+#asi que el servidor tiene que correr con los limites de /login altos o los 429 no dejan medir:
+#  LOGIN_IP_BURST=1000000 LOGIN_IP_RATE=1000000 LOGIN_CORREO_BURST=1000000 LOGIN_CORREO_RATE=1000000 uvicorn main:app
+#Uso: python benchmarks/login.py [--url http://127.0.0.1:8000] [--concurrencias 1 4 16 64] [--segundos 10]
+
+def percentil(valores, p):
+    return valores[max(0, math.ceil(p / 100 * len(valores)) - 1)]
+
+
+async def medir(cliente, concurrencia, args):
+    latencias = []
+    estados = {}
+    hasta = time.monotonic() + args.segundos
+
+    async def usuario(numero):
+        ci_alumno = ci_alumnos + numero % args.alumnos
+        while time.monotonic() < hasta:
+            inicio = time.perf_counter()
+            try:
+                respuesta = await cliente.post(
+                    "/login", json={"correo": correo(ci_alumno), "contraseña": args.contraseña}
+                )
+                estado = respuesta.status_code
+            except httpx.HTTPError:
+                estado = None
+            if estado == 200:
+                latencias.append(time.perf_counter() - inicio)
+            estados[estado] = estados.get(estado, 0) + 1
+            ci_alumno = ci_alumnos + (ci_alumno - ci_alumnos + concurrencia) % args.alumnos
+
+    inicio = time.monotonic()
+    await asyncio.gather(*(usuario(numero) for numero in range(concurrencia)))
+    segundos = time.monotonic() - inicio
+    latencias.sort()
+    return {
+        "logins_s": len(latencias) / segundos,
+        "p50_ms": percentil(latencias, 50) * 1000 if latencias else math.nan,
+        "p99_ms": percentil(latencias, 99) * 1000 if latencias else math.nan,
+        "fallas": sum(cantidad for estado, cantidad in estados.items() if estado != 200),
+        "limitados": estados.get(429, 0),
+    }
+
+
+async def main_async(args):
+    resultados = {}
+    limites = httpx.Limits(max_connections=max(args.concurrencias), max_keepalive_connections=max(args.concurrencias))
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as cliente:
+        for concurrencia in args.concurrencias:
+            resultados[concurrencia] = await medir(cliente, concurrencia, args)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logins por segundo y p99 con distintas concurrencias.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrencias", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--alumnos", type=int, default=2000, help="los mismos que en datos.py")
+    parser.add_argument("--contraseña", default="benchmark")
+    parser.add_argument("--p99", type=float, default=250, help="p99 maximo en ms para el resumen")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(main_async(args))
+
+    print(f"{'clientes':>8} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'fallas':>7} {'429':>6}")
+    for concurrencia, datos in resultados.items():
+        print(
+            f"{concurrencia:>8} {datos['logins_s']:>9.1f} {datos['p50_ms']:>8.1f} {datos['p99_ms']:>8.1f} "
+            f"{datos['fallas']:>7} {datos['limitados']:>6}"
+        )
+    dentro = [datos["logins_s"] for datos in resultados.values() if datos["p99_ms"] <= args.p99]
+    if dentro:
+        print(f"con p99 <= {args.p99:.0f} ms: {max(dentro):.1f} logins/s")
+    else:
+        print(f"ninguna concurrencia con p99 <= {args.p99:.0f} ms")
+    limitados = sum(datos["limitados"] for datos in resultados.values())
+    if limitados:
+        print(f"{limitados} logins cortados con 429: subir LOGIN_* en el servidor")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
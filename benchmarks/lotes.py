@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import security
+from database import get_db_connection
+from datos import ci_alumnos, ci_instructores, deportes
+
+
+#Compara contra la API corriendo la carga de a una fila con la ruta de lotes:
+#  alumnos        POST /alumnos por alumno (--concurrencia pedidos a la vez) contra POST /alumnos/importar
+#                 con --lote alumnos por pedido
+#  inscripciones  un alumno nuevo a las clases 1..--clases de benchmarks/datos.py: POST /inscribir_alumno
+#                 por clase contra POST /inscribir_alumnos con --lote clases por pedido
+#  grupo          --filas alumnos de benchmarks/datos.py a una misma clase nueva con --cupo lugares, como
+#                 una escuela que anota a su grupo: POST /inscribir_alumno con el token de cada alumno
+#                 contra POST /inscribir_alumnos con un token de escuela. Todos compiten por la misma fila
+#                 de clase; al terminar cada variante se revisa en la base que las filas inscriptas
+#                 coincidan con las respuestas, que el cupo haya bajado una vez por inscripto y que
+#                 rollup_actividad haya sumado lo mismo. Despues se desinscriben todos.
+#Los alumnos se crean con cedulas desde --desde y se borran al terminar cada variante (de la base DB_*, o
+#con DELETE /alumnos para las inscripciones, asi se devuelven los cupos). Los tokens se firman aca, asi
+#que TOKEN_SECRET tiene que ser el mismo que el del servidor. Los alumnos llevan contraseña como en una
+#planilla real, y su hash es buena parte del costo en las dos variantes; --sin-contraseña mide solo la base.
+#Uso: python benchmarks/lotes.py alumnos|inscripciones|grupo [--url http://127.0.0.1:8000] [--filas 5000] [--lote 1000]
+
+def alumno(ci_alumno, args):
+    datos = {
+        "ci_alumno": ci_alumno,
+        "nombre": "Ana",
+        "apellido": "Perez",
+        "fecha_nacimiento": "2000-01-01",
+        "telefono": "099000000",
+        "correo": f"lote{ci_alumno}@bench.uy",
+    }
+    if not args.sin_contraseña:
+        datos["contraseña"] = args.contraseña
+    return datos
+
+
+def borrar_alumnos(desde, cantidad):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute("DELETE FROM alumnos WHERE ci_alumno >= %s AND ci_alumno < %s", (desde, desde + cantidad))
+        db.commit()
+        cursor.close()
+    finally:
+        db.close()
+
+
+async def de_a_uno(cliente, pedidos, concurrencia):
+    #cada pedido es (ruta, json); devuelve cuantos respondieron 200
+    cola = list(reversed(pedidos))
+    correctos = 0
+
+    async def trabajador():
+        nonlocal correctos
+        while cola:
+            ruta, cuerpo = cola.pop()
+            respuesta = await cliente.post(ruta, json=cuerpo)
+            correctos += respuesta.status_code == 200
+
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return correctos
+
+
+async def alumnos_de_a_uno(cliente, args):
+    pedidos = [("/alumnos", alumno(args.desde + i, args)) for i in range(args.filas)]
+    return await de_a_uno(cliente, pedidos, args.concurrencia)
+
+
+async def alumnos_en_lotes(cliente, args):
+    creados = 0
+    for inicio in range(0, args.filas, args.lote):
+        lote = [alumno(args.desde + i, args) for i in range(inicio, min(inicio + args.lote, args.filas))]
+        respuesta = await cliente.post("/alumnos/importar", json=lote)
+        respuesta.raise_for_status()
+        creados += respuesta.json()["creados"]
+    return creados
+
+
+#Cada variante inscribe a su propio alumno, creado antes de medir
+async def crear_alumno(cliente, ci_alumno, args):
+    respuesta = await cliente.post("/alumnos", json=alumno(ci_alumno, args))
+    respuesta.raise_for_status()
+    token, _ = security.crear_token(ci_alumno)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def inscripciones_de_a_una(cliente, args):
+    ci_alumno = args.desde
+    headers = await crear_alumno(cliente, ci_alumno, args)
+    cola = list(range(args.clases, 0, -1))
+    correctas = 0
+
+    async def trabajador():
+        nonlocal correctas
+        while cola:
+            id_clase = cola.pop()
+            respuesta = await cliente.post(
+                "/inscribir_alumno", json={"id_clase": id_clase, "ci_alumno": ci_alumno}, headers=headers
+            )
+            correctas += respuesta.status_code == 200
+
+    await asyncio.gather(*(trabajador() for _ in range(args.concurrencia)))
+    return correctas
+
+
+async def inscripciones_en_lotes(cliente, args):
+    ci_alumno = args.desde + 1
+    headers = await crear_alumno(cliente, ci_alumno, args)
+    correctas = 0
+    for inicio in range(1, args.clases + 1, args.lote):
+        lote = [
+            {"id_clase": id_clase, "ci_alumno": ci_alumno}
+            for id_clase in range(inicio, min(inicio + args.lote, args.clases + 1))
+        ]
+        respuesta = await cliente.post("/inscribir_alumnos", json=lote, headers=headers)
+        respuesta.raise_for_status()
+        correctas += respuesta.json()["inscritos"]
+    return correctas
+
+
+#Cupo, lugares libres, filas de alumno_clase y contador de rollup_actividad de la clase
+def leer_clase(id_clase):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT c.cupo, c.cupos_disponibles, (SELECT COUNT(*) FROM alumno_clase ac WHERE ac.id_clase = c.id_clase), "
+            "IFNULL(r.cantidad_alumnos, 0) "
+            "FROM clase c LEFT JOIN rollup_actividad r ON r.id_actividad = c.id_actividad WHERE c.id_clase = %s",
+            (id_clase,),
+        )
+        fila = cursor.fetchone()
+        cursor.close()
+        return fila
+    finally:
+        db.close()
+
+
+def verificar_grupo(id_clase, antes, correctas):
+    cupo, libres, filas, cantidad_alumnos = leer_clase(id_clase)
+    problemas = []
+    if filas != correctas:
+        problemas.append(f"{filas} filas en alumno_clase y {correctas} inscripciones correctas")
+    if filas > cupo or libres != cupo - filas:
+        problemas.append(f"cupo {cupo}, {libres} libres con {filas} inscriptos")
+    if cantidad_alumnos - antes[3] != filas:
+        problemas.append(f"rollup_actividad sumo {cantidad_alumnos - antes[3]} con {filas} inscriptos")
+    for problema in problemas:
+        print(f"  FALLA clase {id_clase}: {problema}")
+    return not problemas
+
+
+#Cada variante usa una clase nueva; devuelve su id y como estaba antes de inscribir
+async def crear_clase_grupo(cliente, args):
+    respuesta = await cliente.post("/clases", json={
+        "nombre_actividad": f"{deportes[0]} 1",
+        "ci_instructor": ci_instructores,
+        "id_turno": 1,
+        "dictada": False,
+        "cupo": args.cupo or args.filas,
+    })
+    respuesta.raise_for_status()
+    id_clase = respuesta.json()["id_clase"]
+    args.clases_grupo.append(id_clase)
+    return id_clase, leer_clase(id_clase)
+
+
+def token_alumno(ci_alumno):
+    token, _ = security.crear_token(ci_alumno)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def grupo_de_a_uno(cliente, args):
+    id_clase, antes = await crear_clase_grupo(cliente, args)
+    cola = list(range(ci_alumnos + args.filas - 1, ci_alumnos - 1, -1))
+    correctas = 0
+
+    async def trabajador():
+        nonlocal correctas
+        while cola:
+            ci_alumno = cola.pop()
+            respuesta = await cliente.post(
+                "/inscribir_alumno", json={"id_clase": id_clase, "ci_alumno": ci_alumno}, headers=token_alumno(ci_alumno)
+            )
+            correctas += respuesta.status_code == 200
+
+    await asyncio.gather(*(trabajador() for _ in range(args.concurrencia)))
+    args.fallas += not verificar_grupo(id_clase, antes, correctas)
+    return correctas
+
+
+async def grupo_en_lotes(cliente, args):
+    id_clase, antes = await crear_clase_grupo(cliente, args)
+    token, _ = security.crear_token(ci_instructores, "escuela")
+    headers = {"Authorization": f"Bearer {token}"}
+    correctas = 0
+    for inicio in range(0, args.filas, args.lote):
+        lote = [
+            {"id_clase": id_clase, "ci_alumno": ci_alumnos + i}
+            for i in range(inicio, min(inicio + args.lote, args.filas))
+        ]
+        respuesta = await cliente.post("/inscribir_alumnos", json=lote, headers=headers)
+        respuesta.raise_for_status()
+        correctas += respuesta.json()["inscritos"]
+    args.fallas += not verificar_grupo(id_clase, antes, correctas)
+    return correctas
+
+
+#Desinscribe al grupo de la clase de la variante, asi los alumnos de datos.py quedan como estaban
+async def desinscribir_grupo(url, args):
+    if not args.clases_grupo:
+        return
+    id_clase = args.clases_grupo.pop()
+    cola = list(range(ci_alumnos, ci_alumnos + args.filas))
+    async with httpx.AsyncClient(base_url=url, timeout=300) as cliente:
+        async def trabajador():
+            while cola:
+                ci_alumno = cola.pop()
+                await cliente.delete(f"/desinscribir_alumno/{id_clase}/{ci_alumno}", headers=token_alumno(ci_alumno))
+
+        await asyncio.gather(*(trabajador() for _ in range(args.concurrencia)))
+
+
+async def borrar_alumno(url, ci_alumno):
+    async with httpx.AsyncClient(base_url=url, timeout=300) as cliente:
+        await cliente.delete(f"/alumnos/{ci_alumno}")
+
+
+def mostrar(nombre, filas, correctas, segundos):
+    print(f"  {nombre:<32} {filas:>7} {correctas:>9} {segundos:>9.2f} {filas / segundos:>10.1f}")
+    return filas / segundos
+
+
+async def main_async(args):
+    variantes = {
+        "alumnos": (
+            ("POST /alumnos de a uno", alumnos_de_a_uno, lambda: borrar_alumnos(args.desde, args.filas)),
+            ("POST /alumnos/importar", alumnos_en_lotes, lambda: borrar_alumnos(args.desde, args.filas)),
+        ),
+        "inscripciones": (
+            ("POST /inscribir_alumno de a una", inscripciones_de_a_una, lambda: borrar_alumno(args.url, args.desde)),
+            ("POST /inscribir_alumnos", inscripciones_en_lotes, lambda: borrar_alumno(args.url, args.desde + 1)),
+        ),
+        "grupo": (
+            ("POST /inscribir_alumno de a una", grupo_de_a_uno, lambda: desinscribir_grupo(args.url, args)),
+            ("POST /inscribir_alumnos escuela", grupo_en_lotes, lambda: desinscribir_grupo(args.url, args)),
+        ),
+    }[args.prueba]
+    filas = args.clases if args.prueba == "inscripciones" else args.filas
+
+    detalle = f"cupo {args.cupo or filas}" if args.prueba == "grupo" else f"{'sin' if args.sin_contraseña else 'con'} contraseña"
+    print(f"{args.prueba}: {filas} filas, {args.concurrencia} pedidos a la vez de a uno, lotes de {args.lote}, {detalle}")
+    print(f"  {'variante':<32} {'filas':>7} {'correctas':>9} {'segundos':>9} {'filas/s':>10}")
+    velocidades = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=300) as cliente:
+        for nombre, correr, limpiar in variantes:
+            try:
+                inicio = time.perf_counter()
+                correctas = await correr(cliente, args)
+                velocidades.append(mostrar(nombre, filas, correctas, time.perf_counter() - inicio))
+            finally:
+                limpieza = limpiar()
+                if asyncio.iscoroutine(limpieza):
+                    await limpieza
+    print(f"lotes / de a uno: {velocidades[1] / velocidades[0]:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de a una fila contra las rutas de lotes.")
+    parser.add_argument("prueba", choices=("alumnos", "inscripciones", "grupo"))
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--filas", type=int, help="alumnos a crear o a inscribir (5000, o 1000 en grupo)")
+    parser.add_argument("--clases", type=int, default=200, help="clases para inscripciones, las mismas que en datos.py")
+    parser.add_argument("--lote", type=int, default=1000, help="filas por pedido a la ruta de lotes (hasta 1000)")
+    parser.add_argument("--concurrencia", type=int, default=8, help="pedidos a la vez en la variante de a uno")
+    parser.add_argument("--cupo", type=int, help="cupo de la clase en grupo (por defecto uno por alumno)")
+    parser.add_argument("--desde", type=int, default=80000000, help="primera cedula, el rango tiene que estar libre")
+    parser.add_argument("--contraseña", default="benchmark", help="contraseña de los alumnos creados")
+    parser.add_argument("--sin-contraseña", action="store_true", help="crea los alumnos sin contraseña, sin hashear")
+    args = parser.parse_args()
+    args.filas = args.filas or (1000 if args.prueba == "grupo" else 5000)
+    args.clases_grupo = []
+    args.fallas = 0
+
+    asyncio.run(main_async(args))
+    return 1 if args.fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metrics import Metricas, MetricasMiddleware
+
+
+#Mide cuanto le agrega MetricasMiddleware a cada request: se llama una app ASGI minima con y sin el
+#middleware y se resta. La ruta se simula como la pone el router en el scope.
+#Uso: python benchmarks/metricas.py [--requests 200000]
+
+class Ruta:
+    path = "/clases_alumno/{ci_alumno}"
+
+
+async def app_minima(scope, receive, send):
+    scope["route"] = Ruta
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def recibir():
+    return {"type": "http.request", "body": b""}
+
+
+async def enviar(message):
+    pass
+
+
+async def medir(app, cantidad):
+    scope = {"type": "http", "method": "GET", "path": "/clases_alumno/1"}
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        await app(dict(scope), recibir, enviar)
+    return (time.perf_counter() - inicio) / cantidad
+
+
+async def main_async(cantidad):
+    con_metricas = MetricasMiddleware(app_minima, registro=Metricas())
+    await medir(app_minima, 1000)
+    await medir(con_metricas, 1000)
+    sin = await medir(app_minima, cantidad)
+    con = await medir(con_metricas, cantidad)
+    print(f"sin middleware  {sin * 1e6:6.2f} us por request")
+    print(f"con middleware  {con * 1e6:6.2f} us por request")
+    print(f"costo           {(con - sin) * 1e6:6.2f} us por request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo por request de MetricasMiddleware.")
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.requests))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
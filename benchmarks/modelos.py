@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse, adaptador, filas_a_modelos
+from schemas import AlumnoListadoResponse
+from serializacion import filas_alumnos, medir
+
+
+#Compara los caminos para pasar filas del cursor a una respuesta tipada:
+#  dict                   las filas tal cual, serializadas con jsonable_encoder o FastJSONResponse
+#  model_validate         un modelo por fila, validado desde Python
+#  model_construct        un modelo por fila sin validar
+#  filas_a_modelos        toda la lista validada en una sola llamada a pydantic-core
+#Uso: python benchmarks/modelos.py [--filas 10000] [--repeticiones 20]
+
+columnas = ("ci_alumno", "nombre", "apellido", "fecha_nacimiento", "telefono", "correo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de filas a modelos de respuesta.")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    dicts = [{columna: fila[columna] for columna in columnas} for fila in filas_alumnos(args.filas)]
+    tuplas = [tuple(fila.values()) for fila in dicts]
+    adapter = adaptador(AlumnoListadoResponse)
+    validar = AlumnoListadoResponse.model_validate
+    construir = AlumnoListadoResponse.model_construct
+
+    print(f"armar modelos, {args.filas} filas")
+    medir("model_validate por fila", lambda: [validar(fila) for fila in dicts], args.repeticiones)
+    medir("model_construct por fila", lambda: [construir(**fila) for fila in dicts], args.repeticiones)
+    medir("filas_a_modelos (dicts)", lambda: filas_a_modelos(AlumnoListadoResponse, dicts), args.repeticiones)
+    medir("filas_a_modelos (tuplas)", lambda: filas_a_modelos(AlumnoListadoResponse, tuplas, columnas), args.repeticiones)
+
+    print(f"\nfilas a JSON, {args.filas} filas")
+    medir("dict + jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(dicts)).body, args.repeticiones)
+    medir("dict + FastJSONResponse", lambda: FastJSONResponse(dicts).body, args.repeticiones)
+    medir(
+        "model_construct + dump_json",
+        lambda: adapter.dump_json([construir(**fila) for fila in dicts], exclude_unset=True),
+        args.repeticiones,
+    )
+    medir(
+        "filas_a_modelos + dump_json",
+        lambda: adapter.dump_json(filas_a_modelos(AlumnoListadoResponse, dicts), exclude_unset=True),
+        args.repeticiones,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import mysql.connector
+
+import security
+from consultas import calientes, consultas
+from database import get_db_connection
+from datos import ci_alumnos, ci_instructores, correo, deportes
+
+
+#Corre EXPLAIN de cada consulta de consultas.py contra una base con los datos de benchmarks/datos.py (o de
+#generador.py) y muestra el plan. Falla si una consulta caliente recorre una tabla entera o usa filesort
+#sin tenerlo permitido en consultas.calientes, si alguna consulta ya no corre, o si falta su ejemplo aca.
+#Uso: python benchmarks/planes.py [nombre ...]
+
+alumno = ci_alumnos
+instructor = ci_instructores
+columnas_alumnos = "ci_alumno, nombre, apellido, fecha_nacimiento, telefono, correo"
+
+#Valores de los {campos} de las plantillas
+plantillas = {
+    "pagina_todo": {"columnas": columnas_alumnos, "tabla": "alumnos", "clave": "ci_alumno"},
+    "pagina_primera": {"columnas": columnas_alumnos, "tabla": "alumnos", "clave": "ci_alumno"},
+    "pagina_siguiente": {"columnas": columnas_alumnos, "tabla": "alumnos", "clave": "ci_alumno"},
+    "contar_tabla": {"tabla": "alumnos"},
+    "actualizar_actividad": {"campos": "costo = %s"},
+    "alumnos_existentes": {"marcas": "%s, %s, %s"},
+    "actualizar_alumno": {"campos": "nombre = %s"},
+    "actualizar_login_alumno": {"campos": "correo = %s"},
+    "exportar": {"columnas": "id_clase, ci_alumno, id_equipamiento", "tabla": "alumno_clase"},
+}
+
+#Parametros de cada consulta, con filas que existen en los datos de prueba para que el plan sea el real
+ejemplos = {
+    "pagina_todo": (),
+    "pagina_primera": (100,),
+    "pagina_siguiente": (alumno + 1000, 100),
+    "contar_tabla": (),
+    "insertar_actividad": ("Actividad nueva", "Actividad de prueba", 1000),
+    "borrar_clases_actividad": (1,),
+    "borrar_actividad": (1,),
+    "actualizar_actividad": (1500, 1),
+    "actividades_populares": (),
+    "ingresos_totales": (),
+    "turnos": (),
+    "insertar_turno": ("07:00:00", "08:30:00"),
+    "borrar_turno": (1,),
+    "turnos_clases": (),
+    "insertar_alumno": (alumno - 1, "Ana", "Perez", "2000-01-01", "099000000", "nuevo@bench.uy", None),
+    "alumnos_existentes": (alumno, alumno + 1, alumno + 2),
+    "buscar_alumno": (alumno,),
+    "borrar_alumno": (alumno,),
+    "actualizar_alumno": ("Ana", alumno),
+    "actualizar_login_alumno": (correo(alumno), alumno),
+    "buscar_instructor": (instructor,),
+    "insertar_instructor": (instructor - 1, "Hugo", "Gomez"),
+    "borrar_instructor": (instructor,),
+    "insertar_login": ("nuevo@bench.uy", None, alumno),
+    "buscar_login": (alumno,),
+    "borrar_login": (alumno,),
+    "credenciales_login": (correo(alumno),),
+    "credenciales_alumno": (correo(alumno),),
+    "actualizar_contraseña_login": ("hash", correo(alumno)),
+    "actualizar_contraseña_alumno": ("hash", alumno, security.algoritmo + "$%"),
+    "cronograma": (),
+    "cronograma_clase": (1,),
+    "cronograma_actividad": (1,),
+    "reservar_cupo": (1,),
+    "cupos_clase": (1,),
+    "liberar_cupo": (1,),
+    "insertar_inscripcion": (1, alumno),
+    "insertar_inscripcion_equipamiento": (1, alumno, 1),
+    "borrar_inscripcion": (alumno, 1),
+    "inscripciones_alumno": (alumno,),
+    "borrar_inscripciones_alumno": (alumno,),
+    "clases_alumno": (alumno,),
+    "actividad_por_nombre": (f"{deportes[0]} 1",),
+    "insertar_clase": (instructor, 1, 1, False, 20, 20),
+    "primero_lista_espera": (1,),
+    "borrar_espera": (1,),
+    "posicion_lista_espera": (1, alumno),
+    "estado_clase_espera": (alumno, 1),
+    "insertar_espera": (1, alumno, None),
+    "salir_lista_espera": (1, alumno),
+    "borrar_esperas_alumno": (alumno,),
+    "exportar": (),
+    "rollup_sumar_alumno": (1, 1, 1),
+    "rollup_sumar_clase": (1,),
+    "rollup_quitar_actividad": (1,),
+    "rollup_borrar_actividad": (1,),
+    "rollup_borrar_turno": (1,),
+    "rollup_quitar_alumnos_turno": (1,),
+    "rollup_quitar_alumnos_instructor": (instructor,),
+    "rollup_quitar_clases_instructor": (instructor,),
+    "rollup_quitar_alumno": (alumno,),
+    "rollup_recalcular_ingresos": (1,),
+}
+
+
+def explicar(cursor, nombre):
+    sentencia = consultas[nombre].format(**plantillas.get(nombre, {}))
+    cursor.execute("EXPLAIN " + sentencia, ejemplos[nombre] or None)
+    return cursor.fetchall()
+
+
+#Lo que el plan de una consulta caliente hace sin tenerlo permitido
+def problemas(plan, permitido):
+    resultado = []
+    recorridas = []
+    for fila in plan:
+        #la fila de la tabla donde se inserta figura como ALL aunque no la lee
+        if fila["select_type"] in ("INSERT", "REPLACE"):
+            continue
+        if fila["type"] in ("ALL", "index"):
+            recorridas.append(fila["table"])
+            if fila["table"] not in permitido.get("recorre", ()):
+                resultado.append(f"recorre {fila['table']} entera (type {fila['type']})")
+        if "Using filesort" in (fila["Extra"] or "") and not permitido.get("filesort"):
+            resultado.append(f"ordena {fila['table']} con filesort")
+    if len(recorridas) > 1:
+        resultado.append(f"recorre mas de una tabla entera ({', '.join(recorridas)})")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Revisa el plan de las consultas de consultas.py con EXPLAIN.")
+    parser.add_argument("nombres", nargs="*", help="solo estas consultas (por defecto todas)")
+    args = parser.parse_args()
+
+    sin_ejemplo = [nombre for nombre in consultas if nombre not in ejemplos]
+    sobrantes = [nombre for nombre in ejemplos if nombre not in consultas]
+    for nombre in sin_ejemplo:
+        print(f"FALLA {nombre}: no tiene ejemplo en benchmarks/planes.py")
+    for nombre in sobrantes:
+        print(f"FALLA {nombre}: tiene ejemplo pero no esta en consultas.py")
+
+    nombres = args.nombres or [nombre for nombre in consultas if nombre in ejemplos]
+    fallas = len(sin_ejemplo) + len(sobrantes)
+    db = get_db_connection()
+    try:
+        cursor = db.cursor(dictionary=True)
+        for nombre in nombres:
+            caliente = nombre in calientes
+            print(f"{nombre}{' (caliente)' if caliente else ''}")
+            try:
+                plan = explicar(cursor, nombre)
+            except (KeyError, mysql.connector.Error) as e:
+                print(f"    FALLA no se pudo explicar: {e}")
+                fallas += 1
+                continue
+            for fila in plan:
+                print(
+                    f"    {fila['table'] or '-':<20} {fila['type'] or '-':<8} {fila['key'] or '-':<26} "
+                    f"rows={fila['rows']} {fila['Extra'] or ''}"
+                )
+            if caliente:
+                encontrados = problemas(plan, calientes[nombre])
+                for problema in encontrados:
+                    print(f"    FALLA {problema}")
+                fallas += bool(encontrados)
+        cursor.close()
+    finally:
+        db.close()
+
+    print(f"{len(nombres)} consultas, {fallas} con problemas")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import argparse
+import concurrent.futures
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+os.environ.setdefault("SCHEMA_CHECK", "off")
+
+import security
+from consultas import consultas
+from database import get_db_connection
+from main import insertar_alumno
+from schemas import AlumnoPost
+
+
+#Registros por segundo contra la base (DB_*), con el flujo anterior de register_alumno y con el actual:
+#  antes    SELECT de la cedula, INSERT en alumnos, commit, INSERT en login, commit
+#  despues  insertar_alumno de main.py: INSERT en alumnos y en login con un solo commit, el duplicado sale del INSERT
+#Las dos variantes usan la misma contraseña ya hasheada, asi se mide solo el trabajo contra la base.
+#Los alumnos se crean con cedulas desde --desde y se borran al terminar.
+#Uso: python benchmarks/registro.py [--registros 2000] [--hilos 8] [--desde 90000000]
+
+def alumno(ci_alumno, contraseña):
+    return AlumnoPost(
+        ci_alumno=ci_alumno,
+        nombre="Ana",
+        apellido="Perez",
+        fecha_nacimiento=datetime.date(2000, 1, 1),
+        telefono="099000000",
+        correo=f"registro{ci_alumno}@bench.uy",
+        contraseña=contraseña,
+    )
+
+
+def registrar_antes(nuevo):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute(consultas["buscar_alumno"], (nuevo.ci_alumno,))
+        if cursor.fetchone():
+            raise RuntimeError(f"El alumno {nuevo.ci_alumno} ya existe")
+        cursor.execute(consultas["insertar_alumno"], (
+            nuevo.ci_alumno, nuevo.nombre, nuevo.apellido, nuevo.fecha_nacimiento, nuevo.telefono, nuevo.correo,
+            nuevo.contraseña,
+        ))
+        db.commit()
+        cursor.execute(consultas["insertar_login"], (nuevo.correo, nuevo.contraseña, nuevo.ci_alumno))
+        db.commit()
+        cursor.close()
+    finally:
+        db.close()
+
+
+def registrar_despues(nuevo):
+    db = get_db_connection()
+    try:
+        insertar_alumno(db, nuevo, crear_login=True)
+    finally:
+        db.close()
+
+
+def borrar(desde, cantidad):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        cursor.execute("DELETE FROM alumnos WHERE ci_alumno >= %s AND ci_alumno < %s", (desde, desde + cantidad))
+        db.commit()
+        cursor.close()
+    finally:
+        db.close()
+
+
+def medir(nombre, registrar, alumnos, hilos):
+    inicio = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(hilos) as executor:
+        list(executor.map(registrar, alumnos))
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<10} {len(alumnos):>8} {segundos:>9.2f} {len(alumnos) / segundos:>12.1f}")
+    return len(alumnos) / segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registros por segundo antes y despues de la transaccion unica.")
+    parser.add_argument("--registros", type=int, default=2000)
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--desde", type=int, default=90000000, help="primera cedula, el rango tiene que estar libre")
+    args = parser.parse_args()
+
+    contraseña = security.hash_password("benchmark")
+    print(f"{args.registros} registros con {args.hilos} hilos")
+    print(f"  {'flujo':<10} {'registros':>8} {'segundos':>9} {'registros/s':>12}")
+    resultados = {}
+    for nombre, registrar in (("antes", registrar_antes), ("despues", registrar_despues)):
+        alumnos = [alumno(args.desde + i, contraseña) for i in range(args.registros)]
+        try:
+            resultados[nombre] = medir(nombre, registrar, alumnos, args.hilos)
+        finally:
+            borrar(args.desde, args.registros)
+    print(f"despues / antes: {resultados['despues'] / resultados['antes']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import argparse
+import datetime
+import decimal
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from responses import FastJSONResponse, orjson
+from schemas import ActividadCantidad
+
+
+#Compara cuanto tarda serializar un listado grande con cada camino:
+#  jsonable_encoder + json.dumps  (lo que hace FastAPI por defecto)
+#  FastJSONResponse.render        (orjson o json directo, sin jsonable_encoder)
+#  TypeAdapter.dump_json          (filas validadas contra el response_model y serializadas por pydantic)
+#Uso: python benchmarks/serializacion.py [--filas 10000] [--repeticiones 20]
+
+def filas_alumnos(cantidad):
+    return [
+        {
+            "ci_alumno": 10000000 + i,
+            "nombre": f"Nombre{i}",
+            "apellido": f"Apellido{i}",
+            "fecha_nacimiento": datetime.date(2000, 1, 1) + datetime.timedelta(days=i % 7000),
+            "telefono": f"09{i:07}",
+            "correo": f"alumno{i}@correo.com",
+            "saldo": decimal.Decimal(i % 1000) / 100,
+        }
+        for i in range(cantidad)
+    ]
+
+
+def filas_populares(cantidad):
+    return [{"actividad": f"Actividad{i}", "cantidad_alumnos": i} for i in range(cantidad)]
+
+
+def medir(nombre, funcion, repeticiones):
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    promedio = (time.perf_counter() - inicio) / repeticiones * 1000
+    print(f"  {nombre:<40} {promedio:8.2f} ms")
+    return promedio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de serializacion de listados.")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"orjson: {'si' if orjson is not None else 'no (se usa json)'}")
+
+    alumnos = filas_alumnos(args.filas)
+    print(f"\nalumnos, {args.filas} filas")
+    medir("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(alumnos)).body, args.repeticiones)
+    medir("FastJSONResponse", lambda: FastJSONResponse(alumnos).body, args.repeticiones)
+
+    populares = filas_populares(args.filas)
+    adapter = TypeAdapter(list[ActividadCantidad])
+    print(f"\nactividades/populares, {args.filas} filas")
+    medir(
+        "validar + jsonable_encoder + JSONResponse",
+        lambda: JSONResponse(jsonable_encoder(adapter.validate_python(populares))).body,
+        args.repeticiones,
+    )
+    medir("TypeAdapter.dump_json", lambda: adapter.dump_json(adapter.validate_python(populares)), args.repeticiones)
+
+    #los dos caminos tienen que dar el mismo JSON
+    assert json.loads(FastJSONResponse(alumnos).body) == json.loads(JSONResponse(jsonable_encoder(alumnos)).body)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+#Cache en memoria con vencimiento por tiempo, separada por espacios (uno por tabla).
+#Cada espacio tiene una generacion que sube al invalidarlo; un valor que se empezo a cargar antes de
+#una invalidacion no se guarda, asi una lectura lenta no deja datos viejos despues de una escritura.
+#Las claves salen de parametros del cliente (la pagina pedida), asi que hay a lo sumo max_entries
+#entradas entre todos los espacios; al pasarse se descarta la que hace mas tiempo que no se lee.
+class TTLCache:
+    def __init__(self, ttl=300.0, enabled=True, max_entries=1000):
+        self.ttl = ttl
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  #(espacio, clave) -> (vence, valor), de la menos a la mas usada
+        self._generations = {}      #espacio -> int
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, namespace, key):
+        #devuelve (encontrado, valor, generacion)
+        with self._lock:
+            generation = self._generations.get(namespace, 0)
+            if self.enabled:
+                entry = self._data.get((namespace, key))
+                if entry is not None and entry[0] > time.monotonic():
+                    self._data.move_to_end((namespace, key))
+                    self.hits += 1
+                    return True, entry[1], generation
+            self.misses += 1
+            return False, None, generation
+
+    def set(self, namespace, key, value, generation):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return
+            self._data[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                self.invalidations += 1
+            for entry in [entry for entry in self._data if entry[0] in namespaces]:
+                del self._data[entry]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+            }
+
+
+#Cache de las tablas de catalogo (actividades, turnos, equipamiento, instructores).
+#CATALOG_CACHE=0 la desactiva en un despliegue; CATALOG_CACHE_TTL define los segundos de vida y
+#CATALOG_CACHE_MAX_ENTRIES cuantas paginas se guardan como mucho.
+catalog_cache = TTLCache(
+    ttl=float(os.getenv("CATALOG_CACHE_TTL", "300")),
+    enabled=os.getenv("CATALOG_CACHE", "1") == "1",
+    max_entries=int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "1000")),
+)
@@ -0,0 +1,315 @@
+#Registro de las sentencias SQL que corren al atender una request: main.py, el cronograma (timetable.py) y
+#los contadores de rollup (rollups.py) las toman de aca por nombre. benchmarks/planes.py corre EXPLAIN de
+#cada una contra una base con datos y falla si alguna de las calientes deja de usar indices.
+#Las que llevan {campo} son plantillas: la ruta completa las columnas o la tabla con .format() y los
+#valores siempre van como parametros %s.
+
+import re
+
+
+#Las horas de los turnos se pasan a texto en MySQL con CAST(... AS CHAR), que da HH:MM:SS con al menos
+#dos digitos de hora (09:00:00), respeta el signo y las horas de mas de 24 (un TIME va de -838:59:59 a
+#838:59:59). Asi no se convierte fila por fila en Python.
+cronograma = """
+    SELECT
+        c.id_clase,
+        c.id_actividad,
+        a.nombre AS nombre_actividad,
+        a.costo AS costo_actividad,
+        i.nombre AS nombre_instructor,
+        CAST(t.hora_inicio AS CHAR) AS hora_inicio,
+        CAST(t.hora_fin AS CHAR) AS hora_fin,
+        c.ci_instructor,
+        c.id_turno
+    FROM
+        clase c
+    JOIN
+        actividades a ON c.id_actividad = a.id_actividad
+    JOIN
+        instructores i ON c.ci_instructor = i.ci_instructor
+    JOIN
+        turnos t ON c.id_turno = t.id_turno
+"""
+
+consultas = {
+    #Paginacion
+    "pagina_todo": "SELECT {columnas} FROM {tabla} ORDER BY {clave}",
+    "pagina_primera": "SELECT {columnas} FROM {tabla} ORDER BY {clave} LIMIT %s",
+    "pagina_siguiente": "SELECT {columnas} FROM {tabla} WHERE {clave} > %s ORDER BY {clave} LIMIT %s",
+    "contar_tabla": "SELECT COUNT(*) AS total FROM {tabla}",
+
+    #Actividades
+    "insertar_actividad": """
+        INSERT INTO actividades (nombre, descripcion, costo)
+        VALUES (%s, %s, %s)
+    """,
+    "borrar_clases_actividad": "DELETE FROM clase WHERE id_actividad = %s",
+    "borrar_actividad": "DELETE FROM actividades WHERE id_actividad = %s",
+    "actualizar_actividad": "UPDATE actividades SET {campos} WHERE id_actividad = %s",
+    #los contadores los mantienen inscribir_alumno y desinscribir_alumno (ver rollups.py)
+    "actividades_populares": """
+        SELECT
+            a.nombre AS actividad,
+            r.cantidad_alumnos
+        FROM
+            rollup_actividad r
+        JOIN
+            actividades a ON a.id_actividad = r.id_actividad
+        WHERE
+            r.cantidad_alumnos > 0
+        ORDER BY
+            r.cantidad_alumnos DESC
+    """,
+    "ingresos_totales": """
+        SELECT
+            a.nombre AS actividad,
+            r.ingresos_totales
+        FROM
+            rollup_actividad r
+        JOIN
+            actividades a ON a.id_actividad = r.id_actividad
+        ORDER BY
+            r.ingresos_totales DESC
+    """,
+
+    #Turnos
+    #las horas vienen como texto HH:MM:SS (ver cronograma)
+    "turnos": "SELECT id_turno, CAST(hora_inicio AS CHAR), CAST(hora_fin AS CHAR) FROM turnos",
+    "insertar_turno": """
+        INSERT INTO turnos (hora_inicio, hora_fin)
+        VALUES (%s, %s)
+    """,
+    "borrar_turno": "DELETE FROM turnos WHERE id_turno = %s",
+    "turnos_clases": """
+        SELECT
+            CONCAT(DATE_FORMAT(t.hora_inicio, '%H:%i'), ' - ', DATE_FORMAT(t.hora_fin, '%H:%i')) AS turno,
+            r.clases_dictadas
+        FROM
+            rollup_turno r
+        JOIN
+            turnos t ON t.id_turno = r.id_turno
+        WHERE
+            r.clases_dictadas > 0
+        ORDER BY
+            r.clases_dictadas DESC
+    """,
+
+    #Alumnos
+    "insertar_alumno": """
+        INSERT INTO alumnos (ci_alumno, nombre, apellido, fecha_nacimiento, telefono, correo, contraseña)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """,
+    "alumnos_existentes": "SELECT ci_alumno FROM alumnos WHERE ci_alumno IN ({marcas})",
+    "buscar_alumno": "SELECT * FROM alumnos WHERE ci_alumno = %s",
+    "borrar_alumno": "DELETE FROM alumnos WHERE ci_alumno = %s",
+    "actualizar_alumno": "UPDATE alumnos SET {campos} WHERE ci_alumno = %s",
+    "actualizar_login_alumno": "UPDATE login SET {campos} WHERE ci_alumno = %s",
+
+    #Instructores
+    "buscar_instructor": "SELECT ci_instructor FROM instructores WHERE ci_instructor = %s",
+    "insertar_instructor": """
+        INSERT INTO instructores (ci_instructor, nombre, apellido)
+        VALUES (%s, %s, %s)
+    """,
+    "borrar_instructor": "DELETE FROM instructores WHERE ci_instructor = %s",
+
+    #Login
+    "insertar_login": "INSERT INTO login (correo, contraseña, ci_alumno) VALUES (%s, %s, %s)",
+    "buscar_login": "SELECT * FROM login WHERE ci_alumno = %s",
+    "borrar_login": "DELETE FROM login WHERE ci_alumno = %s",
+    #por correo: idx_login_correo e idx_alumnos_correo (migraciones/0002_credenciales.sql)
+    "credenciales_login": "SELECT ci_alumno, contraseña FROM login WHERE correo = %s",
+    "credenciales_alumno": "SELECT ci_alumno, contraseña FROM alumnos WHERE correo = %s",
+    "actualizar_contraseña_login": "UPDATE login SET contraseña = %s WHERE correo = %s",
+    "actualizar_contraseña_alumno": "UPDATE alumnos SET contraseña = %s WHERE ci_alumno = %s AND contraseña NOT LIKE %s",
+
+    #Clases
+    "cronograma": cronograma,
+    "cronograma_clase": cronograma + " WHERE c.id_clase = %s",
+    "cronograma_actividad": cronograma + " WHERE c.id_actividad = %s",
+    "reservar_cupo": "UPDATE clase SET cupos_disponibles = cupos_disponibles - 1 WHERE id_clase = %s AND cupos_disponibles > 0",
+    "cupos_clase": "SELECT cupos_disponibles FROM clase WHERE id_clase = %s",
+    "liberar_cupo": "UPDATE clase SET cupos_disponibles = cupos_disponibles + 1 WHERE id_clase = %s AND cupos_disponibles < cupo",
+    "insertar_inscripcion": """
+        INSERT INTO alumno_clase (id_clase, ci_alumno)
+        VALUES (%s, %s)
+    """,
+    "insertar_inscripcion_equipamiento": """
+        INSERT INTO alumno_clase (id_clase, ci_alumno, id_equipamiento)
+        VALUES (%s, %s, %s)
+    """,
+    "borrar_inscripcion": "DELETE FROM alumno_clase WHERE ci_alumno = %s AND id_clase = %s",
+    #al borrar un alumno: sus clases en orden, para liberar y promover clase por clase (ver delete_alumno)
+    "inscripciones_alumno": "SELECT id_clase FROM alumno_clase WHERE ci_alumno = %s ORDER BY id_clase FOR UPDATE",
+    "borrar_inscripciones_alumno": "DELETE FROM alumno_clase WHERE ci_alumno = %s",
+    "clases_alumno": """
+        SELECT
+            ac.id_clase,
+            a.nombre AS nombre_actividad,
+            i.nombre AS nombre_instructor,
+            CAST(t.hora_inicio AS CHAR) AS hora_inicio,
+            CAST(t.hora_fin AS CHAR) AS hora_fin
+        FROM
+            alumno_clase ac
+        JOIN
+            clase c ON ac.id_clase = c.id_clase
+        JOIN
+            actividades a ON c.id_actividad = a.id_actividad
+        JOIN
+            instructores i ON c.ci_instructor = i.ci_instructor
+        JOIN
+            turnos t ON c.id_turno = t.id_turno
+        WHERE
+            ac.ci_alumno = %s
+    """,
+    "actividad_por_nombre": "SELECT id_actividad FROM actividades WHERE nombre = %s",
+    "insertar_clase": """
+        INSERT INTO clase (ci_instructor, id_actividad, id_turno, dictada, cupo, cupos_disponibles)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+
+    #Lista de espera
+    "primero_lista_espera": """
+        SELECT id_espera, ci_alumno, id_equipamiento FROM lista_espera
+        WHERE id_clase = %s ORDER BY id_espera LIMIT 1 FOR UPDATE
+    """,
+    "borrar_espera": "DELETE FROM lista_espera WHERE id_espera = %s",
+    "posicion_lista_espera": """
+        SELECT COUNT(*) FROM lista_espera yo
+        JOIN lista_espera le ON le.id_clase = yo.id_clase AND le.id_espera <= yo.id_espera
+        WHERE yo.id_clase = %s AND yo.ci_alumno = %s
+    """,
+    #FOR SHARE espera a una desinscripcion en curso, asi se ve el cupo que pueda liberar
+    "estado_clase_espera": """
+        SELECT
+            c.cupos_disponibles,
+            EXISTS(SELECT 1 FROM alumno_clase ac WHERE ac.id_clase = c.id_clase AND ac.ci_alumno = %s)
+        FROM clase c
+        WHERE c.id_clase = %s
+        FOR SHARE
+    """,
+    "insertar_espera": "INSERT INTO lista_espera (id_clase, ci_alumno, id_equipamiento) VALUES (%s, %s, %s)",
+    "salir_lista_espera": "DELETE FROM lista_espera WHERE id_clase = %s AND ci_alumno = %s",
+    "borrar_esperas_alumno": "DELETE FROM lista_espera WHERE ci_alumno = %s",
+
+    #Exportacion
+    "exportar": "SELECT {columnas} FROM {tabla}",
+
+    #Rollups
+    "rollup_sumar_alumno": """
+        INSERT INTO rollup_actividad (id_actividad, cantidad_alumnos)
+        SELECT id_actividad, GREATEST(%s, 0) FROM clase WHERE id_clase = %s
+        ON DUPLICATE KEY UPDATE cantidad_alumnos = cantidad_alumnos + %s
+    """,
+    "rollup_sumar_clase": """
+        INSERT INTO rollup_turno (id_turno, clases_dictadas) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE clases_dictadas = clases_dictadas + 1
+    """,
+    "rollup_quitar_actividad": """
+        UPDATE rollup_turno r
+        JOIN (SELECT id_turno, COUNT(*) AS cantidad FROM clase WHERE id_actividad = %s GROUP BY id_turno) c
+            ON r.id_turno = c.id_turno
+        SET r.clases_dictadas = r.clases_dictadas - c.cantidad
+    """,
+    "rollup_borrar_actividad": "DELETE FROM rollup_actividad WHERE id_actividad = %s",
+    "rollup_borrar_turno": "DELETE FROM rollup_turno WHERE id_turno = %s",
+    #inscriptos en las clases que se van a borrar en cascada, restados de cada actividad
+    "rollup_quitar_alumnos_turno": """
+        UPDATE rollup_actividad r
+        JOIN (SELECT c.id_actividad, COUNT(*) AS cantidad FROM clase c
+              JOIN alumno_clase ac ON ac.id_clase = c.id_clase
+              WHERE c.id_turno = %s GROUP BY c.id_actividad) c
+            ON r.id_actividad = c.id_actividad
+        SET r.cantidad_alumnos = r.cantidad_alumnos - c.cantidad
+    """,
+    "rollup_quitar_alumnos_instructor": """
+        UPDATE rollup_actividad r
+        JOIN (SELECT c.id_actividad, COUNT(*) AS cantidad FROM clase c
+              JOIN alumno_clase ac ON ac.id_clase = c.id_clase
+              WHERE c.ci_instructor = %s GROUP BY c.id_actividad) c
+            ON r.id_actividad = c.id_actividad
+        SET r.cantidad_alumnos = r.cantidad_alumnos - c.cantidad
+    """,
+    "rollup_quitar_clases_instructor": """
+        UPDATE rollup_turno r
+        JOIN (SELECT id_turno, COUNT(*) AS cantidad FROM clase WHERE ci_instructor = %s GROUP BY id_turno) c
+            ON r.id_turno = c.id_turno
+        SET r.clases_dictadas = r.clases_dictadas - c.cantidad
+    """,
+    "rollup_quitar_alumno": """
+        UPDATE rollup_actividad r
+        JOIN (SELECT c.id_actividad, COUNT(*) AS cantidad FROM alumno_clase ac
+              JOIN clase c ON c.id_clase = ac.id_clase
+              WHERE ac.ci_alumno = %s GROUP BY c.id_actividad) c
+            ON r.id_actividad = c.id_actividad
+        SET r.cantidad_alumnos = r.cantidad_alumnos - c.cantidad
+    """,
+    "rollup_recalcular_ingresos": """
+        INSERT INTO rollup_actividad (id_actividad, ingresos_totales)
+        SELECT a.id_actividad, SUM(a.costo + IFNULL(e.costo, 0))
+        FROM actividades a
+        LEFT JOIN equipamiento e ON a.id_actividad = e.id_actividad
+        WHERE a.id_actividad = %s
+        GROUP BY a.id_actividad
+        ON DUPLICATE KEY UPDATE ingresos_totales = VALUES(ingresos_totales)
+    """,
+}
+
+#Consultas calientes y lo que se les permite en el plan (lo revisa benchmarks/planes.py). Por defecto
+#cada tabla se lee por indice (nada de type ALL ni index) y no hay "Using filesort". "recorre" son las
+#tablas que pueden leerse enteras, y aun asi solo una por consulta: la que arranca el join, el resto
+#tiene que entrar por clave. Los rankings de rollup recorren y ordenan tablas de una fila por actividad
+#o turno, por eso se les permite el filesort.
+calientes = {
+    "pagina_siguiente": {},
+    "cronograma": {"recorre": ("c", "a", "i", "t")},
+    "cronograma_clase": {},
+    "cronograma_actividad": {},
+    "clases_alumno": {},
+    "reservar_cupo": {},
+    "cupos_clase": {},
+    "liberar_cupo": {},
+    "insertar_inscripcion": {},
+    "insertar_inscripcion_equipamiento": {},
+    "borrar_inscripcion": {},
+    "estado_clase_espera": {},
+    "primero_lista_espera": {},
+    "posicion_lista_espera": {},
+    "credenciales_login": {},
+    "credenciales_alumno": {},
+    "rollup_sumar_alumno": {},
+    "rollup_sumar_clase": {},
+    "rollup_recalcular_ingresos": {},
+    "actividades_populares": {"recorre": ("r", "a"), "filesort": True},
+    "ingresos_totales": {"recorre": ("r", "a"), "filesort": True},
+    "turnos_clases": {"recorre": ("r", "t"), "filesort": True},
+}
+
+
+#Nombre en el registro de una sentencia tal como llega al cursor (las plantillas ya completadas), o None
+#si no es de aca. Lo usan el log de consultas lentas (instrumentation.py) y la base falsa de los tests.
+def normalizar(sentencia):
+    return " ".join(sentencia.split())
+
+
+_exactas = {}
+_plantillas = []
+for _nombre, _sentencia in consultas.items():
+    if "{" in _sentencia:
+        _partes = re.split(r"\\\{\w+\\\}", re.escape(normalizar(_sentencia)))
+        _plantillas.append((re.compile("^" + ".+?".join(_partes) + "$"), _nombre))
+    else:
+        _exactas[normalizar(_sentencia)] = _nombre
+#primero las plantillas con mas texto fijo: "SELECT {columnas} FROM {tabla} ORDER BY {clave}" tambien
+#calza con la version paginada si se prueba antes
+_plantillas.sort(key=lambda plantilla: -len(plantilla[0].pattern))
+
+
+def nombre_de(sentencia):
+    sentencia = normalizar(sentencia)
+    if sentencia in _exactas:
+        return _exactas[sentencia]
+    for patron, nombre in _plantillas:
+        if patron.match(sentencia):
+            return nombre
+    return None
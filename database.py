@@ -1,4 +1,11 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
 import mysql.connector
+from mysql.connector.errors import PoolError
 
 db_config = {
     "host": "localhost",
@@ -7,9 +14,190 @@ db_config = {
     "database": "obligatorio2024",
 }
 
+#Configuracion del pool, se puede cambiar por variables de entorno en cada despliegue
+pool_config = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),            #conexiones que se mantienen abiertas
+    "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),  #conexiones extra en picos, se cierran al devolverse
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),          #segundos esperando una conexion libre
+    "recycle": float(os.getenv("DB_POOL_RECYCLE", "1800")),        #vida maxima de una conexion en segundos
+    "ping_after": float(os.getenv("DB_POOL_PING_AFTER", "5")),     #si estuvo ociosa mas que esto se le hace ping
+    "reset_session": os.getenv("DB_POOL_RESET_SESSION", "1") == "1",
+}
+
+
+class PooledConnection:
+    #Envuelve la conexion de mysql; close() la devuelve al pool en vez de cerrarla
+    __slots__ = ("_pool", "_raw", "_created", "_discard")
+
+    def __init__(self, pool, raw, created):
+        self._pool = pool
+        self._raw = raw
+        self._created = created
+        self._discard = False
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.errors.OperationalError("La conexion ya fue devuelta al pool")
+        return getattr(self._raw, name)
+
+    def close(self):
+        #se puede llamar mas de una vez (las rutas y get_db la cierran)
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created, self._discard)
+
+    def invalidate(self):
+        #al devolverla se cierra en vez de volver al pool (por ejemplo si quedaron filas sin leer)
+        self._discard = True
+
+
+class ConnectionPool:
+    def __init__(self, config, pool_size=10, max_overflow=10, timeout=30.0,
+                 recycle=1800.0, ping_after=5.0, reset_session=True):
+        self._config = config
+        self._pool_size = pool_size
+        self._max_overflow = max_overflow
+        self._timeout = timeout
+        self._recycle = recycle
+        self._ping_after = ping_after
+        self._reset_session = reset_session
+
+        self._cond = threading.Condition()
+        self._idle = deque()  #(conexion, creada, ultimo_uso)
+        self._opened = 0      #conexiones abiertas, ociosas + en uso
+        self._in_use = 0
+        self._waiting = 0
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        deadline = start + self._timeout
+        entry = None
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()  #LIFO, reusa la conexion mas reciente
+                        break
+                    if self._opened < self._pool_size + self._max_overflow:
+                        self._opened += 1
+                        break
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolError(f"No hay conexiones libres luego de {self._timeout} segundos")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            raw, created = self._checkout(entry)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.perf_counter() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+        return PooledConnection(self, raw, created)
+
+    def _checkout(self, entry):
+        #abre una conexion nueva o valida la que estaba ociosa
+        if entry is not None:
+            raw, created, last_used = entry
+            now = time.monotonic()
+            if now - created > self._recycle:
+                self._discard(raw)
+            elif now - last_used > self._ping_after and not raw.is_connected():
+                self._discard(raw)
+            else:
+                return raw, created
+        return mysql.connector.connect(**self._config), time.monotonic()
+
+    def _discard(self, raw):
+        with self._cond:
+            self._discarded += 1
+        try:
+            raw.close()
+        except mysql.connector.Error:
+            pass
+
+    def _release(self, raw, created, discard=False):
+        keep = not discard
+        if keep:
+            try:
+                #limpia lo que haya dejado la request: transaccion abierta, variables de sesion, tablas temporales
+                if self._reset_session:
+                    raw.reset_session()
+                else:
+                    raw.rollback()
+            except mysql.connector.Error:
+                keep = False
+
+        with self._cond:
+            self._in_use -= 1
+            if keep and len(self._idle) < self._pool_size:
+                self._idle.append((raw, created, time.monotonic()))
+                raw = None
+            else:
+                self._opened -= 1
+            self._cond.notify()
+
+        if raw is not None:
+            self._discard(raw)
+
+    def dispose(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+        for raw, _, _ in idle:
+            try:
+                raw.close()
+            except mysql.connector.Error:
+                pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                "pool_size": self._pool_size,
+                "max_overflow": self._max_overflow,
+                "opened": self._opened,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "checkout_avg_ms": (self._wait_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                "checkout_max_ms": self._wait_max * 1000,
+            }
+
+
+pool = ConnectionPool(db_config, **pool_config)
+
+#Cantidad maxima de conexiones en uso a la vez; get_db espera aca sin bloquear el event loop
+pool_capacity = pool_config["pool_size"] + pool_config["max_overflow"]
+db_slots = asyncio.Semaphore(pool_capacity)
+
+
 def get_db_connection():
     try:
-        connection = mysql.connector.connect(**db_config)
+        connection = pool.connect()
         return connection
     except mysql.connector.Error as e:
         print(f"Error al conectar con la base de datos: {e}")
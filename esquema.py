@@ -0,0 +1,140 @@
+import argparse
+import os
+import re
+import sys
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from database import get_db_connection
+
+
+#Migraciones del esquema: cada archivo de migraciones/ es NNNN_nombre.sql y se aplica una sola vez, en
+#orden. La tabla schema_version guarda las que ya se aplicaron. Al arrancar, main.py verifica que la base
+#este en la ultima version (SCHEMA_CHECK=error la rechaza, warn solo avisa, off no verifica).
+#Uso: python esquema.py [--estado]
+
+directorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migraciones")
+patron_archivo = re.compile(r"^(\d{4})_(\w+)\.sql$")
+schema_check = os.getenv("SCHEMA_CHECK", "error")
+
+#Errores de "ya existe": una base creada antes de las migraciones puede tener ya la tabla, columna,
+#indice o restriccion, y esa sentencia se saltea en vez de cortar la migracion.
+ya_existe = {
+    errorcode.ER_TABLE_EXISTS_ERROR,
+    errorcode.ER_DUP_FIELDNAME,
+    errorcode.ER_DUP_KEYNAME,
+    errorcode.ER_FK_DUP_NAME,
+    errorcode.ER_CHECK_CONSTRAINT_DUP_NAME,
+}
+
+tabla_version = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT NOT NULL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    aplicada TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class EsquemaDesactualizado(Exception):
+    pass
+
+
+#Lista de (version, nombre, ruta) ordenada por version
+def migraciones():
+    resultado = []
+    for archivo in sorted(os.listdir(directorio)):
+        coincidencia = patron_archivo.match(archivo)
+        if coincidencia:
+            resultado.append((int(coincidencia.group(1)), coincidencia.group(2), os.path.join(directorio, archivo)))
+    return resultado
+
+
+def version_esperada():
+    return migraciones()[-1][0]
+
+
+#Sentencias de un archivo, sin los comentarios de linea. Los archivos no usan ; dentro de textos.
+def sentencias(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        texto = "\n".join(linea for linea in archivo.read().splitlines() if not linea.lstrip().startswith("--"))
+    return [sentencia.strip() for sentencia in texto.split(";") if sentencia.strip()]
+
+
+def version_actual(cursor):
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+    except mysql.connector.Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+    return cursor.fetchone()[0] or 0
+
+
+#Aplica las migraciones pendientes; devuelve las versiones aplicadas. El DDL de MySQL no es transaccional,
+#por eso cada migracion se anota apenas termina: si una falla, al volver a correr se sigue desde esa.
+def aplicar(db, salida=print):
+    cursor = db.cursor()
+    try:
+        cursor.execute(tabla_version)
+        actual = version_actual(cursor)
+        aplicadas = []
+        for version, nombre, ruta in migraciones():
+            if version <= actual:
+                continue
+            for sentencia in sentencias(ruta):
+                try:
+                    cursor.execute(sentencia)
+                except mysql.connector.Error as e:
+                    if e.errno not in ya_existe:
+                        raise
+                    salida(f"  {version:04}: ya existia, se saltea ({e.msg})")
+            cursor.execute("INSERT INTO schema_version (version, nombre) VALUES (%s, %s)", (version, nombre))
+            db.commit()
+            aplicadas.append(version)
+            salida(f"{version:04}_{nombre} aplicada")
+        return aplicadas
+    finally:
+        cursor.close()
+
+
+#La usa main.py al arrancar
+def verificar(db):
+    cursor = db.cursor()
+    try:
+        actual = version_actual(cursor)
+    finally:
+        cursor.close()
+    esperada = version_esperada()
+    if actual != esperada:
+        raise EsquemaDesactualizado(
+            f"La base esta en la version {actual} del esquema y la aplicacion espera la {esperada}; "
+            f"corra python esquema.py"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica las migraciones pendientes de migraciones/.")
+    parser.add_argument("--estado", action="store_true", help="solo muestra la version actual y las pendientes")
+    args = parser.parse_args()
+
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        actual = version_actual(cursor)
+        cursor.close()
+        pendientes = [(version, nombre) for version, nombre, _ in migraciones() if version > actual]
+        print(f"Version actual: {actual}, esperada: {version_esperada()}")
+        if args.estado:
+            for version, nombre in pendientes:
+                print(f"  pendiente {version:04}_{nombre}")
+            return 1 if pendientes else 0
+        aplicar(db)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
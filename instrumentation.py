@@ -0,0 +1,225 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from consultas import nombre_de, normalizar
+from database import get_db_connection
+
+log = logging.getLogger("sql")
+
+#DEBUG=1 agrega a cada respuesta el header Server-Timing con las consultas, el tiempo en la base y la
+#espera por una conexion. Las sentencias que tardan mas de SLOW_QUERY_MS se registran en el log "sql"
+#junto con su EXPLAIN (SLOW_QUERY_EXPLAIN=0 lo desactiva). Se registra la sentencia con sus %s y su
+#nombre en consultas.py, nunca los valores: ahi van cedulas, correos y hashes de contraseñas.
+debug = os.getenv("DEBUG", "0") == "1"
+umbral_lento = float(os.getenv("SLOW_QUERY_MS", "500")) / 1000
+explicar_lentas = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+
+
+#Lo que gasto en la base una request. Las rutas `def` corren en el threadpool con una copia del contexto,
+#pero el objeto es el mismo, asi que lo que suman ahi se ve en el middleware.
+class Medicion:
+    __slots__ = ("consultas", "tiempo_db", "espera_pool", "_lock")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_db = 0.0
+        self.espera_pool = 0.0
+        self._lock = threading.Lock()
+
+    def sumar(self, consultas=0, tiempo_db=0.0, espera_pool=0.0):
+        with self._lock:
+            self.consultas += consultas
+            self.tiempo_db += tiempo_db
+            self.espera_pool += espera_pool
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.tiempo_db * 1000:.2f};desc="consultas: {self.consultas}", '
+            f"pool;dur={self.espera_pool * 1000:.2f}"
+        )
+
+
+medicion_actual = contextvars.ContextVar("medicion_actual", default=None)
+
+
+def sumar(**valores):
+    medicion = medicion_actual.get()
+    if medicion is not None:
+        medicion.sumar(**valores)
+
+
+#############################################################################################
+#                               CONSULTAS LENTAS                                            #
+#############################################################################################
+
+#El EXPLAIN se hace despues, en otra conexion y en un thread aparte, asi no se mezcla con la transaccion
+#ni con las filas sin leer de la request. Los parametros se le pasan aparte, igual que en la consulta
+#original, y no salen en el log. Si ya hay varios pendientes la sentencia se registra sin plan.
+explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+explicables = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+max_pendientes = 10
+_pendientes = 0
+_pendientes_lock = threading.Lock()
+
+
+def registrar_lenta(sentencia, params, duracion, explicar=True):
+    global _pendientes
+    sentencia = normalizar(sentencia)
+    nombre = nombre_de(sentencia) or "sin nombre"
+    if explicar and explicar_lentas and sentencia.upper().startswith(explicables):
+        with _pendientes_lock:
+            if _pendientes < max_pendientes:
+                _pendientes += 1
+                explain_executor.submit(_explicar, nombre, sentencia, params, duracion)
+                return
+    log.warning("Consulta lenta %s (%.1f ms): %s", nombre, duracion * 1000, sentencia)
+
+
+def _explicar(nombre, sentencia, params, duracion):
+    global _pendientes
+    try:
+        plan = explain(sentencia, params)
+    except Exception as e:
+        plan = f"no se pudo obtener el EXPLAIN: {type(e).__name__}"
+    finally:
+        with _pendientes_lock:
+            _pendientes -= 1
+    log.warning("Consulta lenta %s (%.1f ms): %s\n%s", nombre, duracion * 1000, sentencia, plan)
+
+
+#Devuelve el plan como texto, una linea por tabla
+def explain(sentencia, params=()):
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        try:
+            cursor.execute("EXPLAIN " + sentencia, params)
+            columnas = cursor.column_names
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+    finally:
+        db.close()
+    return "\n".join(
+        "  " + " ".join(f"{columna}={valor}" for columna, valor in zip(columnas, fila) if valor is not None)
+        for fila in filas
+    )
+
+
+#############################################################################################
+#                               CONEXION Y CURSOR                                           #
+#############################################################################################
+
+#Envuelve el cursor: mide cada execute/executemany y los fetch, y registra las sentencias lentas
+class CursorMedido:
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=(), *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._medir(inicio, operation, params, explicar=True)
+
+    def executemany(self, operation, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, *args, **kwargs)
+        finally:
+            self._medir(inicio, operation, (), explicar=False)
+
+    def _medir(self, inicio, operation, params, explicar):
+        duracion = time.perf_counter() - inicio
+        sumar(consultas=1, tiempo_db=duracion)
+        if duracion >= umbral_lento:
+            #operation es la sentencia con sus %s: statement tiene los valores ya puestos y no va al log
+            sentencia = operation if isinstance(operation, str) else operation.decode("utf-8", "replace")
+            registrar_lenta(sentencia, params, duracion, explicar)
+
+    def _leer(self, metodo, *args):
+        inicio = time.perf_counter()
+        try:
+            return metodo(*args)
+        finally:
+            sumar(tiempo_db=time.perf_counter() - inicio)
+
+    def fetchone(self):
+        return self._leer(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._leer(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._leer(self._cursor.fetchall)
+
+
+#Envuelve la conexion del pool para que sus cursores se midan; commit y rollback cuentan como tiempo en la base
+class ConexionMedida:
+    __slots__ = ("_conexion",)
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def __getattr__(self, name):
+        return getattr(self._conexion, name)
+
+    def cursor(self, *args, **kwargs):
+        return CursorMedido(self._conexion.cursor(*args, **kwargs))
+
+    def commit(self):
+        inicio = time.perf_counter()
+        try:
+            return self._conexion.commit()
+        finally:
+            sumar(tiempo_db=time.perf_counter() - inicio)
+
+    def rollback(self):
+        inicio = time.perf_counter()
+        try:
+            return self._conexion.rollback()
+        finally:
+            sumar(tiempo_db=time.perf_counter() - inicio)
+
+
+#############################################################################################
+#                               MIDDLEWARE                                                  #
+#############################################################################################
+
+#Middleware ASGI puro: crea la Medicion de la request y, con DEBUG=1, la agrega como Server-Timing
+class MedicionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = Medicion()
+        token = medicion_actual.set(medicion)
+
+        async def enviar(message):
+            if debug and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", medicion.server_timing().encode("latin-1")))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicion_actual.reset(token)
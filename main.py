@@ -1,25 +1,115 @@
-from fastapi import FastAPI, HTTPException, Depends
-from database import get_db_connection
+from fastapi import FastAPI, HTTPException, Depends, Query, Response, Request
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+from pydantic import ValidationError
+from database import get_db_connection, pool, db_slots, pool_capacity
+from cache import catalog_cache
+from timetable import timetable
+import rollups
+from consultas import consultas
+import esquema
+import security
+import instrumentation
+from metrics import metricas, MetricasMiddleware
+from responses import FastJSONResponse, fast_json, filas_respuesta, responder_modelos, valor_json
+import mysql.connector
+from mysql.connector import errorcode
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from schemas import ActividadPost, InstructorPost, ClasePost, ActividadUpdate, ActividadCantidad, AlumnoUpdate, TurnoPost, AlumnoPost, AlumnoResponse, ClaseResponse, AlumnoClaseRequest, LoginRequest, LoginResponse
-import datetime
+from schemas import (
+    ActividadResponse, AlumnoListadoResponse, InstructorResponse, EquipamientoResponse, TurnoResponse, TurnoClases,
+    ActividadIngresos, ClaseAlumno, ClasesAlumnoResponse, ClaseCreadaResponse, MensajeResponse, DetalleResponse,
+    AlumnoMensajeResponse, ImportacionResponse, InscripcionResponse, InscripcionLoteResponse, DesinscripcionResponse,
+    ListaEsperaPosicion, ListaEsperaResponse, ListaEsperaBajaResponse, PoolStats, LoginStats, CacheStats,
+)
+import math
+import json
+import csv
+import io
+import logging
+import time
+from contextlib import asynccontextmanager
+import anyio
+import anyio.to_thread
+
+logger = logging.getLogger("main")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    #el threadpool tiene que alcanzar para todas las conexiones del pool y algo mas para las rutas sin base
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, pool_capacity + 10)
+    #no se arranca contra una base a la que le faltan migraciones (ver esquema.py)
+    if esquema.schema_check != "off":
+        async with conexion() as db:
+            try:
+                await run_in_threadpool(esquema.verificar, db)
+            except esquema.EsquemaDesactualizado as e:
+                if esquema.schema_check == "error":
+                    raise
+                logger.warning("Esquema desactualizado: %s", e)
+    yield
+    pool.dispose() #cierra las conexiones ociosas del pool al apagar
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse if fast_json else JSONResponse)
+
+#Las rutas que usan la base son `def` comunes, FastAPI las corre en su threadpool y no bloquean el event loop.
+#Antes de pedir la conexion se espera un lugar en db_slots sin ocupar un thread, asi ningun thread queda
+#bloqueado esperando al pool. La conexion va envuelta para medir sus consultas (ver instrumentation.py).
+@asynccontextmanager
+async def conexion():
+    inicio = time.perf_counter()
+    async with db_slots:
+        connection = await run_in_threadpool(get_db_connection)
+        instrumentation.sumar(espera_pool=time.perf_counter() - inicio)
+        try:
+            yield instrumentation.ConexionMedida(connection)
+        finally:
+            #si el cliente se desconecto el scope ya esta cancelado, sin el shield la conexion no vuelve al pool
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(connection.close)
+
+async def get_db():
+    async with conexion() as connection:
+        yield connection
 
-app = FastAPI()
 
-def get_db():
-    connection = get_db_connection()
-    try:
-        yield connection
-    finally:
-        connection.close()
+#Valida el token de /login sin ir a la base (ver security.py) y devuelve sus datos.
+#Las rutas lo piden antes que get_db, asi un pedido sin token no llega a tomar una conexion.
+bearer = HTTPBearer(auto_error=False)
+
+async def sesion_alumno(credenciales: HTTPAuthorizationCredentials = Depends(bearer)):
+    if credenciales is None:
+        raise HTTPException(status_code=401, detail="No autenticado", headers={"WWW-Authenticate": "Bearer"})
+    datos = security.verificar_token(credenciales.credentials)
+    if datos is None:
+        raise HTTPException(status_code=401, detail="Token inválido o vencido", headers={"WWW-Authenticate": "Bearer"})
+    return datos
+
+def verificar_alumno(sesion, ci_alumno):
+    if sesion["sub"] != ci_alumno:
+        raise HTTPException(status_code=403, detail="No puede operar sobre otro alumno")
 
+#Los tokens del personal (rol en security.roles_personal) pueden operar sobre cualquier alumno
+def es_personal(sesion):
+    return sesion.get("rol") in security.roles_personal
+
+
+#Lee de la cache de catalogo; si no esta, pide una conexion y corre cargar(db) en el threadpool.
+#Las rutas que la usan no dependen de get_db, asi un acierto no toca MySQL.
+async def leer_catalogo(tabla, clave, cargar):
+    encontrado, valor, generacion = catalog_cache.get(tabla, clave)
+    if encontrado:
+        return valor
+    async with conexion() as db:
+        valor = await run_in_threadpool(cargar, db)
+    catalog_cache.set(tabla, clave, valor, generacion)
+    return valor
 
-def format_time(timedelta):
-            total_seconds = int(timedelta.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            return f"{hours:02}:{minutes:02}:{seconds:02}" #setea los turnos con 2 digitos, si es 9 pasa a ser 09
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +117,86 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos los métodos
     allow_headers=["*"],  # Permite todos los encabezados
+    expose_headers=["X-Total-Count", "X-Next-After", "Server-Timing"],
 )
+app.add_middleware(instrumentation.MedicionMiddleware)
+app.add_middleware(MetricasMiddleware) #el ultimo agregado es el de afuera, asi mide la request entera
+
+
+#############################################################################################
+#                               PAGINACION                                                  #
+#############################################################################################
+
+#Columnas que devuelve cada listado, la primera es la clave por la que se pagina.
+#La contraseña de los alumnos no se devuelve nunca.
+columnas_listado = {
+    "actividades": ("id_actividad", "nombre", "descripcion", "costo"),
+    "alumnos": ("ci_alumno", "nombre", "apellido", "fecha_nacimiento", "telefono", "correo"),
+    "instructores": ("ci_instructor", "nombre", "apellido"),
+    "equipamiento": ("id_equipamiento", "id_actividad", "descripcion", "costo"),
+}
+
+modelos_listado = {
+    "actividades": ActividadResponse,
+    "alumnos": AlumnoListadoResponse,
+    "instructores": InstructorResponse,
+    "equipamiento": EquipamientoResponse,
+}
+
+def parametros_pagina(
+    after: Optional[int] = Query(None, description="Devuelve las filas con clave mayor a este valor"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Columnas separadas por coma"),
+    todos: bool = Query(False, alias="all", description="Devuelve la tabla entera sin paginar"),
+):
+    return {"after": after, "limit": limit, "fields": fields, "todos": todos}
+
+
+#Lista una tabla paginando por clave (WHERE clave > after ORDER BY clave LIMIT n), asi cada pagina
+#usa el indice de la clave primaria sin importar cuan adelante este. El total se calcula solo en la
+#primera pagina y va en el header X-Total-Count; X-Next-After trae la clave para pedir la siguiente.
+#Devuelve los modelos de las filas y los headers a agregar a la respuesta.
+def listar_pagina(db, tabla, pagina):
+    columnas = columnas_listado[tabla]
+    clave = columnas[0]
+
+    if pagina["fields"]:
+        pedidas = [campo.strip() for campo in pagina["fields"].split(",") if campo.strip()]
+        invalidas = [campo for campo in pedidas if campo not in columnas]
+        if invalidas:
+            raise HTTPException(status_code=400, detail=f"Campos no validos: {', '.join(invalidas)}")
+        seleccion = [clave] + [campo for campo in pedidas if campo != clave]
+    else:
+        seleccion = list(columnas)
+
+    cursor = db.cursor(dictionary=True)
+    try:
+        if pagina["todos"]:
+            nombre, values = "pagina_todo", ()
+        elif pagina["after"] is not None:
+            nombre, values = "pagina_siguiente", (pagina["after"], pagina["limit"])
+        else:
+            nombre, values = "pagina_primera", (pagina["limit"],)
+        query = consultas[nombre].format(columnas=", ".join(seleccion), tabla=tabla, clave=clave)
+        cursor.execute(query, values)
+        filas = cursor.fetchall()
+        headers = {}
+
+        if pagina["todos"]:
+            headers["X-Total-Count"] = str(len(filas))
+        else:
+            if pagina["after"] is None:
+                if len(filas) < pagina["limit"]:
+                    total = len(filas)
+                else:
+                    cursor.execute(consultas["contar_tabla"].format(tabla=tabla))
+                    total = cursor.fetchone()["total"]
+                headers["X-Total-Count"] = str(total)
+            if len(filas) == pagina["limit"]:
+                headers["X-Next-After"] = str(filas[-1][clave])
+        return filas_respuesta(modelos_listado[tabla], filas), headers
+    finally:
+        cursor.close()
 
 
 
@@ -36,34 +205,34 @@ app.add_middleware(
 #############################################################################################
 
 #Obtener las actividades
-@app.get("/actividades")
-async def read_actividades(db=Depends(get_db)):
-    cursor = db.cursor(dictionary=True) #es para que la respuesta te la devuelva con el nombre de las columnas
+@app.get("/actividades", response_model=list[ActividadResponse])
+async def read_actividades(response: Response, pagina: dict = Depends(parametros_pagina)):
     try:
-        cursor.execute("SELECT * FROM actividades")
-        actividades = cursor.fetchall()
-        if not actividades:
-            raise HTTPException(status_code=404, detail="No hay actividades disponibles")
-        return actividades
+        actividades, headers = await leer_catalogo(
+            "actividades", tuple(pagina.items()), lambda db: listar_pagina(db, "actividades", pagina)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener las actividades: {e}")
-    finally:
-        cursor.close()
+    response.headers.update(headers)
+
+    if not actividades and pagina["after"] is None:
+        raise HTTPException(status_code=404, detail="No hay actividades disponibles")
+    return responder_modelos(ActividadResponse, actividades, response)
 
 
 #Agregar Actividad
-@app.post("/actividades")
-async def create_actividad(actividad: ActividadPost, db=Depends(get_db)):
+@app.post("/actividades", response_model=ActividadResponse)
+def create_actividad(actividad: ActividadPost, db=Depends(get_db)):
     cursor = db.cursor()
     try:
-        query = """
-        INSERT INTO actividades (nombre, descripcion, costo)
-        VALUES (%s, %s, %s)
-        """
-        cursor.execute(query, (actividad.nombre, actividad.descripcion, actividad.costo))
+        cursor.execute(consultas["insertar_actividad"], (actividad.nombre, actividad.descripcion, actividad.costo))
+        id_actividad = cursor.lastrowid
+        rollups.recalcular_ingresos(cursor, id_actividad)
         db.commit() 
+        catalog_cache.invalidate("actividades")
 
-        id_actividad = cursor.lastrowid
         return {"id_actividad": id_actividad, "nombre": actividad.nombre, "descripcion": actividad.descripcion, "costo": actividad.costo}
     except Exception as e:
         db.rollback() 
@@ -73,15 +242,16 @@ async def create_actividad(actividad: ActividadPost, db=Depends(get_db)):
 
 
 #Eliminar actividad
-@app.delete("/actividades/{id_actividad}")
-async def delete_actividad(id_actividad: int, db=Depends(get_db)):
+@app.delete("/actividades/{id_actividad}", response_model=DetalleResponse)
+def delete_actividad(id_actividad: int, db=Depends(get_db)):
     cursor = db.cursor()
-    query_delete_clases = "DELETE FROM clase WHERE id_actividad = %s"
-    cursor.execute(query_delete_clases, (id_actividad,)) #elimina todas las clases de esa actividad
+    rollups.quitar_actividad(cursor, id_actividad)
+    cursor.execute(consultas["borrar_clases_actividad"], (id_actividad,)) #elimina todas las clases de esa actividad
     db.commit()
-    query = "DELETE FROM actividades WHERE id_actividad = %s"
-    cursor.execute(query, (id_actividad,))
+    cursor.execute(consultas["borrar_actividad"], (id_actividad,))
     db.commit() 
+    catalog_cache.invalidate("actividades", "equipamiento")
+    timetable.remove_actividad(id_actividad)
     cursor.close()
 
     if cursor.rowcount == 0:
@@ -92,8 +262,8 @@ async def delete_actividad(id_actividad: int, db=Depends(get_db)):
 
 
 #Editar una actividad
-@app.put("/actividades/{id_actividad}")
-async def update_actividad(id_actividad: int, actividad: ActividadUpdate, db=Depends(get_db)):
+@app.put("/actividades/{id_actividad}", response_model=DetalleResponse)
+def update_actividad(id_actividad: int, actividad: ActividadUpdate, db=Depends(get_db)):
     cursor = db.cursor()
     update_values = []
     update_fields = []
@@ -115,13 +285,18 @@ async def update_actividad(id_actividad: int, actividad: ActividadUpdate, db=Dep
 
     update_values.append(id_actividad)
 
-    query = f"UPDATE actividades SET {', '.join(update_fields)} WHERE id_actividad = %s"
+    query = consultas["actualizar_actividad"].format(campos=", ".join(update_fields))
     
     try:
         cursor.execute(query, tuple(update_values))
+        actualizadas = cursor.rowcount
+        if actividad.costo is not None:
+            rollups.recalcular_ingresos(cursor, id_actividad)
         db.commit()  
+        catalog_cache.invalidate("actividades")
+        timetable.refresh_actividad(db, id_actividad)
 
-        if cursor.rowcount == 0:
+        if actualizadas == 0:
             raise HTTPException(status_code=404, detail="Actividad no encontrada")
 
         return {"detail": f"Actividad con id {id_actividad} actualizada exitosamente"}
@@ -136,30 +311,15 @@ async def update_actividad(id_actividad: int, actividad: ActividadUpdate, db=Dep
 
 #Obtener las actividades con la cantidad de alumnos inscriptos
 @app.get("/actividades/populares", response_model=list[ActividadCantidad])
-async def get_actividades_populares(db=Depends(get_db)):
+def get_actividades_populares(db=Depends(get_db)):
     try:
         cursor = db.cursor(dictionary=True)
-        
-        query = """
-        SELECT
-            a.nombre AS actividad,
-            COUNT(ac.ci_alumno) AS cantidad_alumnos
-        FROM
-            actividades a
-        JOIN
-            clase c ON a.id_actividad = c.id_actividad
-        JOIN
-            alumno_clase ac ON c.id_clase = ac.id_clase
-        GROUP BY
-            a.id_actividad
-        ORDER BY
-            cantidad_alumnos DESC;
-        """
-        
-        cursor.execute(query)
+
+        #los contadores los mantienen inscribir_alumno y desinscribir_alumno (ver rollups.py)
+        cursor.execute(consultas["actividades_populares"])
         resultados = cursor.fetchall()
 
-        return resultados
+        return responder_modelos(ActividadCantidad, filas_respuesta(ActividadCantidad, resultados))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos: {e}")
     finally:
@@ -167,32 +327,18 @@ async def get_actividades_populares(db=Depends(get_db)):
         db.close()
 
 #Actividades con mas ingresos
-@app.get("/ingresos_totales")
-async def get_ingresos_totales(db=Depends(get_db)):
+@app.get("/ingresos_totales", response_model=list[ActividadIngresos])
+def get_ingresos_totales(db=Depends(get_db)):
     cursor = db.cursor(dictionary=True)
 
-    query = """
-    SELECT
-        a.nombre AS actividad,
-        SUM(a.costo + IFNULL(e.costo, 0)) AS ingresos_totales
-    FROM
-        actividades a
-    LEFT JOIN
-        equipamiento e ON a.id_actividad = e.id_actividad
-    GROUP BY
-        a.id_actividad
-    ORDER BY
-        ingresos_totales DESC;
-    """
-
     try:
-        cursor.execute(query)
+        cursor.execute(consultas["ingresos_totales"])
         resultados = cursor.fetchall()
 
         if not resultados:
             raise HTTPException(status_code=404, detail="No se encontraron ingresos totales.")
 
-        return resultados
+        return responder_modelos(ActividadIngresos, filas_respuesta(ActividadIngresos, resultados))
 
     except Exception as err:
         raise HTTPException(status_code=500, detail=f"Error de consulta: {err}")
@@ -208,44 +354,33 @@ async def get_ingresos_totales(db=Depends(get_db)):
 #############################################################################################
 
 #Obtener turnos
-@app.get("/turnos")
-async def get_turnos(db=Depends(get_db)):
-    cursor = db.cursor()
-    query = "SELECT id_turno, hora_inicio, hora_fin FROM turnos"
-    cursor.execute(query)
-    turnos = cursor.fetchall()
+@app.get("/turnos", response_model=list[TurnoResponse])
+async def get_turnos():
+    def cargar_turnos(db):
+        cursor = db.cursor()
+        #las horas vienen como texto HH:MM:SS desde MySQL (ver cronograma en consultas.py)
+        cursor.execute(consultas["turnos"])
+        turnos = cursor.fetchall()
+        cursor.close()
+
+        return filas_respuesta(TurnoResponse, turnos, columnas=("id_turno", "hora_inicio", "hora_fin"))
 
-    if not turnos:
+    turnos_list = await leer_catalogo("turnos", "todos", cargar_turnos)
+
+    if not turnos_list:
         raise HTTPException(status_code=404, detail="No se encontraron turnos")
 
-    def format_time(timedelta):
-        total_seconds = int(timedelta.total_seconds())
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        return f"{hours:02}:{minutes:02}:{seconds:02}" 
-    turnos_list = []
-    for turno in turnos:
-        turnos_list.append({
-            "id_turno": turno[0],
-            "hora_inicio": format_time(turno[1]),
-            "hora_fin": format_time(turno[2]),
-        })
-    cursor.close()
-    return turnos_list
+    return responder_modelos(TurnoResponse, turnos_list)
 
 
 
 #Agregar turnos
-@app.post("/turnos")
-async def create_turno(turno: TurnoPost, db=Depends(get_db)):
+@app.post("/turnos", response_model=TurnoResponse)
+def create_turno(turno: TurnoPost, db=Depends(get_db)):
     cursor = db.cursor()
-    query = """
-    INSERT INTO turnos (hora_inicio, hora_fin)
-    VALUES (%s, %s)
-    """
-    cursor.execute(query, (turno.hora_inicio, turno.hora_fin))
+    cursor.execute(consultas["insertar_turno"], (turno.hora_inicio, turno.hora_fin))
     db.commit() 
+    catalog_cache.invalidate("turnos")
     cursor.close()
 
     nuevo_id = cursor.lastrowid
@@ -253,98 +388,235 @@ async def create_turno(turno: TurnoPost, db=Depends(get_db)):
     return {"id_turno": nuevo_id, "hora_inicio": turno.hora_inicio, "hora_fin": turno.hora_fin}
 
 #Eliminar turno
-@app.delete("/turnos/{id_turno}")
-async def delete_turno(id_turno: int, db=Depends(get_db)):
+@app.delete("/turnos/{id_turno}", response_model=MensajeResponse)
+def delete_turno(id_turno: int, db=Depends(get_db)):
     cursor = db.cursor()
-    query = "DELETE FROM turnos WHERE id_turno = %s"
-    cursor.execute(query, (id_turno,))
+    rollups.quitar_turno(cursor, id_turno) #antes del DELETE, que se lleva las clases en cascada
+    cursor.execute(consultas["borrar_turno"], (id_turno,))
     
     if cursor.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Turno no encontrado")
     
     db.commit() 
+    catalog_cache.invalidate("turnos")
+    timetable.remove_turno(id_turno)
     cursor.close()
     return {"message": f"Turno con id {id_turno} eliminado con éxito"}
 
 #Obtener turnos con la cantidad de clases que se dictan
-@app.get("/turnos/clases")
-async def get_turnos_clases(db=Depends(get_db)):
+@app.get("/turnos/clases", response_model=list[TurnoClases])
+def get_turnos_clases(db=Depends(get_db)):
         cursor = db.cursor(dictionary=True)
-        query = """
-        SELECT
-            CONCAT(DATE_FORMAT(t.hora_inicio, '%H:%i'), ' - ', DATE_FORMAT(t.hora_fin, '%H:%i')) AS turno,
-            COUNT(c.id_clase) AS clases_dictadas
-        FROM
-            turnos t
-        JOIN
-            clase c ON t.id_turno = c.id_turno
-        GROUP BY
-            t.id_turno
-        ORDER BY
-            clases_dictadas DESC;
-        """
-        cursor.execute(query)
+        cursor.execute(consultas["turnos_clases"])
         turnos_clases = cursor.fetchall()
         cursor.close()
-        return turnos_clases
+        return responder_modelos(TurnoClases, filas_respuesta(TurnoClases, turnos_clases))
 
 #############################################################################################
 #                               ALUMNOS                                                     #
 #############################################################################################
 
 #Obtener alumnos
-@app.get("/alumnos")
-async def get_alumnos(db=Depends(get_db)):
-        cursor = db.cursor(dictionary=True)        
-        cursor.execute("SELECT * FROM alumnos")
-        alumnos = cursor.fetchall()
+@app.get("/alumnos", response_model=list[AlumnoListadoResponse])
+def get_alumnos(response: Response, pagina: dict = Depends(parametros_pagina), db=Depends(get_db)):
+        alumnos, headers = listar_pagina(db, "alumnos", pagina)
+        response.headers.update(headers)
 
-        if not alumnos:
+        if not alumnos and pagina["after"] is None:
             raise HTTPException(status_code=404, detail="No hay alumnos disponibles.")
-        
-        cursor.close()
+
         db.close()
 
-        return alumnos
+        return responder_modelos(AlumnoListadoResponse, alumnos, response)
 
-#Agregar alumno
-@app.post("/alumnos")
-async def create_alumno(alumno: AlumnoPost, db=Depends(get_db)):
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM alumnos WHERE ci_alumno = %s", (alumno.ci_alumno,))
-        existing_alumno = cursor.fetchone()
+#Devuelve el alumno con la contraseña hasheada (ver security.py). Las rutas lo llaman antes de pedir la
+#conexion: el hash corre en security.hash_executor sin tener tomada una conexion ni un lugar de db_slots.
+async def con_hash(alumno):
+    if not alumno.contraseña:
+        return alumno
+    return alumno.model_copy(update={"contraseña": await security.hash_password_async(alumno.contraseña)})
 
-        if existing_alumno:
-            raise HTTPException(status_code=400, detail="El alumno ya existe en la base de datos.")
 
-        query = """
-            INSERT INTO alumnos (ci_alumno, nombre, apellido, fecha_nacimiento, telefono, correo, contraseña)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
+#Inserta el alumno y, si crear_login, su fila en login, todo en una transaccion con un solo commit.
+#La cedula repetida se detecta por el error de clave duplicada del INSERT, sin consultar antes.
+#La usan create_alumno y register_alumno, con la contraseña ya hasheada por con_hash.
+def insertar_alumno(db, alumno, crear_login):
+    cursor = db.cursor()
+    try:
         values = (alumno.ci_alumno, alumno.nombre, alumno.apellido, alumno.fecha_nacimiento, alumno.telefono, alumno.correo, alumno.contraseña)
+        cursor.execute(consultas["insertar_alumno"], values)
 
-        cursor.execute(query, values)
-        db.commit()  
+        if crear_login:
+            cursor.execute(consultas["insertar_login"], (alumno.correo, alumno.contraseña, alumno.ci_alumno))
 
+        db.commit()
+    except mysql.connector.IntegrityError as e:
+        db.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise HTTPException(status_code=400, detail="El alumno ya existe en la base de datos.")
+        raise
+    except Exception:
+        db.rollback()
+        raise
+    finally:
         cursor.close()
-        db.close()
+
+
+#Agregar alumno
+@app.post("/alumnos", response_model=AlumnoMensajeResponse)
+async def create_alumno(alumno: AlumnoPost):
+        guardado = await con_hash(alumno)
+        async with conexion() as db:
+            await run_in_threadpool(insertar_alumno, db, guardado, False)
 
         return {"message": "Alumno creado exitosamente", "ci_alumno": alumno.ci_alumno}
 
 
+#Filas por cada executemany y commit de la importacion
+tamaño_lote_importacion = 500
+
+#Inserta los alumnos ya validados por lotes: una consulta trae las cedulas que ya existen, el resto se
+#inserta con un executemany y se hace un commit por lote. Si el lote choca con otra escritura o algun
+#dato no entra en su columna se deshace y se inserta de a uno para saber que fila fallo. Completa el
+#estado de cada resultado. Los errores de conexion no son de una fila y cortan la importacion.
+def importar_alumnos(db, alumnos, resultados):
+    cursor = db.cursor()
+    query = consultas["insertar_alumno"]
+    try:
+        for inicio in range(0, len(alumnos), tamaño_lote_importacion):
+            lote = alumnos[inicio:inicio + tamaño_lote_importacion]
+            cedulas = [alumno.ci_alumno for _, alumno in lote]
+            cursor.execute(
+                consultas["alumnos_existentes"].format(marcas=", ".join(["%s"] * len(cedulas))),
+                tuple(cedulas),
+            )
+            existentes = {fila[0] for fila in cursor.fetchall()}
+
+            nuevos = []
+            for fila, alumno in lote:
+                if alumno.ci_alumno in existentes:
+                    resultados[fila]["estado"] = "duplicado"
+                else:
+                    nuevos.append((fila, alumno))
+            valores = [
+                (a.ci_alumno, a.nombre, a.apellido, a.fecha_nacimiento, a.telefono, a.correo, a.contraseña)
+                for _, a in nuevos
+            ]
+            if not valores:
+                continue
+
+            try:
+                cursor.executemany(query, valores)
+                db.commit()
+                for fila, _ in nuevos:
+                    resultados[fila]["estado"] = "creado"
+            except (mysql.connector.IntegrityError, mysql.connector.DataError):
+                db.rollback()
+                for (fila, _), values in zip(nuevos, valores):
+                    try:
+                        cursor.execute(query, values)
+                        db.commit()
+                        resultados[fila]["estado"] = "creado"
+                    except (mysql.connector.IntegrityError, mysql.connector.DataError) as e:
+                        db.rollback()
+                        resultados[fila]["estado"] = "duplicado" if e.errno == errorcode.ER_DUP_ENTRY else "invalido"
+                        if e.errno != errorcode.ER_DUP_ENTRY:
+                            resultados[fila]["errores"] = [e.msg]
+    finally:
+        cursor.close()
+
+
+def leer_filas_importacion(contenido, content_type):
+    if content_type.startswith("text/csv"):
+        lector = csv.DictReader(io.StringIO(contenido.decode("utf-8-sig")))
+        #en el CSV una celda vacia es un dato que no se mando
+        return [{k: v for k, v in fila.items() if v != ""} for fila in lector]
+    filas = json.loads(contenido)
+    if not isinstance(filas, list):
+        raise ValueError("Se esperaba una lista de alumnos")
+    return filas
+
+
+#Importar muchos alumnos de una vez, como lista JSON o como CSV (Content-Type: text/csv)
+@app.post("/alumnos/importar", response_model=ImportacionResponse, response_model_exclude_unset=True)
+async def importar_alumnos_lote(request: Request):
+    try:
+        filas = leer_filas_importacion(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"No se pudo leer el archivo: {e}")
+
+    resultados = []
+    validos = []
+    vistos = set()
+    for fila, datos in enumerate(filas):
+        resultado = {"fila": fila, "ci_alumno": datos.get("ci_alumno") if isinstance(datos, dict) else None}
+        resultados.append(resultado)
+        try:
+            alumno = AlumnoPost.model_validate(datos)
+        except ValidationError as e:
+            resultado["estado"] = "invalido"
+            resultado["errores"] = [f"{'.'.join(str(p) for p in error['loc'])}: {error['msg']}" for error in e.errors()]
+            continue
+        resultado["ci_alumno"] = alumno.ci_alumno
+        if alumno.ci_alumno in vistos:
+            resultado["estado"] = "duplicado"
+            continue
+        vistos.add(alumno.ci_alumno)
+        validos.append((fila, alumno))
+
+    if validos:
+        #las contraseñas se hashean en paralelo en hash_executor antes de pedir la conexion. Es lo que mas
+        #cuesta de una planilla real: un PBKDF2 por fila con contraseña, repartido en PASSWORD_WORKERS
+        #threads; las filas sin contraseña no pasan por ahi
+        contraseñas = [alumno.contraseña for _, alumno in validos if alumno.contraseña]
+        hashes = iter(await run_in_threadpool(security.hash_passwords_pool, contraseñas))
+        validos = [
+            (fila, alumno.model_copy(update={"contraseña": next(hashes)}) if alumno.contraseña else alumno)
+            for fila, alumno in validos
+        ]
+        async with conexion() as db:
+            await run_in_threadpool(importar_alumnos, db, validos, resultados)
+
+    totales = {"creado": 0, "duplicado": 0, "invalido": 0}
+    for resultado in resultados:
+        totales[resultado["estado"]] += 1
+
+    return {
+        "creados": totales["creado"],
+        "duplicados": totales["duplicado"],
+        "invalidos": totales["invalido"],
+        "resultados": resultados,
+    }
+
+
 #Eliminar alumno
-@app.delete("/alumnos/{ci_alumno}")
-async def delete_alumno(ci_alumno: int, db=Depends(get_db)):
+#Sus inscripciones se borran aca y no por la cascada, asi cada cupo que deja pasa al primero de la lista
+#de espera de esa clase en la misma transaccion, como en desinscribir_alumno.
+@app.delete("/alumnos/{ci_alumno}", response_model=AlumnoMensajeResponse)
+def delete_alumno(ci_alumno: int, db=Depends(get_db)):
         cursor = db.cursor()
 
-        cursor.execute("SELECT * FROM alumnos WHERE ci_alumno = %s", (ci_alumno,))
+        cursor.execute(consultas["buscar_alumno"], (ci_alumno,))
         alumno = cursor.fetchone()
 
         if not alumno:
             raise HTTPException(status_code=404, detail="Alumno no encontrado")
 
-        query = "DELETE FROM alumnos WHERE ci_alumno = %s"
-        cursor.execute(query, (ci_alumno,))
+        try:
+            cursor.execute(consultas["inscripciones_alumno"], (ci_alumno,))
+            clases = [fila[0] for fila in cursor.fetchall()]
+            rollups.quitar_alumno(cursor, ci_alumno)
+            cursor.execute(consultas["borrar_esperas_alumno"], (ci_alumno,)) #que no se promueva a si mismo
+            cursor.execute(consultas["borrar_inscripciones_alumno"], (ci_alumno,))
+            for id_clase in clases:
+                liberar_cupo(cursor, id_clase)
+                if promover_lista_espera(cursor, id_clase) is not None:
+                    rollups.sumar_alumno(cursor, id_clase, 1)
+            cursor.execute(consultas["borrar_alumno"], (ci_alumno,))
+        except Exception:
+            db.rollback()
+            raise
 
         db.commit()  
 
@@ -355,11 +627,16 @@ async def delete_alumno(ci_alumno: int, db=Depends(get_db)):
 
 
 #Modificar datos de alumno
-@app.put("/alumnos/{ci_alumno}")
-async def update_alumno(ci_alumno: int, alumno: AlumnoUpdate, db=Depends(get_db)):
+@app.put("/alumnos/{ci_alumno}", response_model=AlumnoMensajeResponse)
+async def update_alumno(ci_alumno: int, alumno: AlumnoUpdate):
+        alumno = await con_hash(alumno)
+        async with conexion() as db:
+            return await run_in_threadpool(actualizar_alumno, db, ci_alumno, alumno)
+
+def actualizar_alumno(db, ci_alumno, alumno):
         cursor = db.cursor()
 
-        cursor.execute("SELECT * FROM alumnos WHERE ci_alumno = %s", (ci_alumno,))
+        cursor.execute(consultas["buscar_alumno"], (ci_alumno,))
         existe_alumno = cursor.fetchone()
 
         if not existe_alumno:
@@ -397,11 +674,18 @@ async def update_alumno(ci_alumno: int, alumno: AlumnoUpdate, db=Depends(get_db)
 
         values.append(ci_alumno)
 
-        query = f"UPDATE alumnos SET {', '.join(update_fields)} WHERE ci_alumno = %s"
+        query = consultas["actualizar_alumno"].format(campos=", ".join(update_fields))
         cursor.execute(query, tuple(values))
+
+        #las credenciales de /login viven en la tabla login, se mantienen iguales a las del alumno
+        login_fields = [campo for campo in update_fields if campo.startswith(("correo", "contraseña"))]
+        if login_fields:
+            login_values = [values[update_fields.index(campo)] for campo in login_fields]
+            cursor.execute(
+                consultas["actualizar_login_alumno"].format(campos=", ".join(login_fields)), (*login_values, ci_alumno)
+            )
         db.commit()  
         cursor.close()
-        db.close()
         return {"message": "Alumno actualizado exitosamente", "ci_alumno": ci_alumno}
 
 
@@ -410,37 +694,30 @@ async def update_alumno(ci_alumno: int, alumno: AlumnoUpdate, db=Depends(get_db)
 #############################################################################################
 
 #Obtener los instructores
-@app.get("/instructores")
-async def get_alumnos(db=Depends(get_db)):
-        cursor = db.cursor(dictionary=True)        
-        cursor.execute("SELECT * FROM instructores")
-        instructores = cursor.fetchall()
+@app.get("/instructores", response_model=list[InstructorResponse])
+async def get_alumnos(response: Response, pagina: dict = Depends(parametros_pagina)):
+        instructores, headers = await leer_catalogo("instructores", tuple(pagina.items()), lambda db: listar_pagina(db, "instructores", pagina))
+        response.headers.update(headers)
 
-        if not instructores:
+        if not instructores and pagina["after"] is None:
             raise HTTPException(status_code=404, detail="No hay instructores disponibles.")
-        
-        cursor.close()
-        db.close()
 
-        return instructores
+        return responder_modelos(InstructorResponse, instructores, response)
 
 #Agregar instructores
-@app.post("/instructores")
-async def create_instructor(instructor: InstructorPost, db=Depends(get_db)):
+@app.post("/instructores", response_model=InstructorResponse)
+def create_instructor(instructor: InstructorPost, db=Depends(get_db)):
     cursor = db.cursor()
 
-    cursor.execute("SELECT ci_instructor FROM instructores WHERE ci_instructor = %s", (instructor.ci_instructor,))
+    cursor.execute(consultas["buscar_instructor"], (instructor.ci_instructor,))
     existing_instructor = cursor.fetchone()
 
     if existing_instructor:
         raise HTTPException(status_code=400, detail="El instructor ya existe con ese CI.")
 
-    query = """
-        INSERT INTO instructores (ci_instructor, nombre, apellido)
-        VALUES (%s, %s, %s);
-    """
-    cursor.execute(query, (instructor.ci_instructor, instructor.nombre, instructor.apellido))
+    cursor.execute(consultas["insertar_instructor"], (instructor.ci_instructor, instructor.nombre, instructor.apellido))
     db.commit()
+    catalog_cache.invalidate("instructores")
     cursor.close()
 
     return {
@@ -451,11 +728,11 @@ async def create_instructor(instructor: InstructorPost, db=Depends(get_db)):
 
 
 #Eliminar Instructores
-@app.delete("/instructores/{ci_instructor}")
-async def delete_instructor(ci_instructor: int, db=Depends(get_db)):
+@app.delete("/instructores/{ci_instructor}", response_model=MensajeResponse)
+def delete_instructor(ci_instructor: int, db=Depends(get_db)):
     cursor = db.cursor()
 
-    cursor.execute("SELECT * FROM instructores WHERE ci_instructor = %s", (ci_instructor,))
+    cursor.execute(consultas["buscar_instructor"], (ci_instructor,))
     instructor = cursor.fetchone()
 
     if not instructor:
@@ -463,8 +740,11 @@ async def delete_instructor(ci_instructor: int, db=Depends(get_db)):
         db.close()
         raise HTTPException(status_code=404, detail="El instructor no existe.")
 
-    cursor.execute("DELETE FROM instructores WHERE ci_instructor = %s", (ci_instructor,))
+    rollups.quitar_instructor(cursor, ci_instructor) #antes del DELETE, que se lleva sus clases en cascada
+    cursor.execute(consultas["borrar_instructor"], (ci_instructor,))
     db.commit()
+    catalog_cache.invalidate("instructores")
+    timetable.remove_instructor(ci_instructor)
 
     cursor.close()
     db.close()
@@ -478,34 +758,10 @@ async def delete_instructor(ci_instructor: int, db=Depends(get_db)):
 
 #Registra un alumno y guarda la cedula, correo y contraseña en la tabla login
 @app.post("/register", response_model=AlumnoResponse)
-async def register_alumno(alumno: AlumnoPost, db = Depends(get_db)):
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM alumnos WHERE ci_alumno = %s", (alumno.ci_alumno,))
-    existing_alumno = cursor.fetchone()
-
-    if existing_alumno:
-        raise HTTPException(status_code=400, detail="El alumno ya existe en la base de datos.")
-
-    query = """
-        INSERT INTO alumnos (ci_alumno, nombre, apellido, fecha_nacimiento, telefono, correo, contraseña)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
-    values = (alumno.ci_alumno, alumno.nombre, alumno.apellido, alumno.fecha_nacimiento, alumno.telefono, alumno.correo, alumno.contraseña)
-
-    cursor.execute(query, values)
-    db.commit()  
-
-    query = """
-        INSERT INTO login (correo, contraseña, ci_alumno)
-        VALUES (%s, %s, %s)
-    """
-    values = (alumno.correo, alumno.contraseña, alumno.ci_alumno)
-
-    cursor.execute(query, values)
-    db.commit()
-
-    cursor.close()
-    db.close()
+async def register_alumno(alumno: AlumnoPost):
+    guardado = await con_hash(alumno)
+    async with conexion() as db:
+        await run_in_threadpool(insertar_alumno, db, guardado, True)
 
     return AlumnoResponse(
             ci_alumno=alumno.ci_alumno,
@@ -522,19 +778,18 @@ async def register_alumno(alumno: AlumnoPost, db = Depends(get_db)):
 #                              ELIMINAR DE TABLA LOGIN                                      #
 #############################################################################################
 
-@app.delete("/login/{ci_alumno}")
-async def delete_alumno(ci_alumno: int, db=Depends(get_db)):
+@app.delete("/login/{ci_alumno}", response_model=AlumnoMensajeResponse)
+def delete_alumno(ci_alumno: int, db=Depends(get_db)):
     try:
         cursor = db.cursor()
 
-        cursor.execute("SELECT * FROM login WHERE ci_alumno = %s", (ci_alumno,))
+        cursor.execute(consultas["buscar_login"], (ci_alumno,))
         alumno = cursor.fetchone()
 
         if not alumno:
             raise HTTPException(status_code=404, detail="Alumno no encontrado")
 
-        query = "DELETE FROM login WHERE ci_alumno = %s"
-        cursor.execute(query, (ci_alumno,))
+        cursor.execute(consultas["borrar_login"], (ci_alumno,))
 
         db.commit()  
 
@@ -554,18 +809,85 @@ async def delete_alumno(ci_alumno: int, db=Depends(get_db)):
 #                               LOGIN                                                       #
 #############################################################################################
 
-@app.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db=Depends(get_db)):
+#Busca las credenciales por correo (indice idx_login_correo). Si el alumno no tiene fila en login (lo
+#creo un administrador con POST /alumnos) se usan las de la tabla alumnos.
+#Devuelve (ci_alumno, contraseña guardada, esta_en_login) o None.
+def buscar_credenciales(db, correo):
+    cursor = db.cursor()
+    try:
+        cursor.execute(consultas["credenciales_login"], (correo,))
+        fila = cursor.fetchone()
+        if fila:
+            return fila[0], fila[1], True
+        cursor.execute(consultas["credenciales_alumno"], (correo,))
+        fila = cursor.fetchone()
+        if fila:
+            return fila[0], fila[1], False
+        return None
+    finally:
+        cursor.close()
 
+
+#Guarda el hash nuevo: para filas viejas en texto plano o hechas con menos iteraciones, y para crear
+#la fila de login que faltaba
+def guardar_credenciales(db, correo, ci_alumno, contraseña, esta_en_login):
     cursor = db.cursor()
+    try:
+        if esta_en_login:
+            cursor.execute(consultas["actualizar_contraseña_login"], (contraseña, correo))
+        else:
+            cursor.execute(consultas["insertar_login"], (correo, contraseña, ci_alumno))
+        cursor.execute(
+            consultas["actualizar_contraseña_alumno"],
+            (contraseña, ci_alumno, security.algoritmo + "$%"),
+        )
+        db.commit()
+    except mysql.connector.Error:
+        db.rollback()
+    finally:
+        cursor.close()
+
+
+#La conexion solo se usa para leer y, si hace falta, guardar el hash nuevo; mientras se verifica la
+#contraseña (en security.hash_executor) no se tiene ninguna tomada.
+@app.post("/login", response_model=LoginResponse)
+async def login(login_data: LoginRequest, request: Request):
+    #los intentos de mas se cortan aca, antes de pedir una conexion
+    espera = max(
+        security.login_por_ip.consumir(request.client.host if request.client else ""),
+        security.login_por_correo.consumir(login_data.correo.strip().lower()),
+    )
+    if espera:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados intentos de inicio de sesión, intente más tarde.",
+            headers={"Retry-After": str(math.ceil(espera))},
+        )
+
+    async with conexion() as db:
+        credenciales = await run_in_threadpool(buscar_credenciales, db, login_data.correo)
 
-    cursor.execute("SELECT * FROM alumnos WHERE correo = %s AND contraseña = %s", (login_data.correo, login_data.contraseña, ))
-    db_usuario = cursor.fetchone()
+    guardado = credenciales[1] if credenciales else None
+    correcta, rehashear = await security.verify_password_async(login_data.contraseña, guardado)
 
-    if not db_usuario:
+    if not correcta:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
 
-    return {"message": "Inicio de sesión exitoso"}
+    ci_alumno, _, esta_en_login = credenciales
+    if rehashear or not esta_en_login:
+        nuevo = await security.hash_password_async(login_data.contraseña)
+        async with conexion() as db:
+            await run_in_threadpool(guardar_credenciales, db, login_data.correo, ci_alumno, nuevo, esta_en_login)
+
+    token, vence = security.crear_token(ci_alumno)
+    return {"message": "Inicio de sesión exitoso", "access_token": token, "expires_at": vence, "ci_alumno": ci_alumno}
+
+
+#Cerrar sesion: el token queda revocado hasta que venza
+@app.post("/logout", response_model=MensajeResponse)
+async def logout(sesion: dict = Depends(sesion_alumno)):
+    security.tokens_revocados.revocar(sesion["jti"], sesion["exp"])
+    return {"message": "Sesión cerrada"}
 
 #############################################################################################
 #                               CLASES                                                      #
@@ -574,129 +896,167 @@ async def login(login_data: LoginRequest, db=Depends(get_db)):
 
 #Mostrar clases
 @app.get("/clases", response_model=list[ClaseResponse])
-def get_clases(db = Depends(get_db)):
-    
-    cursor = db.cursor()
+async def get_clases():
+    #se sirve la copia ya serializada del cronograma, solo se va a la base si hay que rearmarla
+    body = timetable.body()
+    if body is None:
+        async with conexion() as db:
+            body = await run_in_threadpool(timetable.rebuild, db)
+    return Response(content=body, media_type="application/json")
+
+
+#Toma un cupo de la clase con un UPDATE condicional: se bloquea solo la fila de esa clase hasta el commit
+#y nunca baja de 0, asi no hay sobreventa aunque muchos pidan el ultimo lugar a la vez. Va antes del
+#INSERT en alumno_clase porque ese INSERT toma un lock compartido sobre la clase (clave foranea) y dos
+#transacciones que quisieran subirlo despues se bloquearian entre si.
+def reservar_cupo(cursor, id_clase):
+    cursor.execute(consultas["reservar_cupo"], (id_clase,))
+    if cursor.rowcount == 1:
+        return
+
+    #no se desconto: la clase no existe, no tiene limite o esta llena
+    cursor.execute(consultas["cupos_clase"], (id_clase,))
+    clase = cursor.fetchone()
+    if not clase:
+        raise HTTPException(status_code=404, detail="Clase no encontrada")
+    if clase[0] is not None:
+        raise HTTPException(status_code=409, detail="La clase no tiene cupos disponibles.")
+
+def liberar_cupo(cursor, id_clase):
+    cursor.execute(consultas["liberar_cupo"], (id_clase,))
+
+
+def insertar_inscripcion(cursor, id_clase, ci_alumno, id_equipamiento=None):
+    if id_equipamiento is not None:
+        cursor.execute(consultas["insertar_inscripcion_equipamiento"], (id_clase, ci_alumno, id_equipamiento))
+    else:
+        cursor.execute(consultas["insertar_inscripcion"], (id_clase, ci_alumno))
+
+
+#Reserva el cupo e inserta la inscripcion dentro de la transaccion en curso, sin commit.
+#No se consulta antes si ya existe: la clave unica (id_clase, ci_alumno) rechaza el INSERT repetido,
+#asi es un solo viaje a la base y dos pedidos simultaneos no pueden inscribir dos veces.
+#Si el INSERT falla se devuelve el cupo, para que la transaccion pueda seguir con otras inscripciones.
+def inscribir(cursor, alumno_clase):
+    reservar_cupo(cursor, alumno_clase.id_clase)
+    try:
+        insertar_inscripcion(cursor, alumno_clase.id_clase, alumno_clase.ci_alumno, alumno_clase.id_equipamiento)
+    except mysql.connector.IntegrityError as e:
+        liberar_cupo(cursor, alumno_clase.id_clase)
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise HTTPException(status_code=400, detail="El alumno ya está inscrito en esta clase.")
+        raise
 
-    cursor.execute("""
-        SELECT 
-            c.id_clase,
-            c.id_actividad,
-            a.nombre AS nombre_actividad,
-            a.costo AS costo_actividad,
-            i.nombre AS nombre_instructor,
-            t.hora_inicio AS hora_inicio,
-            t.hora_fin AS hora_fin
-        FROM 
-            clase c
-        JOIN 
-            actividades a ON c.id_actividad = a.id_actividad
-        JOIN 
-            instructores i ON c.ci_instructor = i.ci_instructor
-        JOIN 
-            turnos t ON c.id_turno = t.id_turno;
-    """)
-    clases = cursor.fetchall()
 
-    response = []
-    for clase in clases:
-        response.append(ClaseResponse(
-            id_clase=clase[0],
-            id_actividad = clase[1],
-            nombre_actividad=clase[2],
-            nombre_instructor=clase[4],
-            hora_inicio=format_time(clase[5]),
-            hora_fin=format_time(clase[6]),
-            costo_actividad=clase[3]
-        ))
+#Poder inscribirse a una clase
+@app.post("/inscribir_alumno", response_model=InscripcionResponse)
+def inscribir_alumno(alumno_clase: AlumnoClaseRequest, sesion: dict = Depends(sesion_alumno), db = Depends(get_db)):
+        verificar_alumno(sesion, alumno_clase.ci_alumno)
+        cursor = db.cursor()
 
-    return response
+        try:
+            inscribir(cursor, alumno_clase)
+        except Exception:
+            db.rollback()
+            raise
+        rollups.sumar_alumno(cursor, alumno_clase.id_clase, 1)
 
+        db.commit()
 
-#Poder inscribirse a una clase
-@app.post("/inscribir_alumno")
-async def inscribir_alumno(alumno_clase: AlumnoClaseRequest, db = Depends(get_db)):
-        cursor = db.cursor()
+        return {"message": "Alumno inscrito correctamente.", "data": alumno_clase}
 
-        cursor.execute(
-            "SELECT * FROM alumno_clase WHERE id_clase = %s AND ci_alumno = %s",
-            (alumno_clase.id_clase, alumno_clase.ci_alumno),
-        )
-        existe = cursor.fetchone()
 
-        if existe:
-            raise HTTPException(status_code=400, detail="El alumno ya está inscrito en esta clase.")
+#Estado de cada inscripcion del lote segun el error
+estados_inscripcion = {400: "duplicado", 404: "clase_no_encontrada", 409: "sin_cupo"}
 
-        if alumno_clase.id_equipamiento is not None:
-            query = """
-                INSERT INTO alumno_clase (id_clase, ci_alumno, id_equipamiento)
-                VALUES (%s, %s, %s)
-            """
-            values = (alumno_clase.id_clase, alumno_clase.ci_alumno, alumno_clase.id_equipamiento)
-        else:
-            query = """
-                INSERT INTO alumno_clase (id_clase, ci_alumno)
-                VALUES (%s, %s)
-            """
-            values = (alumno_clase.id_clase, alumno_clase.ci_alumno)
-        cursor.execute(query, values)
+#Inscribir varios alumnos a varias clases en una sola transaccion, por ejemplo un grupo de una escuela a
+#la misma clase. Con un token del personal el lote puede traer cualquier alumno; con uno de alumno, como
+#en inscribir_alumno, todas las inscripciones tienen que ser suyas.
+@app.post("/inscribir_alumnos", response_model=InscripcionLoteResponse, response_model_exclude_unset=True)
+def inscribir_alumnos(inscripciones: list[AlumnoClaseRequest], sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    if not inscripciones:
+        raise HTTPException(status_code=400, detail="Debe enviar al menos una inscripción.")
+    if len(inscripciones) > 1000:
+        raise HTTPException(status_code=400, detail="No se pueden enviar más de 1000 inscripciones por pedido.")
+    if not es_personal(sesion):
+        for alumno_clase in inscripciones:
+            verificar_alumno(sesion, alumno_clase.ci_alumno)
+
+    cursor = db.cursor()
+    resultados = [None] * len(inscripciones)
+    inscriptos_por_clase = {}
 
+    #se recorren ordenadas por clase para tomar los locks de las filas de clase siempre en el mismo orden
+    #y que dos lotes simultaneos no se bloqueen mutuamente
+    orden = sorted(range(len(inscripciones)), key=lambda i: (inscripciones[i].id_clase, inscripciones[i].ci_alumno))
+    try:
+        for i in orden:
+            alumno_clase = inscripciones[i]
+            resultado = {"id_clase": alumno_clase.id_clase, "ci_alumno": alumno_clase.ci_alumno}
+            try:
+                inscribir(cursor, alumno_clase)
+                resultado["estado"] = "inscrito"
+                inscriptos_por_clase[alumno_clase.id_clase] = inscriptos_por_clase.get(alumno_clase.id_clase, 0) + 1
+            except HTTPException as e:
+                resultado["estado"] = estados_inscripcion[e.status_code]
+                resultado["detalle"] = e.detail
+            except mysql.connector.IntegrityError as e:
+                #alumno o equipamiento inexistente
+                resultado["estado"] = "invalido"
+                resultado["detalle"] = e.msg
+            resultados[i] = resultado
+
+        for id_clase, cantidad in inscriptos_por_clase.items():
+            rollups.sumar_alumno(cursor, id_clase, cantidad)
         db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
 
-        return {"message": "Alumno inscrito correctamente.", "data": alumno_clase}
+    return {
+        "inscritos": sum(inscriptos_por_clase.values()),
+        "rechazados": len(inscripciones) - sum(inscriptos_por_clase.values()),
+        "resultados": resultados,
+    }
 
 
 #Eliminar alumno de clase
-@app.delete("/desinscribir_alumno/{id_clase}/{ci_alumno}")
-def desinscribir_alumno(ci_alumno: int, id_clase: int, db=Depends(get_db)):
+@app.delete("/desinscribir_alumno/{id_clase}/{ci_alumno}", response_model=DesinscripcionResponse)
+def desinscribir_alumno(ci_alumno: int, id_clase: int, sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    verificar_alumno(sesion, ci_alumno)
     cursor=db.cursor()
 
-    cursor.execute("SELECT * FROM alumno_clase WHERE ci_alumno = %s AND id_clase = %s",
-            (ci_alumno, id_clase),)
-     
-    inscripcion = cursor.fetchone()
-    if not inscripcion:
+    cursor.execute(consultas["borrar_inscripcion"], (ci_alumno, id_clase))
+    if cursor.rowcount == 0:
+        db.rollback()
         raise HTTPException(
             status_code=404,
             detail=f"No se encontró la inscripción del alumno {ci_alumno} en la clase {id_clase}.",
         )
-     
-    cursor.execute("DELETE FROM alumno_clase WHERE ci_alumno = %s AND id_clase = %s",
-        (ci_alumno, id_clase),)
+
+    #el cupo liberado pasa al primero de la lista de espera en la misma transaccion
+    liberar_cupo(cursor, id_clase)
+    promovido = promover_lista_espera(cursor, id_clase)
+    if promovido is None:
+        rollups.sumar_alumno(cursor, id_clase, -1)
     db.commit()
      
     return {
         "message": "Alumno desinscrito correctamente.",
         "ci_alumno": ci_alumno,
         "id_clase": id_clase,
+        "promovido": promovido,
     }
 
 
 #Obtener las clases inscriptas de un alumno
-@app.get("/clases_alumno/{ci_alumno}")
-def get_clases_alumno(ci_alumno: int, db=Depends(get_db)):
+@app.get("/clases_alumno/{ci_alumno}", response_model=ClasesAlumnoResponse)
+def get_clases_alumno(ci_alumno: int, sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    verificar_alumno(sesion, ci_alumno)
     cursor = db.cursor()
-    query = """
-            SELECT 
-                ac.id_clase,
-                a.nombre AS nombre_actividad,
-                i.nombre AS nombre_instructor,
-                t.hora_inicio,
-                t.hora_fin
-            FROM 
-                alumno_clase ac
-            JOIN 
-                clase c ON ac.id_clase = c.id_clase
-            JOIN 
-                actividades a ON c.id_actividad = a.id_actividad
-            JOIN 
-                instructores i ON c.ci_instructor = i.ci_instructor
-            JOIN 
-                turnos t ON c.id_turno = t.id_turno
-            WHERE 
-                ac.ci_alumno = %s
-        """
-    cursor.execute(query, (ci_alumno,))
+    cursor.execute(consultas["clases_alumno"], (ci_alumno,))
     clases = cursor.fetchall()
 
     if not clases:
@@ -705,25 +1065,21 @@ def get_clases_alumno(ci_alumno: int, db=Depends(get_db)):
             detail=f"No se encontraron clases para el alumno con CI {ci_alumno}.",
     )
 
-    result = [
-            {
-                "id_clase": clase[0],
-                "nombre_actividad": clase[1],
-                "nombre_instructor": clase[2],
-                "hora_inicio": format_time(clase[3]),
-                "hora_fin": format_time(clase[4]),
-            }
-            for clase in clases
-        ]
+    result = filas_respuesta(
+        ClaseAlumno, clases, columnas=("id_clase", "nombre_actividad", "nombre_instructor", "hora_inicio", "hora_fin")
+    )
+    if fast_json:
+        return FastJSONResponse({"ci_alumno": ci_alumno, "clases_inscriptas": result})
 
-    return {"ci_alumno": ci_alumno, "clases_inscriptas": result}
+    respuesta = ClasesAlumnoResponse.model_construct(ci_alumno=ci_alumno, clases_inscriptas=result)
+    return Response(content=respuesta.model_dump_json(), media_type="application/json")
 
 #Crear una clase
-@app.post("/clases")
-async def create_clase(clase: ClasePost, db=Depends(get_db)):
+@app.post("/clases", response_model=ClaseCreadaResponse)
+def create_clase(clase: ClasePost, db=Depends(get_db)):
     cursor = db.cursor()
 
-    cursor.execute("SELECT id_actividad FROM actividades WHERE nombre = %s", (clase.nombre_actividad,))
+    cursor.execute(consultas["actividad_por_nombre"], (clase.nombre_actividad,))
     actividad = cursor.fetchone()
 
     if not actividad:
@@ -731,42 +1087,255 @@ async def create_clase(clase: ClasePost, db=Depends(get_db)):
 
     id_actividad = actividad[0]
 
-    query = """
-        INSERT INTO clase (ci_instructor, id_actividad, id_turno, dictada)
-        VALUES (%s, %s, %s, %s);
-    """
-    cursor.execute(query, (clase.ci_instructor, id_actividad, clase.id_turno, clase.dictada))
+    cursor.execute(consultas["insertar_clase"], (clase.ci_instructor, id_actividad, clase.id_turno, clase.dictada, clase.cupo, clase.cupo))
+    id_clase = cursor.lastrowid
+    rollups.sumar_clase(cursor, clase.id_turno)
     db.commit()
     cursor.close()
 
-    id_clase = cursor.lastrowid
+    timetable.add_clase(db, id_clase)
 
     return {
         "id_clase": id_clase,
         "ci_instructor": clase.ci_instructor,
         "nombre_actividad": clase.nombre_actividad,
         "id_turno": clase.id_turno,
-        "dictada": clase.dictada
+        "dictada": clase.dictada,
+        "cupo": clase.cupo
+    }
+
+#############################################################################################
+#                               LISTA DE ESPERA                                             #
+#############################################################################################
+
+#Inscribe al primero de la lista de espera de la clase y lo saca de la lista; devuelve su CI o None.
+#Se llama con el cupo ya liberado y la fila de la clase bloqueada (liberar_cupo), asi nadie se anota
+#en la lista mientras tanto. Buscar al primero es una sola lectura de idx_lista_espera_orden.
+def promover_lista_espera(cursor, id_clase):
+    while True:
+        cursor.execute(consultas["primero_lista_espera"], (id_clase,))
+        primero = cursor.fetchone()
+        if not primero:
+            return None
+
+        id_espera, ci_alumno, id_equipamiento = primero
+        cursor.execute(consultas["borrar_espera"], (id_espera,))
+        try:
+            insertar_inscripcion(cursor, id_clase, ci_alumno, id_equipamiento)
+        except mysql.connector.IntegrityError as e:
+            #ya estaba inscripto por otro camino: se descarta y se prueba con el siguiente
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                continue
+            raise
+        reservar_cupo(cursor, id_clase)
+        return ci_alumno
+
+
+def posicion_lista_espera(cursor, id_clase, ci_alumno):
+    cursor.execute(consultas["posicion_lista_espera"], (id_clase, ci_alumno))
+    return cursor.fetchone()[0]
+
+
+#Anotarse en la lista de espera de una clase llena
+@app.post("/lista_espera", response_model=ListaEsperaResponse)
+def anotar_lista_espera(alumno_clase: AlumnoClaseRequest, sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    verificar_alumno(sesion, alumno_clase.ci_alumno)
+    cursor = db.cursor()
+
+    #FOR SHARE espera a una desinscripcion en curso, asi se ve el cupo que pueda liberar
+    cursor.execute(consultas["estado_clase_espera"], (alumno_clase.ci_alumno, alumno_clase.id_clase))
+    clase = cursor.fetchone()
+
+    if not clase:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Clase no encontrada")
+    if clase[1]:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El alumno ya está inscrito en esta clase.")
+    if clase[0] is None or clase[0] > 0:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="La clase tiene cupos disponibles, puede inscribirse directamente.")
+
+    try:
+        cursor.execute(
+            consultas["insertar_espera"],
+            (alumno_clase.id_clase, alumno_clase.ci_alumno, alumno_clase.id_equipamiento),
+        )
+    except mysql.connector.IntegrityError as e:
+        db.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY:
+            raise HTTPException(status_code=400, detail="El alumno ya está en la lista de espera de esta clase.")
+        if e.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+            raise HTTPException(status_code=404, detail="El alumno o el equipamiento no existen.")
+        raise
+    posicion = posicion_lista_espera(cursor, alumno_clase.id_clase, alumno_clase.ci_alumno)
+    db.commit()
+    cursor.close()
+
+    return {
+        "message": "Alumno anotado en la lista de espera.",
+        "id_clase": alumno_clase.id_clase,
+        "ci_alumno": alumno_clase.ci_alumno,
+        "posicion": posicion,
     }
 
+
+#Posicion de un alumno en la lista de espera
+@app.get("/lista_espera/{id_clase}/{ci_alumno}", response_model=ListaEsperaPosicion)
+def get_posicion_lista_espera(id_clase: int, ci_alumno: int, sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    verificar_alumno(sesion, ci_alumno)
+    cursor = db.cursor()
+    posicion = posicion_lista_espera(cursor, id_clase, ci_alumno)
+    cursor.close()
+
+    if posicion == 0:
+        raise HTTPException(status_code=404, detail="El alumno no está en la lista de espera de esta clase.")
+
+    return {"id_clase": id_clase, "ci_alumno": ci_alumno, "posicion": posicion}
+
+
+#Salir de la lista de espera
+@app.delete("/lista_espera/{id_clase}/{ci_alumno}", response_model=ListaEsperaBajaResponse)
+def salir_lista_espera(id_clase: int, ci_alumno: int, sesion: dict = Depends(sesion_alumno), db=Depends(get_db)):
+    verificar_alumno(sesion, ci_alumno)
+    cursor = db.cursor()
+    cursor.execute(consultas["salir_lista_espera"], (id_clase, ci_alumno))
+
+    if cursor.rowcount == 0:
+        raise HTTPException(status_code=404, detail="El alumno no está en la lista de espera de esta clase.")
+
+    db.commit()
+    cursor.close()
+    return {"message": "Alumno quitado de la lista de espera.", "id_clase": id_clase, "ci_alumno": ci_alumno}
+
 #############################################################################################
 #                               EQUIPAMIENTO                                                #
 #############################################################################################
 
 #Obtener equipamiento
-@app.get("/equipamiento")
-async def get_alumnos(db=Depends(get_db)):
-        cursor = db.cursor(dictionary=True)        
-        cursor.execute("SELECT * FROM equipamiento")
-        equipamiento = cursor.fetchall()
+@app.get("/equipamiento", response_model=list[EquipamientoResponse])
+async def get_alumnos(response: Response, pagina: dict = Depends(parametros_pagina)):
+        equipamiento, headers = await leer_catalogo("equipamiento", tuple(pagina.items()), lambda db: listar_pagina(db, "equipamiento", pagina))
+        response.headers.update(headers)
 
-        if not equipamiento:
+        if not equipamiento and pagina["after"] is None:
             raise HTTPException(status_code=404, detail="No hay equipamiento disponibles.")
-        
-        cursor.close()
-        db.close()
 
-        return equipamiento
+        return responder_modelos(EquipamientoResponse, equipamiento, response)
+
+
+#############################################################################################
+#                               EXPORTACION                                                 #
+#############################################################################################
+
+#Filas que se piden por cada fetchmany mientras se exporta
+tamaño_lote_exportacion = 1000
+
+columnas_exportacion = {
+    "alumnos": columnas_listado["alumnos"],
+    "alumno_clase": ("id_clase", "ci_alumno", "id_equipamiento"),
+}
+
+def lote_ndjson(columnas, filas):
+    return "".join(json.dumps(dict(zip(columnas, fila)), default=valor_json, ensure_ascii=False) + "\n" for fila in filas)
+
+def lote_csv(filas):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(filas)
+    return buffer.getvalue()
+
+
+#Recorre la tabla con un cursor sin buffer (las filas se leen del socket a medida que se piden) y manda
+#cada lote apenas llega, asi la memoria no depende del tamaño de la tabla. La conexion se pide aca y no
+#con get_db porque tiene que vivir mientras dure la respuesta.
+async def exportar_tabla(tabla, formato):
+    columnas = columnas_exportacion[tabla]
+    async with db_slots:
+        db = await run_in_threadpool(get_db_connection)
+        cursor = db.cursor()
+        completo = False
+        try:
+            await run_in_threadpool(
+                cursor.execute, consultas["exportar"].format(columnas=", ".join(columnas), tabla=tabla)
+            )
+            if formato == "csv":
+                yield lote_csv([columnas])
+            while True:
+                filas = await run_in_threadpool(cursor.fetchmany, tamaño_lote_exportacion)
+                if not filas:
+                    break
+                yield lote_ndjson(columnas, filas) if formato == "ndjson" else lote_csv(filas)
+            completo = True
+        finally:
+            with anyio.CancelScope(shield=True):
+                if not completo:
+                    db.invalidate() #quedaron filas sin leer en la conexion, no se puede reusar
+                else:
+                    await run_in_threadpool(cursor.close)
+                await run_in_threadpool(db.close)
+
+
+def respuesta_exportacion(tabla, formato):
+    tipos = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+    return StreamingResponse(
+        exportar_tabla(tabla, formato),
+        media_type=tipos[formato],
+        headers={"Content-Disposition": f'attachment; filename="{tabla}.{formato}"'},
+    )
+
+#Exportar todos los alumnos
+@app.get("/exportar/alumnos", response_class=StreamingResponse)
+async def exportar_alumnos(formato: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return respuesta_exportacion("alumnos", formato)
 
+#Exportar todas las inscripciones
+@app.get("/exportar/alumno_clase", response_class=StreamingResponse)
+async def exportar_alumno_clase(formato: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    return respuesta_exportacion("alumno_clase", formato)
 
 
+#############################################################################################
+#                               MONITOREO                                                   #
+#############################################################################################
+
+#Estadisticas del pool de conexiones
+@app.get("/estadisticas/pool", response_model=PoolStats)
+async def get_estadisticas_pool():
+    return pool.stats()
+
+#Intentos de login permitidos y rechazados por el limite
+@app.get("/estadisticas/login", response_model=LoginStats)
+async def get_estadisticas_login():
+    return {"por_ip": security.login_por_ip.stats(), "por_correo": security.login_por_correo.stats()}
+
+#Aciertos y fallos de la cache de catalogo
+@app.get("/estadisticas/cache", response_model=CacheStats)
+async def get_estadisticas_cache():
+    return catalog_cache.stats()
+
+#Metricas para Prometheus: latencia y status por ruta, requests en curso, pool, cache y limite de login
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    estado_pool = pool.stats()
+    estado_cache = catalog_cache.stats()
+    medidores = [
+        ("db_pool_size", "gauge", "Conexiones que el pool mantiene abiertas", estado_pool["pool_size"]),
+        ("db_pool_max_overflow", "gauge", "Conexiones extra permitidas en picos", estado_pool["max_overflow"]),
+        ("db_pool_opened", "gauge", "Conexiones abiertas", estado_pool["opened"]),
+        ("db_pool_in_use", "gauge", "Conexiones prestadas a requests", estado_pool["in_use"]),
+        ("db_pool_idle", "gauge", "Conexiones ociosas en el pool", estado_pool["idle"]),
+        ("db_pool_waiting", "gauge", "Threads esperando una conexion", estado_pool["waiting"]),
+        ("db_pool_checkouts_total", "counter", "Conexiones entregadas", estado_pool["checkouts"]),
+        ("db_pool_timeouts_total", "counter", "Pedidos de conexion que vencieron", estado_pool["timeouts"]),
+        ("db_pool_discarded_total", "counter", "Conexiones descartadas", estado_pool["discarded"]),
+        ("db_pool_checkout_max_seconds", "gauge", "Espera maxima por una conexion", estado_pool["checkout_max_ms"] / 1000),
+        ("catalog_cache_hits_total", "counter", "Aciertos de la cache de catalogo", estado_cache["hits"]),
+        ("catalog_cache_misses_total", "counter", "Fallos de la cache de catalogo", estado_cache["misses"]),
+        ("catalog_cache_invalidations_total", "counter", "Invalidaciones de la cache de catalogo", estado_cache["invalidations"]),
+        ("catalog_cache_evictions_total", "counter", "Entradas descartadas por llenarse la cache de catalogo", estado_cache["evictions"]),
+        ("catalog_cache_entries", "gauge", "Entradas en la cache de catalogo", estado_cache["entries"]),
+        ("login_rechazados_ip_total", "counter", "Logins cortados por el limite por IP", security.login_por_ip.stats()["rechazados"]),
+        ("login_rechazados_correo_total", "counter", "Logins cortados por el limite por correo", security.login_por_correo.stats()["rechazados"]),
+        ("tokens_revocados", "gauge", "Tokens revocados que todavia no vencieron", len(security.tokens_revocados)),
+    ]
+    return PlainTextResponse(metricas.exponer(medidores), media_type="text/plain; version=0.0.4")
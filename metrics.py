@@ -0,0 +1,103 @@
+import bisect
+import time
+
+
+#Metricas de las requests en formato de texto de Prometheus, sin dependencias.
+#Todo se registra desde el event loop (el middleware y GET /metrics son async), asi que no hace falta lock.
+
+#Limites de los buckets del histograma de latencia, en segundos
+buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metricas:
+    def __init__(self, limites=buckets):
+        self.limites = limites
+        self.en_curso = 0
+        self._latencias = {}  #(metodo, ruta) -> [cuentas por bucket..., suma, cantidad]
+        self._respuestas = {}  #(metodo, ruta, status) -> cantidad
+
+    def observar(self, metodo, ruta, status, duracion):
+        clave = (metodo, ruta)
+        fila = self._latencias.get(clave)
+        if fila is None:
+            fila = self._latencias[clave] = [0] * (len(self.limites) + 1) + [0.0, 0]
+        fila[bisect.bisect_left(self.limites, duracion)] += 1
+        fila[-2] += duracion
+        fila[-1] += 1
+        clave = (metodo, ruta, status)
+        self._respuestas[clave] = self._respuestas.get(clave, 0) + 1
+
+    #medidores: (nombre, tipo, ayuda, valor) que se leen al momento, como los del pool y la cache
+    def exponer(self, medidores=()):
+        lineas = [
+            "# HELP http_request_duration_seconds Latencia de las requests por ruta",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (metodo, ruta), fila in sorted(self._latencias.items()):
+            etiquetas = f'method="{_escapar(metodo)}",route="{_escapar(ruta)}"'
+            acumulado = 0
+            for limite, cuenta in zip(self.limites, fila):
+                acumulado += cuenta
+                lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="+Inf"}} {fila[-1]}')
+            lineas.append(f"http_request_duration_seconds_sum{{{etiquetas}}} {fila[-2]}")
+            lineas.append(f"http_request_duration_seconds_count{{{etiquetas}}} {fila[-1]}")
+
+        lineas.append("# HELP http_requests_total Requests respondidas por ruta y status")
+        lineas.append("# TYPE http_requests_total counter")
+        for (metodo, ruta, status), cantidad in sorted(self._respuestas.items()):
+            lineas.append(
+                f'http_requests_total{{method="{_escapar(metodo)}",route="{_escapar(ruta)}",status="{status}"}} {cantidad}'
+            )
+
+        lineas.append("# HELP http_requests_in_flight Requests en curso")
+        lineas.append("# TYPE http_requests_in_flight gauge")
+        lineas.append(f"http_requests_in_flight {self.en_curso}")
+
+        for nombre, tipo, ayuda, valor in medidores:
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.append(f"{nombre} {float(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metricas = Metricas()
+
+
+#Middleware ASGI puro. La ruta se toma de la plantilla que eligio el router (/clases_alumno/{ci_alumno}),
+#no del path, asi la cantidad de series no crece con los ids. Lo que no matchea ninguna ruta va junto.
+class MetricasMiddleware:
+    def __init__(self, app, registro=metricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        status = 500  #si la app falla antes de responder, Starlette devuelve 500
+
+        async def enviar(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registro.en_curso += 1
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            self.registro.en_curso -= 1
+            route = scope.get("route")
+            self.registro.observar(
+                scope["method"],
+                getattr(route, "path", "sin_ruta"),
+                status,
+                time.perf_counter() - inicio,
+            )
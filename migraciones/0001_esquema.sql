@@ -0,0 +1,67 @@
+-- Tablas base de obligatorio2024, como las usan las rutas de main.py. Las migraciones siguientes agregan
+-- columnas, claves e indices sobre estas tablas. Los borrados de actividades, turnos, instructores y alumnos
+-- arrastran sus clases, inscripciones y credenciales.
+
+CREATE TABLE IF NOT EXISTS actividades (
+    id_actividad INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    nombre VARCHAR(50) NOT NULL,
+    descripcion VARCHAR(255),
+    costo DECIMAL(10, 2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS equipamiento (
+    id_equipamiento INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    id_actividad INT NOT NULL,
+    descripcion VARCHAR(255),
+    costo DECIMAL(10, 2) NOT NULL,
+    CONSTRAINT fk_equipamiento_actividad FOREIGN KEY (id_actividad) REFERENCES actividades (id_actividad) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS instructores (
+    ci_instructor INT NOT NULL PRIMARY KEY,
+    nombre VARCHAR(50) NOT NULL,
+    apellido VARCHAR(50) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS turnos (
+    id_turno INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    hora_inicio TIME NOT NULL,
+    hora_fin TIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS alumnos (
+    ci_alumno INT NOT NULL PRIMARY KEY,
+    nombre VARCHAR(50) NOT NULL,
+    apellido VARCHAR(50) NOT NULL,
+    fecha_nacimiento DATE NOT NULL,
+    telefono VARCHAR(20),
+    correo VARCHAR(100),
+    contraseña VARCHAR(50)
+);
+
+CREATE TABLE IF NOT EXISTS login (
+    correo VARCHAR(100) NOT NULL,
+    contraseña VARCHAR(50) NOT NULL,
+    ci_alumno INT NOT NULL PRIMARY KEY,
+    CONSTRAINT fk_login_alumno FOREIGN KEY (ci_alumno) REFERENCES alumnos (ci_alumno) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS clase (
+    id_clase INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    ci_instructor INT NOT NULL,
+    id_actividad INT NOT NULL,
+    id_turno INT NOT NULL,
+    dictada BOOLEAN NOT NULL DEFAULT FALSE,
+    CONSTRAINT fk_clase_instructor FOREIGN KEY (ci_instructor) REFERENCES instructores (ci_instructor) ON DELETE CASCADE,
+    CONSTRAINT fk_clase_actividad FOREIGN KEY (id_actividad) REFERENCES actividades (id_actividad) ON DELETE CASCADE,
+    CONSTRAINT fk_clase_turno FOREIGN KEY (id_turno) REFERENCES turnos (id_turno) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS alumno_clase (
+    id_clase INT NOT NULL,
+    ci_alumno INT NOT NULL,
+    id_equipamiento INT NULL,
+    CONSTRAINT fk_alumno_clase_clase FOREIGN KEY (id_clase) REFERENCES clase (id_clase) ON DELETE CASCADE,
+    CONSTRAINT fk_alumno_clase_alumno FOREIGN KEY (ci_alumno) REFERENCES alumnos (ci_alumno) ON DELETE CASCADE,
+    CONSTRAINT fk_alumno_clase_equipamiento FOREIGN KEY (id_equipamiento) REFERENCES equipamiento (id_equipamiento) ON DELETE SET NULL
+);
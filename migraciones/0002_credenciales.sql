@@ -0,0 +1,7 @@
+-- Las contraseñas se guardan hasheadas (pbkdf2_sha256$iteraciones$sal$hash, ver security.py), necesitan
+-- columnas mas largas. /login busca por correo en la tabla login.
+
+ALTER TABLE alumnos MODIFY contraseña VARCHAR(255);
+ALTER TABLE login MODIFY contraseña VARCHAR(255) NOT NULL;
+CREATE INDEX idx_login_correo ON login (correo);
+CREATE INDEX idx_alumnos_correo ON alumnos (correo);
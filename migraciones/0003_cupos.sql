@@ -0,0 +1,7 @@
+-- Cupo de cada clase. NULL en cupo significa sin limite.
+-- cupos_disponibles lo descuenta inscribir_alumno con un UPDATE condicional y lo devuelve desinscribir_alumno.
+
+ALTER TABLE clase
+    ADD COLUMN cupo INT NULL,
+    ADD COLUMN cupos_disponibles INT NULL,
+    ADD CONSTRAINT chk_clase_cupos CHECK (cupos_disponibles >= 0 AND cupos_disponibles <= cupo);
@@ -0,0 +1,4 @@
+-- inscribir_alumno detecta la inscripcion repetida por el error de clave duplicada del INSERT,
+-- necesita esta clave unica (si alumno_clase ya tiene (id_clase, ci_alumno) como clave primaria no hace falta).
+
+ALTER TABLE alumno_clase ADD UNIQUE KEY uq_alumno_clase (id_clase, ci_alumno);
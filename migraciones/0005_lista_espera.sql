@@ -0,0 +1,14 @@
+-- Lista de espera por clase. El orden es id_espera (autoincremental): el primero de la fila se encuentra
+-- con una sola busqueda en idx_lista_espera_orden y la posicion se cuenta sobre ese mismo indice.
+
+CREATE TABLE IF NOT EXISTS lista_espera (
+    id_espera BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    id_clase INT NOT NULL,
+    ci_alumno INT NOT NULL,
+    id_equipamiento INT NULL,
+    fecha_alta TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_lista_espera (id_clase, ci_alumno),
+    KEY idx_lista_espera_orden (id_clase, id_espera),
+    CONSTRAINT fk_lista_espera_clase FOREIGN KEY (id_clase) REFERENCES clase (id_clase) ON DELETE CASCADE,
+    CONSTRAINT fk_lista_espera_alumno FOREIGN KEY (ci_alumno) REFERENCES alumnos (ci_alumno) ON DELETE CASCADE
+);
@@ -0,0 +1,13 @@
+-- Contadores que mantienen las rutas de escritura para no agrupar en cada consulta del panel.
+-- Los carga 0010_cargar_rollups.sql; si se desfasan, python rollups.py los reconstruye.
+
+CREATE TABLE IF NOT EXISTS rollup_actividad (
+    id_actividad INT NOT NULL PRIMARY KEY,
+    cantidad_alumnos INT NOT NULL DEFAULT 0,
+    ingresos_totales DECIMAL(12, 2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS rollup_turno (
+    id_turno INT NOT NULL PRIMARY KEY,
+    clases_dictadas INT NOT NULL DEFAULT 0
+);
@@ -0,0 +1,11 @@
+-- Indices que usan las consultas de main.py. 0001 no los declara, asi que se crean aca tanto en una base
+-- nueva como en una creada antes de tener las migraciones.
+--   alumno_clase (ci_alumno)       /clases_alumno
+--   alumno_clase (id_clase, ...)   uq_alumno_clase de 0004, inscripciones repetidas y conteos por clase
+--   clase (id_actividad)           rollups y borrado de una actividad
+--   alumnos (correo)               idx_alumnos_correo de 0002, /login
+--   actividades (nombre)           create_clase busca la actividad por nombre
+
+CREATE INDEX idx_alumno_clase_alumno ON alumno_clase (ci_alumno);
+CREATE INDEX idx_clase_actividad ON clase (id_actividad);
+CREATE INDEX idx_actividades_nombre ON actividades (nombre);
@@ -0,0 +1,11 @@
+-- promover_lista_espera inscribe al primero con el equipamiento que pidio al anotarse; si ese equipamiento
+-- no existe el INSERT en alumno_clase falla y la desinscripcion que lo promueve se cae. Se anulan los que
+-- ya no existen y la clave foranea los anula cuando se borra el equipamiento, como en alumno_clase.
+
+UPDATE lista_espera le
+LEFT JOIN equipamiento e ON e.id_equipamiento = le.id_equipamiento
+SET le.id_equipamiento = NULL
+WHERE le.id_equipamiento IS NOT NULL AND e.id_equipamiento IS NULL;
+
+ALTER TABLE lista_espera
+    ADD CONSTRAINT fk_lista_espera_equipamiento FOREIGN KEY (id_equipamiento) REFERENCES equipamiento (id_equipamiento) ON DELETE SET NULL;
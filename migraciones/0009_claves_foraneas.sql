@@ -0,0 +1,226 @@
+-- 0001 usa CREATE TABLE IF NOT EXISTS, asi que en una base que ya tenia las tablas no agrego sus claves
+-- foraneas: pueden faltar o borrar con RESTRICT. Los borrados de main.py y los contadores de rollups.py
+-- cuentan con la cascada (quitar_turno y quitar_instructor restan lo que el DELETE se va a llevar). Aca
+-- se dejan como las declara 0001, sin depender de los errores que saltea esquema.py.
+--
+-- Primero se borran las filas que apuntan a algo que ya no existe, como lo hubiera hecho la cascada, de
+-- las tablas padre a las hijas; si no, la clave no se puede agregar. Despues, por cada columna: se quitan
+-- las claves foraneas que tenga con otro ON DELETE (con el nombre que tengan) y se agrega la de 0001 si
+-- no hay una con el ON DELETE correcto. Cada ALTER se arma leyendo information_schema; DO 0 es no hacer
+-- nada.
+
+DELETE e FROM equipamiento e
+LEFT JOIN actividades a ON a.id_actividad = e.id_actividad
+WHERE a.id_actividad IS NULL;
+
+DELETE l FROM login l
+LEFT JOIN alumnos al ON al.ci_alumno = l.ci_alumno
+WHERE al.ci_alumno IS NULL;
+
+DELETE c FROM clase c
+LEFT JOIN instructores i ON i.ci_instructor = c.ci_instructor
+LEFT JOIN actividades a ON a.id_actividad = c.id_actividad
+LEFT JOIN turnos t ON t.id_turno = c.id_turno
+WHERE i.ci_instructor IS NULL OR a.id_actividad IS NULL OR t.id_turno IS NULL;
+
+DELETE ac FROM alumno_clase ac
+LEFT JOIN clase c ON c.id_clase = ac.id_clase
+LEFT JOIN alumnos al ON al.ci_alumno = ac.ci_alumno
+WHERE c.id_clase IS NULL OR al.ci_alumno IS NULL;
+
+UPDATE alumno_clase ac
+LEFT JOIN equipamiento e ON e.id_equipamiento = ac.id_equipamiento
+SET ac.id_equipamiento = NULL
+WHERE ac.id_equipamiento IS NOT NULL AND e.id_equipamiento IS NULL;
+
+-- equipamiento (id_actividad) -> actividades, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE equipamiento ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'equipamiento' AND k.COLUMN_NAME = 'id_actividad'
+        AND k.REFERENCED_TABLE_NAME = 'actividades' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE equipamiento ADD CONSTRAINT fk_equipamiento_actividad FOREIGN KEY (id_actividad) REFERENCES actividades (id_actividad) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'equipamiento' AND k.COLUMN_NAME = 'id_actividad'
+        AND k.REFERENCED_TABLE_NAME = 'actividades' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- login (ci_alumno) -> alumnos, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE login ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'login' AND k.COLUMN_NAME = 'ci_alumno'
+        AND k.REFERENCED_TABLE_NAME = 'alumnos' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE login ADD CONSTRAINT fk_login_alumno FOREIGN KEY (ci_alumno) REFERENCES alumnos (ci_alumno) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'login' AND k.COLUMN_NAME = 'ci_alumno'
+        AND k.REFERENCED_TABLE_NAME = 'alumnos' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- clase (ci_instructor) -> instructores, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'ci_instructor'
+        AND k.REFERENCED_TABLE_NAME = 'instructores' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE clase ADD CONSTRAINT fk_clase_instructor FOREIGN KEY (ci_instructor) REFERENCES instructores (ci_instructor) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'ci_instructor'
+        AND k.REFERENCED_TABLE_NAME = 'instructores' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- clase (id_actividad) -> actividades, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'id_actividad'
+        AND k.REFERENCED_TABLE_NAME = 'actividades' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE clase ADD CONSTRAINT fk_clase_actividad FOREIGN KEY (id_actividad) REFERENCES actividades (id_actividad) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'id_actividad'
+        AND k.REFERENCED_TABLE_NAME = 'actividades' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- clase (id_turno) -> turnos, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'id_turno'
+        AND k.REFERENCED_TABLE_NAME = 'turnos' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE clase ADD CONSTRAINT fk_clase_turno FOREIGN KEY (id_turno) REFERENCES turnos (id_turno) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'clase' AND k.COLUMN_NAME = 'id_turno'
+        AND k.REFERENCED_TABLE_NAME = 'turnos' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- alumno_clase (id_clase) -> clase, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE alumno_clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'id_clase'
+        AND k.REFERENCED_TABLE_NAME = 'clase' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE alumno_clase ADD CONSTRAINT fk_alumno_clase_clase FOREIGN KEY (id_clase) REFERENCES clase (id_clase) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'id_clase'
+        AND k.REFERENCED_TABLE_NAME = 'clase' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- alumno_clase (ci_alumno) -> alumnos, ON DELETE CASCADE
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE alumno_clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'ci_alumno'
+        AND k.REFERENCED_TABLE_NAME = 'alumnos' AND r.DELETE_RULE <> 'CASCADE'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE alumno_clase ADD CONSTRAINT fk_alumno_clase_alumno FOREIGN KEY (ci_alumno) REFERENCES alumnos (ci_alumno) ON DELETE CASCADE', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'ci_alumno'
+        AND k.REFERENCED_TABLE_NAME = 'alumnos' AND r.DELETE_RULE = 'CASCADE'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
+
+-- alumno_clase (id_equipamiento) -> equipamiento, ON DELETE SET NULL
+SET @quitar = (
+    SELECT IFNULL(CONCAT('ALTER TABLE alumno_clase ', GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', k.CONSTRAINT_NAME, '`'))), 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'id_equipamiento'
+        AND k.REFERENCED_TABLE_NAME = 'equipamiento' AND r.DELETE_RULE <> 'SET NULL'
+);
+SET @agregar = (
+    SELECT IF(COUNT(*) = 0, 'ALTER TABLE alumno_clase ADD CONSTRAINT fk_alumno_clase_equipamiento FOREIGN KEY (id_equipamiento) REFERENCES equipamiento (id_equipamiento) ON DELETE SET NULL', 'DO 0')
+    FROM information_schema.KEY_COLUMN_USAGE k
+    JOIN information_schema.REFERENTIAL_CONSTRAINTS r
+        ON r.CONSTRAINT_SCHEMA = k.CONSTRAINT_SCHEMA AND r.CONSTRAINT_NAME = k.CONSTRAINT_NAME
+    WHERE k.TABLE_SCHEMA = DATABASE() AND k.TABLE_NAME = 'alumno_clase' AND k.COLUMN_NAME = 'id_equipamiento'
+        AND k.REFERENCED_TABLE_NAME = 'equipamiento' AND r.DELETE_RULE = 'SET NULL'
+);
+PREPARE quitar FROM @quitar;
+EXECUTE quitar;
+DEALLOCATE PREPARE quitar;
+PREPARE agregar FROM @agregar;
+EXECUTE agregar;
+DEALLOCATE PREPARE agregar;
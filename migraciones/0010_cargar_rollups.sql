@@ -0,0 +1,28 @@
+-- 0006 crea los contadores vacios y las rutas de escritura solo suman o restan sobre lo que ya hay: hasta
+-- cargarlos, los paneles muestran ceros y los upserts de rollups.py arrancan de conteos parciales. Se
+-- calculan aca desde las tablas base con los mismos valores que rollups.calcular, pisando lo que hubiera.
+
+INSERT INTO rollup_actividad (id_actividad, cantidad_alumnos, ingresos_totales)
+SELECT
+    a.id_actividad,
+    (SELECT COUNT(*) FROM clase c JOIN alumno_clase ac ON c.id_clase = ac.id_clase
+     WHERE c.id_actividad = a.id_actividad),
+    IFNULL((SELECT SUM(a.costo + IFNULL(e.costo, 0)) FROM equipamiento e
+            WHERE e.id_actividad = a.id_actividad), a.costo)
+FROM actividades a
+ON DUPLICATE KEY UPDATE cantidad_alumnos = VALUES(cantidad_alumnos), ingresos_totales = VALUES(ingresos_totales);
+
+DELETE r FROM rollup_actividad r
+LEFT JOIN actividades a ON a.id_actividad = r.id_actividad
+WHERE a.id_actividad IS NULL;
+
+INSERT INTO rollup_turno (id_turno, clases_dictadas)
+SELECT t.id_turno, COUNT(c.id_clase)
+FROM turnos t
+LEFT JOIN clase c ON t.id_turno = c.id_turno
+GROUP BY t.id_turno
+ON DUPLICATE KEY UPDATE clases_dictadas = VALUES(clases_dictadas);
+
+DELETE r FROM rollup_turno r
+LEFT JOIN turnos t ON t.id_turno = r.id_turno
+WHERE t.id_turno IS NULL;
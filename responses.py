@@ -0,0 +1,81 @@
+import datetime
+import decimal
+import functools
+import json
+import os
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+#Convierte lo que devuelve mysql.connector a JSON igual que jsonable_encoder de FastAPI
+def valor_json(valor):
+    if isinstance(valor, decimal.Decimal):
+        return int(valor) if valor.as_tuple().exponent >= 0 else float(valor)
+    if isinstance(valor, (datetime.date, datetime.time)):
+        return valor.isoformat()
+    if isinstance(valor, datetime.timedelta):
+        return valor.total_seconds()
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    raise TypeError(f"No se puede serializar {type(valor).__name__}")
+
+
+#Respuesta JSON que serializa directo con orjson (o json si no esta instalado), sin pasar por
+#jsonable_encoder
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, default=valor_json, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=valor_json, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+#FAST_JSON=1 la usa como respuesta por defecto de la app, y los listados mandan las filas tal cual con
+#orjson en vez de pasarlas por los modelos (ver filas_respuesta y responder_modelos)
+fast_json = os.getenv("FAST_JSON", "0") == "1"
+
+
+#Adapter de list[modelo], se arma uno solo por modelo
+@functools.lru_cache(maxsize=None)
+def adaptador(modelo):
+    return TypeAdapter(list[modelo])
+
+
+#Arma los modelos de respuesta a partir de las filas del cursor (dicts, o tuplas junto con `columnas`).
+#Se validan todas juntas en una sola llamada a pydantic-core, que es mas rapido que model_construct
+#fila por fila (ver benchmarks/modelos.py).
+def filas_a_modelos(modelo, filas, columnas=None):
+    if columnas is not None:
+        filas = [dict(zip(columnas, fila)) for fila in filas]
+    return adaptador(modelo).validate_python(filas)
+
+
+#Lo que devuelven las rutas de listado para responder_modelos: con FAST_JSON las filas como dicts, sin
+#pasar por pydantic; si no, los modelos de filas_a_modelos. El response_model de la ruta queda igual
+#para la documentacion.
+def filas_respuesta(modelo, filas, columnas=None):
+    if not fast_json:
+        return filas_a_modelos(modelo, filas, columnas)
+    if columnas is not None:
+        return [dict(zip(columnas, fila)) for fila in filas]
+    return filas
+
+
+#Para rutas con response_model=list[modelo]: pydantic serializa los modelos directo a bytes y FastAPI
+#no los vuelve a validar. Las columnas que no se pidieron con `fields` quedan afuera (exclude_unset).
+#Con FAST_JSON llegan las filas de filas_respuesta y se serializan con FastJSONResponse.
+#Los headers van aca porque FastAPI no copia los del parametro `response` a una Response devuelta.
+def responder_modelos(modelo, modelos, response=None):
+    headers = dict(response.headers) if response is not None else None
+    if fast_json:
+        return FastJSONResponse(modelos, headers=headers)
+    return Response(
+        content=adaptador(modelo).dump_json(modelos, exclude_unset=True),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,158 @@
+import argparse
+import decimal
+import sys
+
+from consultas import consultas
+from database import get_db_connection
+
+
+#Contadores de rollup_actividad y rollup_turno (ver migraciones/0006_rollups.sql). Las funciones reciben el cursor de
+#la ruta que escribe y se ejecutan antes de su commit, asi el contador cambia en la misma transaccion.
+
+def sumar_alumno(cursor, id_clase, delta):
+    cursor.execute(consultas["rollup_sumar_alumno"], (delta, id_clase, delta))
+
+
+def sumar_clase(cursor, id_turno):
+    cursor.execute(consultas["rollup_sumar_clase"], (id_turno,))
+
+
+#Se llama antes de borrar las clases de la actividad, resta esas clases de cada turno
+def quitar_actividad(cursor, id_actividad):
+    cursor.execute(consultas["rollup_quitar_actividad"], (id_actividad,))
+    cursor.execute(consultas["rollup_borrar_actividad"], (id_actividad,))
+
+
+#Los borrados de turnos, instructores y alumnos arrastran clases e inscripciones por ON DELETE CASCADE;
+#estas se llaman antes del DELETE, mientras las filas que se van a ir todavia se pueden contar
+def quitar_turno(cursor, id_turno):
+    cursor.execute(consultas["rollup_quitar_alumnos_turno"], (id_turno,))
+    cursor.execute(consultas["rollup_borrar_turno"], (id_turno,))
+
+
+def quitar_instructor(cursor, ci_instructor):
+    cursor.execute(consultas["rollup_quitar_alumnos_instructor"], (ci_instructor,))
+    cursor.execute(consultas["rollup_quitar_clases_instructor"], (ci_instructor,))
+
+
+def quitar_alumno(cursor, ci_alumno):
+    cursor.execute(consultas["rollup_quitar_alumno"], (ci_alumno,))
+
+
+#Recalcula los ingresos de una actividad (cuando se crea o cambia su costo); solo recorre su equipamiento
+def recalcular_ingresos(cursor, id_actividad):
+    cursor.execute(consultas["rollup_recalcular_ingresos"], (id_actividad,))
+
+
+#############################################################################################
+#                               RECONSTRUCCION                                              #
+#############################################################################################
+
+#Valores calculados desde cero con los mismos GROUP BY que usaban las rutas
+query_actividades = """
+    SELECT
+        a.id_actividad,
+        (SELECT COUNT(*) FROM clase c JOIN alumno_clase ac ON c.id_clase = ac.id_clase
+         WHERE c.id_actividad = a.id_actividad) AS cantidad_alumnos,
+        (SELECT SUM(a.costo + IFNULL(e.costo, 0)) FROM equipamiento e
+         WHERE e.id_actividad = a.id_actividad) AS ingresos_equipamiento,
+        a.costo
+    FROM actividades a
+"""
+
+query_turnos = """
+    SELECT t.id_turno, COUNT(c.id_clase) AS clases_dictadas
+    FROM turnos t
+    LEFT JOIN clase c ON t.id_turno = c.id_turno
+    GROUP BY t.id_turno
+"""
+
+
+def centesimos(valor):
+    return decimal.Decimal(str(valor)).quantize(decimal.Decimal("0.01"))
+
+
+def calcular(cursor):
+    cursor.execute(query_actividades)
+    actividades = {
+        id_actividad: (cantidad, centesimos(ingresos if ingresos is not None else costo))
+        for id_actividad, cantidad, ingresos, costo in cursor.fetchall()
+    }
+    cursor.execute(query_turnos)
+    turnos = {id_turno: cantidad for id_turno, cantidad in cursor.fetchall()}
+    return actividades, turnos
+
+
+def leer(cursor):
+    cursor.execute("SELECT id_actividad, cantidad_alumnos, ingresos_totales FROM rollup_actividad")
+    actividades = {id_actividad: (cantidad, ingresos) for id_actividad, cantidad, ingresos in cursor.fetchall()}
+    cursor.execute("SELECT id_turno, clases_dictadas FROM rollup_turno")
+    turnos = {id_turno: cantidad for id_turno, cantidad in cursor.fetchall()}
+    return actividades, turnos
+
+
+#Lista de diferencias (tabla, id, guardado, esperado) entre los contadores y lo calculado
+def diferencias(guardado, esperado):
+    resultado = []
+    #un turno sin fila cuenta como 0 clases
+    for tabla, actual, correcto, vacio in zip(("rollup_actividad", "rollup_turno"), guardado, esperado, (None, 0)):
+        for clave in sorted(set(actual) | set(correcto)):
+            if actual.get(clave, vacio) != correcto.get(clave, vacio):
+                resultado.append((tabla, clave, actual.get(clave, vacio), correcto.get(clave, vacio)))
+    return resultado
+
+
+def reconstruir(db):
+    cursor = db.cursor()
+    try:
+        db.start_transaction()
+        #bloquea los contadores mientras se recalculan para que no se pierdan escrituras concurrentes
+        cursor.execute("SELECT COUNT(*) FROM rollup_actividad FOR UPDATE")
+        cursor.fetchall()
+        cursor.execute("SELECT COUNT(*) FROM rollup_turno FOR UPDATE")
+        cursor.fetchall()
+        actividades, turnos = calcular(cursor)
+        cursor.execute("DELETE FROM rollup_actividad")
+        cursor.execute("DELETE FROM rollup_turno")
+        cursor.executemany(
+            "INSERT INTO rollup_actividad (id_actividad, cantidad_alumnos, ingresos_totales) VALUES (%s, %s, %s)",
+            [(id_actividad, cantidad, ingresos) for id_actividad, (cantidad, ingresos) in actividades.items()],
+        )
+        cursor.executemany(
+            "INSERT INTO rollup_turno (id_turno, clases_dictadas) VALUES (%s, %s)",
+            list(turnos.items()),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye o verifica los contadores de rollup.")
+    parser.add_argument("--verify", action="store_true", help="solo compara y muestra las diferencias")
+    args = parser.parse_args()
+
+    db = get_db_connection()
+    try:
+        cursor = db.cursor()
+        drift = diferencias(leer(cursor), calcular(cursor))
+        cursor.close()
+
+        for tabla, clave, actual, correcto in drift:
+            print(f"{tabla} {clave}: guardado={actual} esperado={correcto}")
+        print(f"{len(drift)} diferencias")
+
+        if args.verify:
+            return 1 if drift else 0
+        reconstruir(db)
+        print("Contadores reconstruidos")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
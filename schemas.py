@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import time, date
-from typing import Optional
+from datetime import date
+from typing import Any, Optional
 
 class ActividadPost(BaseModel):
     nombre: str
@@ -17,13 +17,14 @@ class TurnoPost(BaseModel):
     hora_fin: str
 
 
+#Largos de las columnas de alumnos (migraciones/0001_esquema.sql)
 class AlumnoPost(BaseModel):
     ci_alumno: int
-    nombre: str
-    apellido: str
+    nombre: str = Field(max_length=50)
+    apellido: str = Field(max_length=50)
     fecha_nacimiento: date 
-    telefono: str = None
-    correo: str = None
+    telefono: str = Field(None, max_length=20)
+    correo: str = Field(None, max_length=100)
     contraseña: str = None
 
 class AlumnoResponse(BaseModel):
@@ -41,8 +42,8 @@ class ClaseResponse(BaseModel):
     id_actividad: int   
     nombre_actividad: str
     nombre_instructor: str 
-    hora_inicio: time
-    hora_fin: time
+    hora_inicio: str #HH:MM:SS tal cual lo da MySQL, puede pasar de 24 horas o ser negativa
+    hora_fin: str
     costo_actividad: int
 
 class AlumnoClaseRequest(BaseModel):
@@ -56,13 +57,17 @@ class LoginRequest(BaseModel):
 
 class LoginResponse(BaseModel):
     message: str
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: int #segundos desde epoch
+    ci_alumno: int
 
 class AlumnoUpdate(BaseModel):
-    nombre: Optional[str] = None
-    apellido: Optional[str] = None
+    nombre: Optional[str] = Field(None, max_length=50)
+    apellido: Optional[str] = Field(None, max_length=50)
     fecha_nacimiento: Optional[str] = None
-    telefono: Optional[str] = None
-    correo: Optional[str] = None
+    telefono: Optional[str] = Field(None, max_length=20)
+    correo: Optional[str] = Field(None, max_length=100)
     contraseña: Optional[str] = None
 
 class ActividadCantidad(BaseModel):
@@ -75,8 +80,164 @@ class ClasePost(BaseModel):
     nombre_actividad: str  
     id_turno: int
     dictada: bool
+    cupo: Optional[int] = Field(None, ge=1) #sin cupo la clase no tiene limite de alumnos
 
 class InstructorPost(BaseModel):
     ci_instructor: int
     nombre: str
-    apellido: str
\ No newline at end of file
+    apellido: str
+
+#############################################################################################
+#                               RESPUESTAS                                                  #
+#############################################################################################
+
+#Los listados paginados permiten pedir solo algunas columnas (fields), por eso todo menos la clave es
+#opcional; las columnas que no se pidieron no aparecen en la respuesta.
+class ActividadResponse(BaseModel):
+    id_actividad: int
+    nombre: Optional[str] = None
+    descripcion: Optional[str] = None
+    costo: Optional[float] = None
+
+class AlumnoListadoResponse(BaseModel):
+    ci_alumno: int
+    nombre: Optional[str] = None
+    apellido: Optional[str] = None
+    fecha_nacimiento: Optional[date] = None
+    telefono: Optional[str] = None
+    correo: Optional[str] = None
+
+class InstructorResponse(BaseModel):
+    ci_instructor: int
+    nombre: Optional[str] = None
+    apellido: Optional[str] = None
+
+class EquipamientoResponse(BaseModel):
+    id_equipamiento: int
+    id_actividad: Optional[int] = None
+    descripcion: Optional[str] = None
+    costo: Optional[float] = None
+
+class TurnoResponse(BaseModel):
+    id_turno: int
+    hora_inicio: str
+    hora_fin: str
+
+class TurnoClases(BaseModel):
+    turno: str
+    clases_dictadas: int
+
+class ActividadIngresos(BaseModel):
+    actividad: str
+    ingresos_totales: Optional[float] = None
+
+class ClaseAlumno(BaseModel):
+    id_clase: int
+    nombre_actividad: str
+    nombre_instructor: str
+    hora_inicio: str
+    hora_fin: str
+
+class ClasesAlumnoResponse(BaseModel):
+    ci_alumno: int
+    clases_inscriptas: list[ClaseAlumno]
+
+class ClaseCreadaResponse(BaseModel):
+    id_clase: int
+    ci_instructor: int
+    nombre_actividad: str
+    id_turno: int
+    dictada: bool
+    cupo: Optional[int] = None
+
+class MensajeResponse(BaseModel):
+    message: str
+
+class DetalleResponse(BaseModel):
+    detail: str
+
+class AlumnoMensajeResponse(BaseModel):
+    message: str
+    ci_alumno: int
+
+#En los resultados por fila, errores y detalle solo vienen cuando la fila no se pudo procesar
+class ImportacionResultado(BaseModel):
+    fila: int
+    ci_alumno: Any = None #en una fila invalida es el valor tal cual vino
+    estado: str
+    errores: Optional[list[str]] = None
+
+class ImportacionResponse(BaseModel):
+    creados: int
+    duplicados: int
+    invalidos: int
+    resultados: list[ImportacionResultado]
+
+class InscripcionResponse(BaseModel):
+    message: str
+    data: AlumnoClaseRequest
+
+class InscripcionResultado(BaseModel):
+    id_clase: int
+    ci_alumno: int
+    estado: str
+    detalle: Optional[str] = None
+
+class InscripcionLoteResponse(BaseModel):
+    inscritos: int
+    rechazados: int
+    resultados: list[InscripcionResultado]
+
+class DesinscripcionResponse(BaseModel):
+    message: str
+    ci_alumno: int
+    id_clase: int
+    promovido: Optional[int] = None #CI del alumno que paso de la lista de espera a la clase
+
+class ListaEsperaPosicion(BaseModel):
+    id_clase: int
+    ci_alumno: int
+    posicion: int
+
+class ListaEsperaResponse(BaseModel):
+    message: str
+    id_clase: int
+    ci_alumno: int
+    posicion: int
+
+class ListaEsperaBajaResponse(BaseModel):
+    message: str
+    id_clase: int
+    ci_alumno: int
+
+class PoolStats(BaseModel):
+    pool_size: int
+    max_overflow: int
+    opened: int
+    in_use: int
+    idle: int
+    waiting: int
+    checkouts: int
+    timeouts: int
+    discarded: int
+    checkout_avg_ms: float
+    checkout_max_ms: float
+
+class LimiteStats(BaseModel):
+    permitidos: int
+    rechazados: int
+    claves: int
+
+class LoginStats(BaseModel):
+    por_ip: LimiteStats
+    por_correo: LimiteStats
+
+class CacheStats(BaseModel):
+    enabled: bool
+    ttl: float
+    max_entries: int
+    hits: int
+    misses: int
+    invalidations: int
+    evictions: int
+    entries: int
@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+#############################################################################################
+#                               CONTRASEÑAS                                                 #
+#############################################################################################
+
+#Las contraseñas se guardan como pbkdf2_sha256$iteraciones$sal$hash. Calcularlas es lento a proposito,
+#por eso corren en hash_executor: un pool chico y acotado, asi muchos logins juntos no se comen todo el
+#CPU ni los threads que atienden las demas rutas.
+algoritmo = "pbkdf2_sha256"
+iteraciones = int(os.getenv("PASSWORD_ITERATIONS", "600000"))
+hash_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PASSWORD_WORKERS", str(os.cpu_count() or 2))),
+    thread_name_prefix="password",
+)
+
+
+def _pbkdf2(password, sal, rondas):
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, rondas)
+
+
+def hash_password(password, rondas=None):
+    rondas = rondas or iteraciones
+    sal = secrets.token_bytes(16)
+    digest = _pbkdf2(password, sal, rondas)
+    return "$".join((
+        algoritmo,
+        str(rondas),
+        base64.b64encode(sal).decode("ascii"),
+        base64.b64encode(digest).decode("ascii"),
+    ))
+
+
+def es_hash(valor):
+    return valor is not None and valor.startswith(algoritmo + "$")
+
+
+#Devuelve (correcta, hay_que_rehashear). Las filas viejas tienen la contraseña en texto plano: si
+#coincide se pide rehashear, igual que si el hash se hizo con menos iteraciones que las actuales.
+def verify_password(password, guardado):
+    if guardado is None:
+        return False, False
+    if not es_hash(guardado):
+        correcta = hmac.compare_digest(password.encode("utf-8"), guardado.encode("utf-8"))
+        return correcta, correcta
+    try:
+        _, rondas, sal, digest = guardado.split("$")
+        rondas = int(rondas)
+        sal = base64.b64decode(sal)
+        digest = base64.b64decode(digest)
+    except ValueError:
+        return False, False
+    correcta = hmac.compare_digest(_pbkdf2(password, sal, rondas), digest)
+    return correcta, correcta and rondas < iteraciones
+
+
+_hash_ficticio = None
+
+#Para un correo que no existe se verifica igual contra un hash cualquiera, asi la respuesta tarda lo
+#mismo y no se puede saber que correos estan registrados.
+def verify_dummy(password):
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = hash_password(secrets.token_hex(8))
+    verify_password(password, _hash_ficticio)
+    return False, False
+
+
+#Versiones que corren en hash_executor, para rutas async y para rutas def
+async def hash_password_async(password):
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, hash_password, password)
+
+async def verify_password_async(password, guardado):
+    if guardado is None:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, verify_dummy, password)
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, verify_password, password, guardado)
+
+def hash_passwords_pool(passwords):
+    return list(hash_executor.map(hash_password, passwords))
+
+
+#############################################################################################
+#                               TOKENS                                                      #
+#############################################################################################
+
+#Token de sesion firmado con HMAC-SHA256: base64url(json con sub, exp, jti y rol) + "." + base64url(firma).
+#Se verifica sin ir a la base. /login da tokens de alumno, sin rol; los del personal (ver roles_personal)
+#se firman con python security.py. Con varios procesos TOKEN_SECRET tiene que ser el mismo en todos; si no
+#se define se genera uno al arrancar y los tokens dejan de valer al reiniciar.
+token_secret = os.getenv("TOKEN_SECRET", "").encode("utf-8") or secrets.token_bytes(32)
+token_ttl = int(os.getenv("TOKEN_TTL", "3600"))
+
+
+def _b64(datos):
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode("ascii")
+
+
+def _unb64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _firma(payload):
+    return hmac.new(token_secret, payload.encode("ascii"), hashlib.sha256).digest()
+
+
+#Roles del personal que pueden operar sobre varios alumnos, por ejemplo inscribir a un grupo de una escuela
+roles_personal = ("admin", "escuela")
+
+
+def crear_token(sub, rol=None):
+    vence = int(time.time()) + token_ttl
+    datos = {"sub": sub, "exp": vence, "jti": secrets.token_hex(8)}
+    if rol is not None:
+        datos["rol"] = rol
+    payload = _b64(json.dumps(datos, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_b64(_firma(payload))}", vence
+
+
+#Devuelve los datos del token o None si la firma no coincide, vencio o fue revocado
+def verificar_token(token):
+    try:
+        payload, firma = token.split(".")
+        if not hmac.compare_digest(_unb64(firma), _firma(payload)):
+            return None
+        datos = json.loads(_unb64(payload))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(datos, dict) or datos.get("exp", 0) < time.time():
+        return None
+    if tokens_revocados.revocado(datos.get("jti")):
+        return None
+    return datos
+
+
+#Tokens revocados con /logout. Solo hace falta recordarlos hasta que vencen, asi la lista queda chica.
+class Denylist:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revocados = {}  #jti -> vencimiento
+
+    def revocar(self, jti, vence):
+        ahora = time.time()
+        with self._lock:
+            self._revocados[jti] = vence
+            for viejo in [j for j, v in self._revocados.items() if v < ahora]:
+                del self._revocados[viejo]
+
+    def revocado(self, jti):
+        with self._lock:
+            return jti in self._revocados
+
+    def __len__(self):
+        with self._lock:
+            return len(self._revocados)
+
+
+tokens_revocados = Denylist()
+
+
+#############################################################################################
+#                               LIMITE DE INTENTOS                                          #
+#############################################################################################
+
+#Token bucket por clave: cada clave arranca con `capacidad` intentos y recupera `por_segundo` por
+#segundo. Se guardan como mucho `max_claves` claves; al pasarse se olvida la usada hace mas tiempo
+#(una clave olvidada vuelve con el balde lleno, que es lo mismo que le pasaria tras esperar).
+class RateLimiter:
+    def __init__(self, capacidad, por_segundo, max_claves=100000):
+        self.capacidad = capacidad
+        self.por_segundo = por_segundo
+        self.max_claves = max_claves
+        self._lock = threading.Lock()
+        self._baldes = OrderedDict()  #clave -> (tokens, ultima_vez)
+        self.permitidos = 0
+        self.rechazados = 0
+
+    #Devuelve 0 si se permite el intento o los segundos que hay que esperar
+    def consumir(self, clave):
+        ahora = time.monotonic()
+        with self._lock:
+            tokens, ultima = self._baldes.pop(clave, (self.capacidad, ahora))
+            tokens = min(self.capacidad, tokens + (ahora - ultima) * self.por_segundo)
+            if tokens >= 1:
+                tokens -= 1
+                espera = 0.0
+                self.permitidos += 1
+            else:
+                espera = (1 - tokens) / self.por_segundo
+                self.rechazados += 1
+            self._baldes[clave] = (tokens, ahora)
+            if len(self._baldes) > self.max_claves:
+                self._baldes.popitem(last=False)
+            return espera
+
+    def stats(self):
+        with self._lock:
+            return {"permitidos": self.permitidos, "rechazados": self.rechazados, "claves": len(self._baldes)}
+
+
+#Limites de /login, configurables por despliegue
+login_por_ip = RateLimiter(
+    capacidad=float(os.getenv("LOGIN_IP_BURST", "20")),
+    por_segundo=float(os.getenv("LOGIN_IP_RATE", "1")),
+)
+login_por_correo = RateLimiter(
+    capacidad=float(os.getenv("LOGIN_CORREO_BURST", "5")),
+    por_segundo=float(os.getenv("LOGIN_CORREO_RATE", "0.1")),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Firma un token de sesion con TOKEN_SECRET.")
+    parser.add_argument("sub", type=int, help="cedula del alumno o del integrante del personal")
+    parser.add_argument("--rol", choices=roles_personal, help="rol del personal; sin rol es un token de alumno")
+    args = parser.parse_args()
+
+    if not os.getenv("TOKEN_SECRET"):
+        print("Defina TOKEN_SECRET igual que en el servidor", file=sys.stderr)
+        return 1
+    token, vence = crear_token(args.sub, args.rol)
+    print(token)
+    print(f"vence {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(vence))}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import threading
+
+import mysql.connector
+from mysql.connector import errorcode
+
+import security
+from consultas import consultas, normalizar
+from consultas import nombre_de as consultas_nombre_de
+
+
+#MySQL en memoria para los tests: reemplaza a mysql.connector.connect y reconoce cada sentencia por su
+#nombre en consultas.py. Cada test dice que devuelve cada consulta con base.responder(nombre, funcion);
+#funcion(conexion, params) devuelve una lista de dicts (filas) o un int (filas afectadas) y puede lanzar
+#los errores de mysql.connector. Las escrituras anotan en conexion.deshacer como volver atras, asi
+#rollback funciona como en la base.
+
+def nombre_de(sentencia):
+    nombre = consultas_nombre_de(sentencia)
+    if nombre is None:
+        raise AssertionError(f"Sentencia que no esta en consultas.py: {normalizar(sentencia)}")
+    return nombre
+
+
+class BaseFalsa:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.respuestas = {}
+        self.ejecutadas = []  #nombres en el orden en que se ejecutaron
+        self.conexiones = 0
+
+    def responder(self, nombre, funcion):
+        assert nombre in consultas, nombre
+        self.respuestas[nombre] = funcion
+
+    def conectar(self, **config):
+        with self.lock:
+            self.conexiones += 1
+        return ConexionFalsa(self)
+
+    def cuantas(self, nombre=None):
+        with self.lock:
+            return len(self.ejecutadas) if nombre is None else self.ejecutadas.count(nombre)
+
+
+class ConexionFalsa:
+    def __init__(self, base):
+        self.base = base
+        self.deshacer = []
+
+    def cursor(self, dictionary=False, **kwargs):
+        return CursorFalso(self, dictionary)
+
+    def commit(self):
+        self.deshacer.clear()
+
+    def rollback(self):
+        with self.base.lock:
+            for funcion in reversed(self.deshacer):
+                funcion()
+        self.deshacer.clear()
+
+    def reset_session(self):
+        self.rollback()
+
+    def start_transaction(self, **kwargs):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class CursorFalso:
+    def __init__(self, conexion, dictionary):
+        self.conexion = conexion
+        self.dictionary = dictionary
+        self.filas = []
+        self.rowcount = -1
+        self.lastrowid = None
+        self.column_names = ()
+        self.statement = None
+
+    def execute(self, sentencia, params=()):
+        nombre = nombre_de(sentencia)
+        base = self.conexion.base
+        with base.lock:
+            base.ejecutadas.append(nombre)
+        if nombre not in base.respuestas:
+            raise AssertionError(f"El test no dice que devuelve {nombre}")
+        #como en mysql.connector, statement es la sentencia con los valores ya puestos
+        self.statement = sentencia.replace("%s", "{!r}").format(*(params or ()))
+        resultado = base.respuestas[nombre](self.conexion, tuple(params or ()))
+        if isinstance(resultado, int):
+            self.filas, self.rowcount = [], resultado
+        else:
+            self.filas = list(resultado or [])
+            self.rowcount = len(self.filas)
+            self.column_names = tuple(self.filas[0]) if self.filas else ()
+            if not self.dictionary:
+                self.filas = [tuple(fila.values()) for fila in self.filas]
+
+    def executemany(self, sentencia, seq_params):
+        total = 0
+        for params in seq_params:
+            self.execute(sentencia, params)
+            total += max(self.rowcount, 0)
+        self.rowcount = total
+
+    def fetchone(self):
+        return self.filas.pop(0) if self.filas else None
+
+    def fetchmany(self, cantidad=1):
+        filas, self.filas = self.filas[:cantidad], self.filas[cantidad:]
+        return filas
+
+    def fetchall(self):
+        filas, self.filas = self.filas, []
+        return filas
+
+    def close(self):
+        pass
+
+
+#Clases con cupo, inscripciones y listas de espera en memoria, con las consultas de inscripcion de
+#consultas.py respondidas sobre ellas. Cada sentencia es atomica (toma base.lock) como lo es en InnoDB,
+#incluida la clave unica de alumno_clase.
+class ClasesFalsas:
+    def __init__(self, base):
+        self.base = base
+        self.cupos = {}            #id_clase -> [cupo, cupos_disponibles]
+        self.inscriptos = set()    #(id_clase, ci_alumno)
+        self.espera = []           #[id_espera, id_clase, ci_alumno, id_equipamiento] en orden de llegada
+        self.cantidad_alumnos = {} #id_clase -> contador de rollup
+        for nombre in dir(self):
+            if nombre in consultas:
+                base.responder(nombre, getattr(self, nombre))
+
+    def clase(self, id_clase, cupo=None):
+        self.cupos[id_clase] = [cupo, cupo]
+        self.cantidad_alumnos[id_clase] = 0
+
+    def cambiar(self, conexion, tabla, clave, valor):
+        #con base.lock tomado
+        anterior = tabla[clave]
+        tabla[clave] = valor
+        conexion.deshacer.append(lambda: tabla.__setitem__(clave, anterior))
+
+    def reservar_cupo(self, conexion, params):
+        with self.base.lock:
+            clase = self.cupos.get(params[0])
+            if clase is None or clase[1] is None or clase[1] <= 0:
+                return 0
+            clase[1] -= 1
+            conexion.deshacer.append(lambda: clase.__setitem__(1, clase[1] + 1))
+            return 1
+
+    def cupos_clase(self, conexion, params):
+        with self.base.lock:
+            clase = self.cupos.get(params[0])
+            return [] if clase is None else [{"cupos_disponibles": clase[1]}]
+
+    def liberar_cupo(self, conexion, params):
+        with self.base.lock:
+            clase = self.cupos.get(params[0])
+            if clase is None or clase[1] is None or clase[1] >= clase[0]:
+                return 0
+            clase[1] += 1
+            conexion.deshacer.append(lambda: clase.__setitem__(1, clase[1] - 1))
+            return 1
+
+    def insertar_inscripcion(self, conexion, params):
+        with self.base.lock:
+            clave = tuple(params[:2])
+            if clave[0] not in self.cupos:
+                raise mysql.connector.IntegrityError(msg="Cannot add or update a child row", errno=errorcode.ER_NO_REFERENCED_ROW_2)
+            if clave in self.inscriptos:
+                raise mysql.connector.IntegrityError(msg=f"Duplicate entry '{clave}'", errno=errorcode.ER_DUP_ENTRY)
+            self.inscriptos.add(clave)
+            conexion.deshacer.append(lambda: self.inscriptos.discard(clave))
+            return 1
+
+    insertar_inscripcion_equipamiento = insertar_inscripcion
+
+    def borrar_inscripcion(self, conexion, params):
+        with self.base.lock:
+            clave = (params[1], params[0])
+            if clave not in self.inscriptos:
+                return 0
+            self.inscriptos.discard(clave)
+            conexion.deshacer.append(lambda: self.inscriptos.add(clave))
+            return 1
+
+    def inscripciones_alumno(self, conexion, params):
+        with self.base.lock:
+            return [{"id_clase": id_clase} for id_clase, ci_alumno in sorted(self.inscriptos) if ci_alumno == params[0]]
+
+    def borrar_inscripciones_alumno(self, conexion, params):
+        with self.base.lock:
+            borradas = {clave for clave in self.inscriptos if clave[1] == params[0]}
+            self.inscriptos -= borradas
+            conexion.deshacer.append(lambda: self.inscriptos.update(borradas))
+            return len(borradas)
+
+    def borrar_esperas_alumno(self, conexion, params):
+        with self.base.lock:
+            return self.quitar_espera(conexion, [fila for fila in self.espera if fila[2] == params[0]])
+
+    def rollup_quitar_alumno(self, conexion, params):
+        with self.base.lock:
+            clases = [id_clase for id_clase, ci_alumno in self.inscriptos if ci_alumno == params[0]]
+            for id_clase in clases:
+                self.cambiar(conexion, self.cantidad_alumnos, id_clase, self.cantidad_alumnos[id_clase] - 1)
+            return len(clases)
+
+    def rollup_sumar_alumno(self, conexion, params):
+        with self.base.lock:
+            id_clase = params[1]
+            self.cambiar(conexion, self.cantidad_alumnos, id_clase, self.cantidad_alumnos[id_clase] + params[2])
+            return 1
+
+    def primero_lista_espera(self, conexion, params):
+        with self.base.lock:
+            for id_espera, id_clase, ci_alumno, id_equipamiento in self.espera:
+                if id_clase == params[0]:
+                    return [{"id_espera": id_espera, "ci_alumno": ci_alumno, "id_equipamiento": id_equipamiento}]
+            return []
+
+    def quitar_espera(self, conexion, filas):
+        #con base.lock tomado
+        for fila in filas:
+            self.espera.remove(fila)
+        conexion.deshacer.append(lambda: self.espera.extend(filas) or self.espera.sort())
+        return len(filas)
+
+    def borrar_espera(self, conexion, params):
+        with self.base.lock:
+            return self.quitar_espera(conexion, [fila for fila in self.espera if fila[0] == params[0]])
+
+    def salir_lista_espera(self, conexion, params):
+        with self.base.lock:
+            return self.quitar_espera(conexion, [fila for fila in self.espera if fila[1:3] == list(params)])
+
+    def insertar_espera(self, conexion, params):
+        with self.base.lock:
+            if any(fila[1:3] == list(params[:2]) for fila in self.espera):
+                raise mysql.connector.IntegrityError(msg="Duplicate entry", errno=errorcode.ER_DUP_ENTRY)
+            fila = [max([fila[0] for fila in self.espera], default=0) + 1, *params]
+            self.espera.append(fila)
+            conexion.deshacer.append(lambda: self.espera.remove(fila))
+            return 1
+
+    def estado_clase_espera(self, conexion, params):
+        with self.base.lock:
+            ci_alumno, id_clase = params
+            if id_clase not in self.cupos:
+                return []
+            return [{"cupos_disponibles": self.cupos[id_clase][1], "inscripto": int((id_clase, ci_alumno) in self.inscriptos)}]
+
+    def posicion_lista_espera(self, conexion, params):
+        with self.base.lock:
+            filas = [fila[2] for fila in self.espera if fila[1] == params[0]]
+            return [{"posicion": filas.index(params[1]) + 1 if params[1] in filas else 0}]
+
+
+#Header de un alumno logueado (o del personal, con rol), sin pasar por /login
+def autorizacion(ci_alumno, rol=None):
+    token, _ = security.crear_token(ci_alumno, rol)
+    return {"Authorization": f"Bearer {token}"}
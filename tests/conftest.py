@@ -0,0 +1,49 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+#antes de importar la app: hashes rapidos, un secreto fijo y sin EXPLAIN de las consultas lentas
+os.environ.setdefault("PASSWORD_ITERATIONS", "1000")
+os.environ.setdefault("TOKEN_SECRET", "tests")
+os.environ.setdefault("SLOW_QUERY_EXPLAIN", "0")
+
+import httpx
+import mysql.connector
+import pytest
+
+import database
+import main
+import security
+from base_falsa import BaseFalsa
+from cache import TTLCache
+from timetable import Timetable
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+#Base falsa y estado en memoria de la app limpio para cada test
+@pytest.fixture
+def base(monkeypatch):
+    base = BaseFalsa()
+    monkeypatch.setattr(mysql.connector, "connect", base.conectar)
+    monkeypatch.setattr(main, "db_slots", asyncio.Semaphore(database.pool_capacity))
+    monkeypatch.setattr(main, "catalog_cache", TTLCache())
+    monkeypatch.setattr(main, "timetable", Timetable())
+    monkeypatch.setattr(security, "login_por_ip", security.RateLimiter(capacidad=20, por_segundo=1))
+    monkeypatch.setattr(security, "login_por_correo", security.RateLimiter(capacidad=5, por_segundo=0.1))
+    monkeypatch.setattr(security, "tokens_revocados", security.Denylist())
+    yield base
+    database.pool.dispose()
+
+
+#Cliente que llama a la app sin levantar un servidor (no corre el lifespan, asi no verifica el esquema)
+@pytest.fixture
+async def cliente(base):
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://test", timeout=30) as cliente:
+        yield cliente
@@ -0,0 +1,53 @@
+import pytest
+
+import main
+from cache import TTLCache
+
+
+def test_lru_descarta_la_menos_usada():
+    cache = TTLCache(max_entries=2)
+    cache.set("turnos", "a", 1, 0)
+    cache.set("turnos", "b", 2, 0)
+    assert cache.get("turnos", "a")[0]
+    cache.set("instructores", "c", 3, 0)
+
+    assert cache.get("turnos", "a")[:2] == (True, 1)
+    assert not cache.get("turnos", "b")[0]
+    assert cache.get("instructores", "c")[:2] == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidar_solo_borra_su_espacio():
+    cache = TTLCache()
+    cache.set("turnos", "a", 1, 0)
+    cache.set("instructores", "a", 2, 0)
+    cache.invalidate("turnos")
+
+    assert not cache.get("turnos", "a")[0]
+    assert cache.get("instructores", "a")[:2] == (True, 2)
+    assert cache.stats()["entries"] == 1
+
+
+#Cada combinacion de parametros de pagina es una clave distinta; un cliente que pide miles de paginas
+#distintas no hace crecer la cache mas alla de max_entries
+@pytest.mark.anyio
+async def test_paginas_distintas_no_agrandan_la_cache(base, cliente, monkeypatch):
+    monkeypatch.setattr(main, "catalog_cache", TTLCache(max_entries=50))
+    base.responder(
+        "pagina_siguiente",
+        lambda conexion, params: [{"ci_instructor": params[0] + 1, "nombre": "Hugo", "apellido": "Gomez"}],
+    )
+
+    for after in range(500):
+        respuesta = await cliente.get("/instructores", params={"after": after, "limit": 1})
+        assert respuesta.status_code == 200
+
+    estado = main.catalog_cache.stats()
+    assert estado["entries"] == 50
+    assert estado["evictions"] == 450
+
+    respuesta = await cliente.get("/estadisticas/cache")
+    assert respuesta.json() == estado
+    assert set(respuesta.json()) == {
+        "enabled", "ttl", "max_entries", "hits", "misses", "invalidations", "evictions", "entries"
+    }
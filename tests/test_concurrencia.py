@@ -0,0 +1,48 @@
+import threading
+
+import anyio
+import pytest
+
+
+#Una consulta lenta ocupa un thread y una conexion, pero el event loop sigue libre: mientras tanto las
+#demas requests se atienden y terminan.
+@pytest.mark.anyio
+async def test_una_consulta_lenta_no_frena_a_las_demas(base, cliente):
+    empezo = threading.Event()
+    liberar = threading.Event()
+
+    def lenta(conexion, params):
+        empezo.set()
+        liberar.wait(10)
+        return [{"actividad": "Yoga", "ingresos_totales": 1000}]
+
+    base.responder("ingresos_totales", lenta)
+    base.responder("turnos_clases", lambda conexion, params: [{"turno": "08:00 - 09:30", "clases_dictadas": 3}])
+
+    async with anyio.create_task_group() as grupo:
+        resultado_lenta = {}
+
+        async def pedir_lenta():
+            resultado_lenta["respuesta"] = await cliente.get("/ingresos_totales")
+
+        grupo.start_soon(pedir_lenta)
+        with anyio.fail_after(5):
+            while not empezo.is_set():
+                await anyio.sleep(0.01)
+
+        rapidas = []
+
+        async def pedir_rapida():
+            rapidas.append(await cliente.get("/turnos/clases"))
+
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as rapido:
+                for _ in range(20):
+                    rapido.start_soon(pedir_rapida)
+
+        assert [respuesta.status_code for respuesta in rapidas] == [200] * 20
+        assert "respuesta" not in resultado_lenta  #la lenta sigue esperando
+        liberar.set()
+
+    assert resultado_lenta["respuesta"].status_code == 200
+    assert resultado_lenta["respuesta"].json() == [{"actividad": "Yoga", "ingresos_totales": 1000}]
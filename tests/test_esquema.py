@@ -0,0 +1,78 @@
+import collections
+import logging
+import re
+
+import pytest
+
+import esquema
+import main
+
+
+#Nombres de indices, claves y restricciones que declaran las migraciones. En una base nueva todas tienen
+#que correr sin caer en ya_existe de esquema.py, y el volcado de benchmarks/generador.py no saltea nada.
+#Los ALTER que se arman en texto (0009) solo corren si la clave falta, no cuentan.
+declaracion = re.compile(
+    r"\b(?:CREATE\s+(?:UNIQUE\s+)?INDEX|(?:UNIQUE\s+)?(?<!DUPLICATE )KEY|CONSTRAINT)\s+(\w+)", re.IGNORECASE
+)
+
+
+def test_migraciones_no_repiten_nombres():
+    nombres = collections.Counter(
+        nombre
+        for _, _, ruta in esquema.migraciones()
+        for sentencia in esquema.sentencias(ruta)
+        for nombre in declaracion.findall(re.sub(r"'[^']*'", "''", sentencia))
+    )
+
+    assert {"idx_alumno_clase_alumno", "idx_clase_actividad", "idx_actividades_nombre"} <= set(nombres)
+    assert [nombre for nombre, veces in nombres.items() if veces > 1] == []
+
+
+#Los contadores de rollup se cargan desde las tablas base en las migraciones, despues de crearlos; no
+#dependen de que alguien corra rollups.py a mano
+def test_migraciones_cargan_los_rollups():
+    primera = {}
+    for version, _, ruta in esquema.migraciones():
+        for sentencia in esquema.sentencias(ruta):
+            accion = re.match(r"(CREATE TABLE IF NOT EXISTS|INSERT INTO) (rollup_\w+)", sentencia)
+            if accion:
+                primera.setdefault((accion.group(1).split()[0], accion.group(2)), version)
+
+    for tabla in ("rollup_actividad", "rollup_turno"):
+        assert primera[("INSERT", tabla)] > primera[("CREATE", tabla)]
+
+
+#Cada clave foranea de 0001 se rehace en 0009 con el mismo ON DELETE, para las bases que ya tenian las
+#tablas y no la recibieron por el CREATE TABLE IF NOT EXISTS
+def test_claves_foraneas_de_0001_en_bases_existentes():
+    clave = r"CONSTRAINT (\w+) FOREIGN KEY \((\w+)\) REFERENCES (\w+) \((\w+)\) ON DELETE (CASCADE|SET NULL)"
+    rutas = {version: ruta for version, _, ruta in esquema.migraciones()}
+
+    def claves(version):
+        return {
+            (tabla,) + coincidencia
+            for sentencia in esquema.sentencias(rutas[version])
+            for tabla in re.findall(r"(?:CREATE TABLE IF NOT EXISTS|ALTER TABLE) (\w+)", sentencia)[:1]
+            for coincidencia in re.findall(clave, sentencia)
+        }
+
+    assert len(claves(1)) == 8
+    assert claves(9) == claves(1)
+
+
+#Con SCHEMA_CHECK=warn la app arranca igual y el aviso sale por logging
+@pytest.mark.anyio
+async def test_esquema_desactualizado_avisa_por_log(base, monkeypatch, caplog):
+    def verificar(db):
+        raise esquema.EsquemaDesactualizado("la base esta en la version 6, se esperaba la 8")
+
+    monkeypatch.setattr(esquema, "schema_check", "warn")
+    monkeypatch.setattr(esquema, "verificar", verificar)
+
+    with caplog.at_level(logging.WARNING, logger="main"):
+        async with main.lifespan(main.app):
+            pass
+
+    assert [registro.getMessage() for registro in caplog.records] == [
+        "Esquema desactualizado: la base esta en la version 6, se esperaba la 8"
+    ]
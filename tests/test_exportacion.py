@@ -0,0 +1,71 @@
+import datetime
+import decimal
+import json
+
+import anyio
+import pytest
+
+import database
+import main
+from responses import FastJSONResponse
+
+
+def pedido(ruta):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": ruta,
+        "raw_path": ruta.encode(),
+        "query_string": b"formato=ndjson",
+        "root_path": "",
+        "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 5000),
+        "server": ("test", 80),
+    }
+
+
+#Si el cliente se va a mitad de la exportacion, la conexion igual vuelve al pool (descartada, porque
+#quedaron filas sin leer)
+@pytest.mark.anyio
+async def test_cliente_que_se_desconecta_no_se_lleva_la_conexion(base):
+    base.responder(
+        "exportar",
+        lambda conexion, params: [{"id_clase": i, "ci_alumno": i, "id_equipamiento": None} for i in range(10000)],
+    )
+    antes = database.pool.stats()
+    leido = anyio.Event()
+    pedidos = []
+
+    async def receive():
+        if not pedidos:
+            pedidos.append(1)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await leido.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.body" and mensaje.get("body"):
+            leido.set()
+
+    with anyio.fail_after(5):
+        await main.app(pedido("/exportar/alumno_clase"), receive, send)
+        while database.pool.stats()["in_use"] != antes["in_use"]:
+            await anyio.sleep(0.01)
+
+    despues = database.pool.stats()
+    assert despues["opened"] == antes["opened"]
+    assert despues["discarded"] == antes["discarded"] + 1
+
+
+#/exportar y las respuestas normales serializan cada tipo de MySQL de la misma forma
+def test_exportacion_serializa_igual_que_las_respuestas():
+    columnas = ("costo", "cantidad", "fecha_nacimiento", "hora_inicio")
+    fila = (decimal.Decimal("1500.50"), decimal.Decimal("3"), datetime.date(2000, 1, 2), datetime.timedelta(hours=25, minutes=30))
+
+    exportada = json.loads(main.lote_ndjson(columnas, [fila]))
+
+    assert exportada == json.loads(FastJSONResponse(dict(zip(columnas, fila))).body)
+    assert exportada == {"costo": 1500.5, "cantidad": 3, "fecha_nacimiento": "2000-01-02", "hora_inicio": 91800.0}
@@ -0,0 +1,64 @@
+import decimal
+
+import pytest
+
+import main
+import responses
+from base_falsa import autorizacion
+
+
+#MySQL manda los TIME ya como texto (CAST ... AS CHAR): pasados de 24 horas, negativos y hasta el
+#maximo de TIME. Tienen que llegar a la respuesta tal cual, sin convertirse por fila en Python.
+horarios = [("25:30:00", "27:00:00"), ("-01:30:00", "00:15:00"), ("838:59:59", "-838:59:59"), ("08:00:00", "09:30:00")]
+
+
+def cronograma(conexion, params):
+    filas = [
+        {"id_clase": i + 1, "id_actividad": 1, "nombre_actividad": "Yoga", "costo_actividad": decimal.Decimal("1500.00"),
+         "nombre_instructor": "Hugo", "hora_inicio": inicio, "hora_fin": fin, "ci_instructor": 50000000, "id_turno": i + 1}
+        for i, (inicio, fin) in enumerate(horarios)
+    ]
+    return [fila for fila in filas if fila["id_clase"] == params[0]] if params else filas
+
+
+def responder_horarios(base):
+    base.responder("cronograma", cronograma)
+    base.responder("cronograma_clase", cronograma)
+    base.responder("turnos", lambda conexion, params: [
+        {"id_turno": i + 1, "hora_inicio": inicio, "hora_fin": fin} for i, (inicio, fin) in enumerate(horarios)
+    ])
+    base.responder("clases_alumno", lambda conexion, params: [
+        {"id_clase": i + 1, "nombre_actividad": "Yoga", "nombre_instructor": "Hugo", "hora_inicio": inicio, "hora_fin": fin}
+        for i, (inicio, fin) in enumerate(horarios)
+    ])
+
+
+async def horarios_de(cliente):
+    clases = (await cliente.get("/clases")).json()
+    turnos = (await cliente.get("/turnos")).json()
+    clases_alumno = (await cliente.get("/clases_alumno/10000000", headers=autorizacion(10000000))).json()["clases_inscriptas"]
+    return [[(fila["hora_inicio"], fila["hora_fin"]) for fila in filas] for filas in (clases, turnos, clases_alumno)]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("fast_json", [False, True])
+async def test_horarios_fuera_de_rango_pasan_tal_cual(base, cliente, monkeypatch, fast_json):
+    monkeypatch.setattr(responses, "fast_json", fast_json)
+    monkeypatch.setattr(main, "fast_json", fast_json)
+    responder_horarios(base)
+
+    assert await horarios_de(cliente) == [horarios] * 3
+
+
+#Una clase que se agrega al cronograma ya armado (add_clase) tambien conserva el horario
+@pytest.mark.anyio
+async def test_horario_negativo_en_clase_agregada(base, cliente):
+    responder_horarios(base)
+    base.responder("cronograma", lambda conexion, params: [fila for fila in cronograma(conexion, params) if fila["id_clase"] != 2])
+    assert len((await cliente.get("/clases")).json()) == 3
+
+    main.timetable.add_clase(base.conectar(), 2)
+    clases = (await cliente.get("/clases")).json()
+
+    assert [(clase["hora_inicio"], clase["hora_fin"]) for clase in clases] == horarios
+    assert base.cuantas("cronograma") == 1
@@ -0,0 +1,70 @@
+import mysql.connector
+import pytest
+from mysql.connector import errorcode
+
+import security
+
+
+def alumno(ci_alumno, **cambios):
+    return {"ci_alumno": ci_alumno, "nombre": "Ana", "apellido": "Perez", "fecha_nacimiento": "2000-01-01", **cambios}
+
+
+#Una fila que la base rechaza por sus datos (no por clave repetida) queda invalida y el resto se importa
+@pytest.mark.anyio
+async def test_importar_marca_invalidas_las_filas_que_la_base_rechaza(base, cliente):
+    creados = set()
+
+    def insertar_alumno(conexion, params):
+        if params[0] > 2147483647:
+            raise mysql.connector.DataError(msg="Out of range value for column 'ci_alumno'", errno=errorcode.ER_WARN_DATA_OUT_OF_RANGE)
+        creados.add(params[0])
+        conexion.deshacer.append(lambda: creados.discard(params[0]))
+        return 1
+
+    base.responder("alumnos_existentes", lambda conexion, params: [])
+    base.responder("insertar_alumno", insertar_alumno)
+
+    respuesta = await cliente.post("/alumnos/importar", json=[
+        alumno(10000001),
+        alumno(10000002, nombre="N" * 51),
+        alumno(9999999999),
+        alumno(10000003),
+    ])
+
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert [resultado["estado"] for resultado in datos["resultados"]] == ["creado", "invalido", "invalido", "creado"]
+    assert "Out of range" in datos["resultados"][2]["errores"][0]
+    assert creados == {10000001, 10000003}
+
+
+#Solo las filas con contraseña pasan por PBKDF2, todas juntas antes del executemany; las demas se
+#guardan sin contraseña
+@pytest.mark.anyio
+async def test_importar_hashea_solo_las_filas_con_contraseña(base, cliente, monkeypatch):
+    guardadas = {}
+    hasheadas = []
+
+    def hash_passwords_pool(passwords):
+        hasheadas.append(list(passwords))
+        return [security.hash_password(password) for password in passwords]
+
+    def insertar_alumno(conexion, params):
+        guardadas[params[0]] = params[6]
+        return 1
+
+    monkeypatch.setattr(security, "hash_passwords_pool", hash_passwords_pool)
+    base.responder("alumnos_existentes", lambda conexion, params: [])
+    base.responder("insertar_alumno", insertar_alumno)
+
+    respuesta = await cliente.post("/alumnos/importar", json=[
+        alumno(10000001, contraseña="uno"),
+        alumno(10000002),
+        alumno(10000003, contraseña="tres"),
+    ])
+
+    assert respuesta.json()["creados"] == 3
+    assert hasheadas == [["uno", "tres"]]
+    assert guardadas[10000002] is None
+    assert security.verify_password("uno", guardadas[10000001])[0]
+    assert security.verify_password("tres", guardadas[10000003])[0]
@@ -0,0 +1,152 @@
+import asyncio
+import math
+import time
+
+import mysql.connector
+import pytest
+from mysql.connector import errorcode
+
+from base_falsa import ClasesFalsas, autorizacion
+
+
+#Cientos de pedidos iguales a la vez: la clave unica de alumno_clase deja pasar uno solo y el resto
+#recibe 400 con el cupo devuelto
+@pytest.mark.anyio
+async def test_inscripciones_repetidas_en_paralelo(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=20)
+    ci_alumno = 10000000
+    headers = autorizacion(ci_alumno)
+    cantidad = 300
+
+    inicio = time.perf_counter()
+    respuestas = await asyncio.gather(*(
+        cliente.post("/inscribir_alumno", json={"id_clase": 1, "ci_alumno": ci_alumno}, headers=headers)
+        for _ in range(cantidad)
+    ))
+    segundos = time.perf_counter() - inicio
+    print(f"\n{cantidad} inscripciones repetidas en {segundos:.2f} s ({cantidad / segundos:.0f} pedidos/s)")
+
+    estados = [respuesta.status_code for respuesta in respuestas]
+    assert estados.count(200) == 1
+    assert estados.count(400) == cantidad - 1
+    assert clases.inscriptos == {(1, ci_alumno)}
+    assert clases.cupos[1] == [20, 19]
+    assert clases.cantidad_alumnos[1] == 1
+
+
+#El lugar que deja un alumno borrado pasa al primero de la lista de espera, como al desinscribirse
+@pytest.mark.anyio
+async def test_borrar_alumno_promueve_la_lista_de_espera(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=2)
+    clases.clase(2, cupo=5)
+    clases.cupos[1] = [2, 0]
+    clases.cupos[2] = [5, 4]
+    clases.inscriptos = {(1, 10000001), (1, 10000002), (2, 10000001)}
+    clases.cantidad_alumnos = {1: 2, 2: 1}
+    clases.espera = [[1, 1, 10000003, None]]
+    base.responder("buscar_alumno", lambda conexion, params: [{"ci_alumno": params[0]}])
+    base.responder("borrar_alumno", lambda conexion, params: 1)
+
+    respuesta = await cliente.delete("/alumnos/10000001")
+
+    assert respuesta.status_code == 200
+    assert clases.inscriptos == {(1, 10000002), (1, 10000003)}
+    assert clases.cupos == {1: [2, 0], 2: [5, 5]}
+    assert clases.espera == []
+    assert clases.cantidad_alumnos == {1: 2, 2: 0}
+
+
+#500 alumnos distintos piden los ultimos 10 lugares a la vez: entran 10 y el resto recibe 409
+@pytest.mark.anyio
+async def test_ultimos_cupos_sin_sobreventa(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=10)
+    cantidad = 500
+
+    async def inscribir(ci_alumno):
+        inicio = time.perf_counter()
+        respuesta = await cliente.post(
+            "/inscribir_alumno", json={"id_clase": 1, "ci_alumno": ci_alumno}, headers=autorizacion(ci_alumno)
+        )
+        return respuesta.status_code, time.perf_counter() - inicio
+
+    resultados = await asyncio.gather(*(inscribir(10000000 + i) for i in range(cantidad)))
+    latencias = sorted(duracion for _, duracion in resultados)
+    p99 = latencias[math.ceil(0.99 * len(latencias)) - 1]
+    print(f"\n{cantidad} clientes por 10 cupos, p99 {p99 * 1000:.0f} ms")
+
+    estados = [estado for estado, _ in resultados]
+    assert estados.count(200) == 10
+    assert estados.count(409) == cantidad - 10
+    assert len(clases.inscriptos) == 10
+    assert clases.cupos[1] == [10, 0]
+    assert clases.cantidad_alumnos[1] == 10
+
+
+#Un equipamiento que no existe se rechaza al anotarse y no llega a la promocion
+@pytest.mark.anyio
+async def test_lista_espera_con_equipamiento_inexistente(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=1)
+    clases.cupos[1] = [1, 0]
+
+    def insertar_espera(conexion, params):
+        if params[2] is not None:
+            raise mysql.connector.IntegrityError(msg="Cannot add or update a child row", errno=errorcode.ER_NO_REFERENCED_ROW_2)
+        return clases.insertar_espera(conexion, params)
+
+    base.responder("insertar_espera", insertar_espera)
+
+    respuesta = await cliente.post(
+        "/lista_espera", json={"id_clase": 1, "ci_alumno": 10000000, "id_equipamiento": 999}, headers=autorizacion(10000000)
+    )
+
+    assert respuesta.status_code == 404
+    assert clases.espera == []
+
+
+#El lote pide sesion y solo acepta inscripciones del alumno logueado
+@pytest.mark.anyio
+async def test_inscribir_alumnos_solo_del_alumno_de_la_sesion(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=5)
+    clases.clase(2, cupo=5)
+    propias = [{"id_clase": 1, "ci_alumno": 10000000}, {"id_clase": 2, "ci_alumno": 10000000}]
+
+    sin_sesion = await cliente.post("/inscribir_alumnos", json=propias)
+    ajena = await cliente.post(
+        "/inscribir_alumnos", json=propias + [{"id_clase": 1, "ci_alumno": 10000001}], headers=autorizacion(10000000)
+    )
+    assert sin_sesion.status_code == 401
+    assert ajena.status_code == 403
+    assert clases.inscriptos == set()
+
+    respuesta = await cliente.post("/inscribir_alumnos", json=propias, headers=autorizacion(10000000))
+    assert respuesta.status_code == 200
+    assert respuesta.json()["inscritos"] == 2
+    assert clases.inscriptos == {(1, 10000000), (2, 10000000)}
+
+
+#Una escuela inscribe a su grupo en la misma clase con un solo pedido: los que entran en el cupo quedan
+#inscriptos, el resto sale sin_cupo, y el cupo y el rollup se mueven una vez por inscripto
+@pytest.mark.anyio
+async def test_escuela_inscribe_un_grupo_en_una_clase(base, cliente):
+    clases = ClasesFalsas(base)
+    clases.clase(1, cupo=40)
+    grupo = [{"id_clase": 1, "ci_alumno": 10000000 + i} for i in range(45)]
+
+    alumno = await cliente.post("/inscribir_alumnos", json=grupo, headers=autorizacion(10000000))
+    assert alumno.status_code == 403
+
+    respuesta = await cliente.post("/inscribir_alumnos", json=grupo, headers=autorizacion(50000000, rol="escuela"))
+
+    assert respuesta.status_code == 200
+    datos = respuesta.json()
+    assert (datos["inscritos"], datos["rechazados"]) == (40, 5)
+    assert [r["estado"] for r in datos["resultados"]] == ["inscrito"] * 40 + ["sin_cupo"] * 5
+    assert clases.inscriptos == {(1, 10000000 + i) for i in range(40)}
+    assert clases.cupos[1] == [40, 0]
+    assert clases.cantidad_alumnos[1] == 40
+    assert base.cuantas("rollup_sumar_alumno") == 1
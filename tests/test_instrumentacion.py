@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+import instrumentation
+import security
+
+
+#Las consultas lentas se registran con sus %s y su nombre en consultas.py; la cedula, el correo y el hash
+#de la contraseña no llegan al log, y el EXPLAIN recibe los valores aparte
+@pytest.mark.anyio
+async def test_consulta_lenta_sin_datos_del_alumno(base, cliente, monkeypatch, caplog):
+    explicadas = []
+
+    def explain(sentencia, params=()):
+        explicadas.append((sentencia, params))
+        return "  table=alumnos type=const"
+
+    monkeypatch.setattr(instrumentation, "umbral_lento", 0)
+    monkeypatch.setattr(instrumentation, "explicar_lentas", True)
+    monkeypatch.setattr(instrumentation, "explain", explain)
+    base.responder("insertar_alumno", lambda conexion, params: 1)
+    base.responder("insertar_login", lambda conexion, params: 1)
+
+    with caplog.at_level(logging.WARNING, logger="sql"):
+        respuesta = await cliente.post("/register", json={
+            "ci_alumno": 10000000, "nombre": "Ana", "apellido": "Perez", "fecha_nacimiento": "2000-01-01",
+            "telefono": "099000000", "correo": "ana@correo.com", "contraseña": "secreta",
+        })
+        instrumentation.explain_executor.submit(lambda: None).result()
+
+    assert respuesta.status_code == 200
+    mensajes = [registro.getMessage() for registro in caplog.records]
+    assert [mensaje.split(" (")[0] for mensaje in mensajes] == [
+        "Consulta lenta insertar_alumno", "Consulta lenta insertar_login"
+    ]
+    assert all("%s" in mensaje and "table=alumnos" in mensaje for mensaje in mensajes)
+    assert not any(dato in mensaje for mensaje in mensajes for dato in ("10000000", "ana@correo.com", "pbkdf2"))
+
+    sentencia, params = explicadas[1]
+    assert sentencia.startswith("INSERT INTO login") and "%s" in sentencia
+    assert params[0] == "ana@correo.com" and security.es_hash(params[1])
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from base_falsa import autorizacion
+
+
+def sin_credenciales(base):
+    base.responder("credenciales_login", lambda conexion, params: [])
+    base.responder("credenciales_alumno", lambda conexion, params: [])
+
+
+def consultas_credenciales(base):
+    return base.cuantas("credenciales_login") + base.cuantas("credenciales_alumno")
+
+
+#Relleno de credenciales desde una IP: despues de la rafaga del limitador por IP (20 en conftest) los
+#intentos se cortan con 429 antes de pedir una conexion, asi las consultas no crecen con el ataque
+@pytest.mark.anyio
+async def test_relleno_de_credenciales_desde_una_ip(base, cliente):
+    sin_credenciales(base)
+
+    for cantidad in (100, 500):
+        respuestas = await asyncio.gather(*(
+            cliente.post("/login", json={"correo": f"victima{i}@correo.com", "contraseña": "adivinada"})
+            for i in range(cantidad)
+        ))
+        estados = [respuesta.status_code for respuesta in respuestas]
+        assert set(estados) <= {401, 429}
+        assert estados.count(401) <= 22
+
+    #dos consultas por intento que paso el limitador (login y, si no esta, alumnos)
+    assert consultas_credenciales(base) <= 2 * 22
+    assert base.conexiones <= 22
+
+
+#Muchas contraseñas contra un mismo correo: el limitador por correo (5 en conftest) corta antes
+@pytest.mark.anyio
+async def test_fuerza_bruta_contra_un_correo(base, cliente):
+    sin_credenciales(base)
+
+    respuestas = await asyncio.gather(*(
+        cliente.post("/login", json={"correo": "victima@correo.com", "contraseña": f"intento{i}"})
+        for i in range(15)
+    ))
+
+    estados = [respuesta.status_code for respuesta in respuestas]
+    assert estados.count(401) <= 6
+    assert estados.count(429) >= 9
+    assert consultas_credenciales(base) <= 2 * 6
+
+
+#Un token revocado con /logout se rechaza en memoria: ningun pedido con el llega a la base
+@pytest.mark.anyio
+async def test_token_revocado_no_llega_a_la_base(base, cliente):
+    headers = autorizacion(10000000)
+    assert (await cliente.post("/logout", headers=headers)).status_code == 200
+
+    respuestas = await asyncio.gather(*(cliente.get("/clases_alumno/10000000", headers=headers) for _ in range(200)))
+
+    assert all(respuesta.status_code == 401 for respuesta in respuestas)
+    assert base.cuantas() == 0
+    assert base.conexiones == 0
@@ -0,0 +1,32 @@
+import pytest
+
+import database
+import security
+
+
+#El hash de la contraseña corre antes de pedir la conexion, asi no la tiene tomada mientras dura
+@pytest.mark.anyio
+@pytest.mark.parametrize("metodo, ruta", [("POST", "/register"), ("POST", "/alumnos"), ("PUT", "/alumnos/10000000")])
+async def test_hash_sin_conexion_tomada(base, cliente, monkeypatch, metodo, ruta):
+    guardadas = []
+    en_uso = []
+    hash_password = security.hash_password
+
+    def hash_medido(password, rondas=None):
+        en_uso.append(database.pool.stats()["in_use"])
+        return hash_password(password, rondas)
+
+    monkeypatch.setattr(security, "hash_password", hash_medido)
+    base.responder("insertar_alumno", lambda conexion, params: guardadas.append(params[6]) or 1)
+    base.responder("insertar_login", lambda conexion, params: guardadas.append(params[1]) or 1)
+    base.responder("buscar_alumno", lambda conexion, params: [{"ci_alumno": params[0]}])
+    base.responder("actualizar_alumno", lambda conexion, params: guardadas.append(params[0]) or 1)
+    base.responder("actualizar_login_alumno", lambda conexion, params: guardadas.append(params[0]) or 1)
+
+    alumno = {"ci_alumno": 10000000, "nombre": "Ana", "apellido": "Perez", "fecha_nacimiento": "2000-01-01",
+              "telefono": "099000000", "correo": "ana@correo.com", "contraseña": "secreta"}
+    respuesta = await cliente.request(metodo, ruta, json=alumno if metodo == "POST" else {"contraseña": "secreta"})
+
+    assert respuesta.status_code == 200
+    assert en_uso == [0]
+    assert guardadas and all(security.es_hash(valor) and security.verify_password("secreta", valor)[0] for valor in guardadas)
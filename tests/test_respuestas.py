@@ -0,0 +1,58 @@
+import datetime
+import decimal
+
+import pytest
+
+import main
+import responses
+from base_falsa import autorizacion
+
+
+def respuestas_listados(base):
+    base.responder("pagina_primera", lambda conexion, params: [
+        {"ci_alumno": 10000000 + i, "nombre": "Ana", "apellido": "Perez", "fecha_nacimiento": datetime.date(2000, 1, 1 + i),
+         "telefono": None, "correo": f"ana{i}@correo.com"}
+        for i in range(3)
+    ])
+    base.responder("ingresos_totales", lambda conexion, params: [
+        {"actividad": "Yoga", "ingresos_totales": decimal.Decimal("1500.50")},
+        {"actividad": "Remo", "ingresos_totales": decimal.Decimal("800.00")},
+    ])
+    base.responder("turnos", lambda conexion, params: [{"id_turno": 1, "hora_inicio": "08:00:00", "hora_fin": "09:30:00"}])
+    base.responder("clases_alumno", lambda conexion, params: [
+        {"id_clase": 4, "nombre_actividad": "Yoga", "nombre_instructor": "Hugo", "hora_inicio": "08:00:00", "hora_fin": "09:30:00"}
+    ])
+
+
+pedidos = [
+    ("/alumnos", {}),
+    ("/ingresos_totales", {}),
+    ("/turnos", {}),
+    ("/clases_alumno/10000000", autorizacion(10000000)),
+]
+
+
+async def pedir_todo(cliente):
+    resultado = {}
+    for ruta, headers in pedidos:
+        respuesta = await cliente.get(ruta, headers=headers)
+        assert respuesta.status_code == 200, respuesta.text
+        resultado[ruta] = (respuesta.json(), respuesta.headers.get("x-total-count"))
+    return resultado
+
+
+#Con FAST_JSON los listados mandan las filas sin pasar por pydantic y el JSON es el mismo
+@pytest.mark.anyio
+async def test_fast_json_no_valida_y_responde_lo_mismo(base, cliente, monkeypatch):
+    respuestas_listados(base)
+    con_modelos = await pedir_todo(cliente)
+
+    def sin_pydantic(*args, **kwargs):
+        raise AssertionError("con FAST_JSON no se arman modelos")
+
+    monkeypatch.setattr(responses, "fast_json", True)
+    monkeypatch.setattr(main, "fast_json", True)
+    monkeypatch.setattr(responses, "filas_a_modelos", sin_pydantic)
+    main.catalog_cache.invalidate("turnos")
+
+    assert await pedir_todo(cliente) == con_modelos
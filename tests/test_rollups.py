@@ -0,0 +1,69 @@
+import pytest
+
+
+#Contadores de rollup_actividad en memoria; las consultas de rollup restan lo que se les diga y anotan
+#como deshacerlo, asi un rollback de la ruta los deja como estaban
+def contadores(base, restas):
+    cantidad_alumnos = {1: 10, 2: 4}
+
+    def sumar(id_actividad, cantidad):
+        cantidad_alumnos[id_actividad] += cantidad
+
+    def restar(nombre):
+        def funcion(conexion, params):
+            for id_actividad, cantidad in restas[nombre].items():
+                sumar(id_actividad, -cantidad)
+                conexion.deshacer.append(lambda id_actividad=id_actividad, cantidad=cantidad: sumar(id_actividad, cantidad))
+            return len(restas[nombre])
+        return funcion
+
+    for nombre in restas:
+        base.responder(nombre, restar(nombre))
+    return cantidad_alumnos
+
+
+def orden(base, *nombres):
+    return [nombre for nombre in base.ejecutadas if nombre in nombres]
+
+
+@pytest.mark.anyio
+async def test_borrar_turno_resta_sus_inscriptos(base, cliente):
+    cantidad_alumnos = contadores(base, {"rollup_quitar_alumnos_turno": {1: 3, 2: 1}})
+    base.responder("rollup_borrar_turno", lambda conexion, params: 1)
+    base.responder("borrar_turno", lambda conexion, params: 1)
+
+    respuesta = await cliente.delete("/turnos/7")
+
+    assert respuesta.status_code == 200
+    assert cantidad_alumnos == {1: 7, 2: 3}
+    assert orden(base, "rollup_quitar_alumnos_turno", "borrar_turno") == ["rollup_quitar_alumnos_turno", "borrar_turno"]
+
+
+@pytest.mark.anyio
+async def test_borrar_turno_que_no_existe_no_toca_los_contadores(base, cliente):
+    cantidad_alumnos = contadores(base, {"rollup_quitar_alumnos_turno": {1: 3}})
+    base.responder("rollup_borrar_turno", lambda conexion, params: 0)
+    base.responder("borrar_turno", lambda conexion, params: 0)
+
+    respuesta = await cliente.delete("/turnos/7")
+
+    assert respuesta.status_code == 404
+    assert cantidad_alumnos == {1: 10, 2: 4}
+
+
+@pytest.mark.anyio
+async def test_borrar_instructor_resta_alumnos_y_clases(base, cliente):
+    cantidad_alumnos = contadores(base, {"rollup_quitar_alumnos_instructor": {2: 4}})
+    base.responder("buscar_instructor", lambda conexion, params: [{"ci_instructor": params[0]}])
+    base.responder("rollup_quitar_clases_instructor", lambda conexion, params: 1)
+    base.responder("borrar_instructor", lambda conexion, params: 1)
+
+    respuesta = await cliente.delete("/instructores/50000000")
+
+    assert respuesta.status_code == 200
+    assert cantidad_alumnos == {1: 10, 2: 0}
+    assert orden(base, "rollup_quitar_alumnos_instructor", "rollup_quitar_clases_instructor", "borrar_instructor") == [
+        "rollup_quitar_alumnos_instructor",
+        "rollup_quitar_clases_instructor",
+        "borrar_instructor",
+    ]
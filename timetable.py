@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+from consultas import consultas
+from responses import adaptador, filas_a_modelos
+from schemas import ClaseResponse
+
+
+clases_adapter = adaptador(ClaseResponse)
+
+
+#Copia en memoria del cronograma de clases (el join de clase, actividades, instructores y turnos) con
+#la respuesta de GET /clases ya serializada. Las rutas que escriben esas tablas la actualizan solo en
+#las clases afectadas; cada TIMETABLE_TTL segundos se rearma entera para tomar cambios de otros procesos.
+class Timetable:
+    def __init__(self, ttl=60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._clases = None  #id_clase -> (ClaseResponse, ci_instructor, id_turno)
+        self._body = None
+        self._built_at = 0.0
+        self._version = 0
+
+    def body(self):
+        #devuelve los bytes de la respuesta o None si hay que rearmar
+        with self._lock:
+            if self._clases is None or time.monotonic() - self._built_at > self.ttl:
+                return None
+            if self._body is None:
+                modelos = [self._clases[id_clase][0] for id_clase in sorted(self._clases)]
+                self._body = clases_adapter.dump_json(modelos)
+            return self._body
+
+    def rebuild(self, db):
+        with self._lock:
+            version = self._version
+        clases = {fila[0]: fila[1:] for fila in self._load(db, "cronograma", ())}
+        modelos = [clases[id_clase][0] for id_clase in sorted(clases)]
+        body = clases_adapter.dump_json(modelos)
+        with self._lock:
+            #si hubo una escritura mientras se leia, no se guarda y la proxima lectura vuelve a armar
+            if self._version == version:
+                self._clases = clases
+                self._body = body
+                self._built_at = time.monotonic()
+        return body
+
+    def _load(self, db, nombre, values):
+        cursor = db.cursor()
+        try:
+            cursor.execute(consultas[nombre], values)
+            filas = cursor.fetchall()
+        finally:
+            cursor.close()
+        modelos = filas_a_modelos(
+            ClaseResponse,
+            [(clase[0], clase[1], clase[2], clase[4], clase[5], clase[6], clase[3]) for clase in filas],
+            columnas=("id_clase", "id_actividad", "nombre_actividad", "nombre_instructor", "hora_inicio", "hora_fin", "costo_actividad"),
+        )
+        return [(clase[0], modelo, clase[7], clase[8]) for clase, modelo in zip(filas, modelos)]
+
+    def _apply(self, quitar=None, agregar=()):
+        with self._lock:
+            self._version += 1
+            if self._clases is None:
+                return
+            if quitar is not None:
+                for id_clase in [id_clase for id_clase, datos in self._clases.items() if quitar(datos)]:
+                    del self._clases[id_clase]
+            for fila in agregar:
+                self._clases[fila[0]] = fila[1:]
+            self._body = None
+
+    def add_clase(self, db, id_clase):
+        self._apply(agregar=self._load(db, "cronograma_clase", (id_clase,)))
+
+    def refresh_actividad(self, db, id_actividad):
+        filas = self._load(db, "cronograma_actividad", (id_actividad,))
+        self._apply(quitar=lambda datos: datos[0].id_actividad == id_actividad, agregar=filas)
+
+    def remove_actividad(self, id_actividad):
+        self._apply(quitar=lambda datos: datos[0].id_actividad == id_actividad)
+
+    def remove_instructor(self, ci_instructor):
+        self._apply(quitar=lambda datos: datos[1] == ci_instructor)
+
+    def remove_turno(self, id_turno):
+        self._apply(quitar=lambda datos: datos[2] == id_turno)
+
+
+timetable = Timetable(ttl=float(os.getenv("TIMETABLE_TTL", "60")))